@@ -1,4 +1,5 @@
-from django.core.checks import Warning, register
+from django.core.checks import Error, Tags, Warning, register
+from django.urls import URLResolver, get_resolver
 
 
 @register()
@@ -14,3 +15,32 @@ def user_tags_depreciated(app_configs, **kwargs):
     #     )
     # )
     return errors
+
+
+def get_url_view_classes(patterns):
+    """ yield the view class of each class-based view routed by a list of url patterns, including nested includes """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from get_url_view_classes(pattern.url_patterns)
+        elif getattr(pattern.callback, 'view_class', None):
+            yield pattern.callback.view_class
+
+
+@register(Tags.urls)
+def parquet_export_requirements(app_configs, **kwargs):
+    """ report routed ParquetExportViews when pyarrow is not installed """
+    from handyhelpers.views import export
+    errors = list()
+    if export.pyarrow is not None:
+        return errors
+    for view_class in set(get_url_view_classes(get_resolver().url_patterns)):
+        if issubclass(view_class, export.ParquetExportView):
+            errors.append(
+                Error(
+                    '{} exports parquet files, which requires pyarrow.'.format(view_class.__qualname__),
+                    hint='pip install django-handyhelpers[parquet]',
+                    id='handyhelpers.E001',
+                    obj=view_class,
+                )
+            )
+    return errors
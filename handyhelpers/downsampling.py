@@ -0,0 +1,104 @@
+"""
+Description:
+    Downsampling of chart series with the Largest-Triangle-Three-Buckets (LTTB) algorithm. The points of a series are
+    split into buckets, and from each bucket the point forming the largest triangle with the point kept from the
+    previous bucket and the average of the next bucket is kept. Peaks and troughs survive, so the shape of a long
+    series is preserved with a fraction of its points. Bucket averages and triangle areas are computed with numpy when
+    it is installed, and in pure python otherwise.
+
+    example usage:
+        labels, series_list = downsample_series(labels, [hosts_per_day, owners_per_day], max_points=500)
+"""
+
+# import system modules
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def get_bucket_bounds(length, threshold):
+    """ return the (start, end) index ranges of the threshold - 2 buckets between the first and the last point """
+    size = (length - 2) / (threshold - 2)
+    return [(int(math.floor(i * size)) + 1, int(math.floor((i + 1) * size)) + 1) for i in range(threshold - 2)]
+
+
+def lttb_indices_numpy(x, y, threshold):
+    """ numpy implementation of lttb_indices """
+    x = numpy.asarray(x, dtype=float)
+    y = numpy.asarray(y, dtype=float)
+    bounds = get_bucket_bounds(len(y), threshold) + [(len(y) - 1, len(y))]
+    starts = numpy.array([start for start, end in bounds])
+    sizes = numpy.array([end - start for start, end in bounds])
+    average_x = numpy.add.reduceat(x, starts) / sizes
+    average_y = numpy.add.reduceat(y, starts) / sizes
+    indices = [0]
+    selected = 0
+    for bucket, (start, end) in enumerate(bounds[:-1]):
+        areas = numpy.abs((x[selected] - average_x[bucket + 1]) * (y[start:end] - y[selected]) -
+                          (x[selected] - x[start:end]) * (average_y[bucket + 1] - y[selected]))
+        selected = start + int(areas.argmax())
+        indices.append(selected)
+    indices.append(len(y) - 1)
+    return indices
+
+
+def lttb_indices_python(x, y, threshold):
+    """ pure python implementation of lttb_indices """
+    bounds = get_bucket_bounds(len(y), threshold) + [(len(y) - 1, len(y))]
+    indices = [0]
+    selected = 0
+    for bucket, (start, end) in enumerate(bounds[:-1]):
+        next_start, next_end = bounds[bucket + 1]
+        average_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        average_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        selected = max(range(start, end),
+                       key=lambda i: abs((x[selected] - average_x) * (y[i] - y[selected]) -
+                                         (x[selected] - x[i]) * (average_y - y[selected])))
+        indices.append(selected)
+    indices.append(len(y) - 1)
+    return indices
+
+
+def lttb_indices(y, threshold, x=None):
+    """
+    return the indexes of the points of a series kept when downsampling it to threshold points with LTTB
+
+    Args:
+        y: (list of numbers) values of the series
+        threshold: (int) number of points to keep; series with no more points, and thresholds below 3, are kept whole
+        x: (list of numbers) optional; positions of the values; evenly spaced if not provided
+
+    Returns:
+        ascending list of indexes, including the first and last point
+    """
+    if threshold >= len(y) or threshold < 3:
+        return list(range(len(y)))
+    x = range(len(y)) if x is None else x
+    if numpy is not None:
+        return lttb_indices_numpy(x, y, threshold)
+    return lttb_indices_python(list(x), list(y), threshold)
+
+
+def downsample_series(labels, series_list, max_points):
+    """
+    downsample series plotted against the same labels to about max_points points. The budget is shared by the series;
+    the points kept from each series are merged so every series is sampled at the same labels.
+
+    Args:
+        labels: (list) labels (or timestamps) of the points
+        series_list: (list of lists of numbers) values of each series, in the order of labels
+        max_points: (int) point budget of the chart; None or 0 to keep every point
+
+    Returns:
+        tuple of downsampled labels and list of downsampled series
+    """
+    if not max_points or len(labels) <= max_points:
+        return labels, series_list
+    if not series_list:
+        return [labels[i] for i in lttb_indices([0] * len(labels), max_points)], series_list
+    threshold = max(max_points // len(series_list), 3)
+    keep = sorted(set().union(*(lttb_indices(series, threshold) for series in series_list)))
+    return [labels[i] for i in keep], [[series[i] for i in keep] for series in series_list]
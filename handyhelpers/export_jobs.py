@@ -0,0 +1,182 @@
+"""
+Description:
+    Background export jobs. An export is written to a temporary file by a local thread pool while the request that
+    started it returns immediately; the job can then be polled for status and the finished file downloaded.
+
+    Jobs are held in memory by the process that created them, so status and download requests must be routed to
+    the same process (single worker or sticky sessions). A failed job's exception is logged to the
+    handyhelpers.export_jobs logger; its status only reports a generic error message.
+
+    settings:
+        HH_EXPORT_JOB_WORKERS - number of threads used to run export jobs (default: 2)
+        HH_EXPORT_JOB_DIR     - directory export files are written to (default: system temp directory)
+        HH_EXPORT_JOB_TTL     - seconds a finished job and its file are kept (default: 3600)
+"""
+
+# import system modules
+import datetime
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# import Django modules
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.utils import timezone
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETE = 'complete'
+FAILED = 'failed'
+
+FAILED_MESSAGE = 'the export could not be completed'
+
+logger = logging.getLogger(__name__)
+
+_jobs = dict()
+_lock = threading.Lock()
+_executor = None
+
+
+class ExportJob:
+    """ state of a single background export """
+
+    def __init__(self, key, filename, content_type, user_id=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.filename = filename
+        self.content_type = content_type
+        self.user_id = user_id
+        self.status = PENDING
+        self.path = None
+        self.size = None
+        self.error = None
+        self.created_at = timezone.now()
+        self.finished_at = None
+
+    @property
+    def is_active(self):
+        """ True while the job is waiting or running """
+        return self.status in (PENDING, RUNNING)
+
+    def is_expired(self, now=None):
+        """ True if the job finished more than HH_EXPORT_JOB_TTL seconds ago """
+        if not self.finished_at:
+            return False
+        ttl = getattr(settings, 'HH_EXPORT_JOB_TTL', 3600)
+        return (now or timezone.now()) - self.finished_at > datetime.timedelta(seconds=ttl)
+
+    def as_dict(self):
+        """ return a json serializable summary of the job """
+        return dict(id=self.id, status=self.status, filename=self.filename, size=self.size, error=self.error,
+                    created_at=self.created_at.isoformat(),
+                    finished_at=self.finished_at.isoformat() if self.finished_at else None)
+
+    def run(self, write_func):
+        """ write the export to a temporary file with write_func(fileobj) """
+        self.status = RUNNING
+        try:
+            fd, self.path = tempfile.mkstemp(suffix='-' + self.filename,
+                                             dir=getattr(settings, 'HH_EXPORT_JOB_DIR', None))
+            with os.fdopen(fd, 'wb') as fileobj:
+                write_func(fileobj)
+            self.size = os.path.getsize(self.path)
+            self.status = COMPLETE
+        except Exception:
+            # details (which may include SQL or file paths) are logged; users only see a generic message
+            logger.exception('background export %s (%s) failed', self.id, self.filename)
+            self.error = FAILED_MESSAGE
+            self.status = FAILED
+            self.remove_file()
+        finally:
+            self.finished_at = timezone.now()
+            connections.close_all()
+
+    def remove_file(self):
+        """ delete the export file, if any """
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+
+
+def get_executor():
+    """ return the shared thread pool used to run export jobs """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=getattr(settings, 'HH_EXPORT_JOB_WORKERS', 2),
+                                           thread_name_prefix='handyhelpers-export')
+        return _executor
+
+
+def get_queryset_key(*parts):
+    """
+    return a key identifying an export; built from the SQL of the querysets exported and any other distinguishing
+    values (such as the view and file format)
+
+    Args:
+        parts: querysets and/or strings to include in the key
+
+    Returns:
+        hex digest string
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if hasattr(part, 'query'):
+            try:
+                part = '{}:{}'.format(part.db, part.query)
+            except EmptyResultSet:
+                part = '{}:empty'.format(part.model._meta.label)
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def purge_expired_jobs():
+    """ drop finished jobs older than HH_EXPORT_JOB_TTL and delete their files """
+    now = timezone.now()
+    with _lock:
+        expired = [job for job in _jobs.values() if job.is_expired(now)]
+        for job in expired:
+            del _jobs[job.id]
+    for job in expired:
+        job.remove_file()
+
+
+def submit_export_job(key, filename, content_type, write_func, user_id=None):
+    """
+    start a background export, or return the active job already exporting the same key
+
+    Args:
+        key: (str) key identifying the export (see get_queryset_key)
+        filename: (str) filename offered when the export is downloaded
+        content_type: (str) content type of the export file
+        write_func: callable taking a binary file object and writing the export to it
+        user_id: optional id of the user requesting the export; only this user may see or download the job
+
+    Returns:
+        ExportJob instance
+    """
+    purge_expired_jobs()
+    with _lock:
+        for job in _jobs.values():
+            if job.key == key and job.user_id == user_id and job.is_active:
+                return job
+        job = ExportJob(key, filename, content_type, user_id=user_id)
+        _jobs[job.id] = job
+    get_executor().submit(job.run, write_func)
+    return job
+
+
+def get_export_job(job_id, user_id=None):
+    """ return the job with a given id if it belongs to user_id, otherwise None """
+    job = _jobs.get(job_id)
+    if job and job.user_id == user_id and not job.is_expired():
+        return job
+    return None
@@ -0,0 +1,102 @@
+"""
+Description:
+    Partitioned exports. A filtered queryset is split into primary key ranges which are converted in parallel by a
+    pool of worker processes, each using its own database connection. Converted partitions are handed back in
+    primary key order so they can be joined into a single output.
+
+    Export view classes used with partitioned exports must be importable (defined at module level), as they are
+    pickled and re-instantiated in the worker processes.
+"""
+
+# import system modules
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# import Django modules
+import django
+from django.apps import apps
+from django.db import connections
+from django.db.models import Max, Min
+
+
+def init_worker():
+    """
+    prepare a worker process; set up django when the process was spawned and drop database connections inherited
+    from a forked parent (without closing them, which would close the parent's connection) so the worker opens its own
+    """
+    if not apps.ready:
+        django.setup()
+    for connection in connections.all():
+        connection.connection = None
+
+
+def get_pk_ranges(queryset, partition_size):
+    """
+    split a queryset into half-open primary key ranges spanning partition_size primary key values each
+
+    Args:
+        queryset: django queryset
+        partition_size: (int) width of each primary key range
+
+    Returns:
+        list of (start, end) tuples, or None if the queryset is empty or the primary key is not an integer
+    """
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    low, high = bounds['low'], bounds['high']
+    if not isinstance(low, int) or not isinstance(high, int):
+        return None
+    return [(start, min(start + partition_size, high + 1)) for start in range(low, high + 1, partition_size)]
+
+
+def export_partition(task):
+    """
+    worker entry point; convert the rows of one primary key range
+
+    Args:
+        task: (dict) containing view_class, view_kwargs, model, using, query, spec, start and end
+
+    Returns:
+        the result of view.export_partition(queryset, columns) for the rows in the range
+    """
+    model = apps.get_model(task['model'])
+    queryset = model._default_manager.db_manager(task['using']).all()
+    queryset.query = task['query']
+    queryset = queryset.filter(pk__gte=task['start'], pk__lt=task['end']).order_by('pk')
+    view = task['view_class'](**task['view_kwargs'])
+    return view.export_partition(queryset, view.get_export_columns(model, task['spec']))
+
+
+def iter_partitions(view, queryset, spec=None, workers=None, partition_size=100000):
+    """
+    convert a queryset in parallel and yield the converted partitions in primary key order. At most twice the number
+    of workers partitions are in flight at a time, so a slow consumer does not let results pile up in memory.
+
+    Args:
+        view: export view instance; must provide get_export_columns(model, spec), export_partition(queryset, columns)
+              and get_partition_view_kwargs()
+        queryset: django queryset to export
+        spec: export column spec (see BaseExportView.export_columns); all model fields if not provided
+        workers: (int) number of worker processes; defaults to the number of cpus
+        partition_size: (int) width of each primary key range
+
+    Returns:
+        generator of converted partitions; None if the queryset can not be partitioned
+    """
+    ranges = get_pk_ranges(queryset, partition_size)
+    if ranges is None:
+        return None
+    workers = workers or os.cpu_count() or 1
+    task = dict(view_class=type(view), view_kwargs=view.get_partition_view_kwargs(),
+                model=queryset.model._meta.label, using=queryset.db, query=queryset.query, spec=spec)
+
+    def generator():
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            pending = collections.deque()
+            for start, end in ranges:
+                pending.append(executor.submit(export_partition, dict(task, start=start, end=end)))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    return generator()
@@ -0,0 +1,92 @@
+"""
+Description:
+    HyperLogLog sketches for approximate distinct counts. A sketch keeps 2 ** precision one-byte registers holding the
+    longest run of leading zero bits seen in the hashes of the values added to it, and estimates the number of distinct
+    values from them with a standard error of about 1.04 / sqrt(2 ** precision) (1.6% at the default precision of 12).
+    Sketches of the same precision merge by taking the maximum of each register, so sketches built per day can be
+    combined into the distinct count of any range of days without revisiting the values.
+
+    example usage:
+        sketch = HyperLogLog()
+        for user_id in Event.objects.values_list('user_id', flat=True):
+            sketch.add(user_id)
+        sketch.count()
+"""
+
+# import system modules
+import hashlib
+import math
+
+
+DEFAULT_PRECISION = 12
+
+
+class HyperLogLog:
+    """ mergeable sketch estimating the number of distinct values added to it """
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+        if len(self.registers) != self.size:
+            raise ValueError('a sketch of precision {} has {} registers'.format(precision, self.size))
+
+    @staticmethod
+    def hash(value):
+        """ return the 64 bit hash of a value """
+        data = value if isinstance(value, bytes) else str(value).encode('utf-8')
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+    def add(self, value):
+        """ add a value to the sketch """
+        hashed = self.hash(value)
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        """ add each value of an iterable to the sketch """
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """ merge another sketch of the same precision into this sketch; return self """
+        if other.precision != self.precision:
+            raise ValueError('sketches of different precisions can not be merged')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def copy(self):
+        """ return a copy of the sketch """
+        return HyperLogLog(self.precision, self.registers)
+
+    def count(self):
+        """ return the estimated number of distinct values added to the sketch """
+        if self.size >= 128:
+            alpha = 0.7213 / (1 + 1.079 / self.size)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[self.size]
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # small cardinalities are estimated more accurately by linear counting of the empty registers
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        """ return the registers of the sketch, for storage """
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data, precision=None):
+        """ return a sketch from stored registers; the precision is derived from their number if not provided """
+        if precision is None:
+            precision = len(data).bit_length() - 1
+        return cls(precision, data)
+
+    def __len__(self):
+        return self.count()
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.apps import apps
+from django.test import RequestFactory
+import time
+
+from handyhelpers.views.export import CsvExportView, XlsxExportView
+
+
+class Command(BaseCommand):
+    help = "Measure export throughput of a model, serially and partitioned across a range of worker counts"
+
+    def add_arguments(self, parser):
+        """define command arguments"""
+        parser.add_argument("model", type=str, help="model to export, as app_label.ModelName")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=[1, 2, 4],
+            help="worker process counts to benchmark partitioned exports with",
+        )
+        parser.add_argument(
+            "--partition_size", type=int, default=100000, help="width of the primary key range per partition"
+        )
+        parser.add_argument(
+            "--format", type=str, choices=["csv", "xlsx"], default="csv", help="export format"
+        )
+
+    def run_export(self, view_class, queryset, **initkwargs):
+        """run an export and return the elapsed time in seconds"""
+        start = time.perf_counter()
+        response = view_class.as_view(queryset=queryset, **initkwargs)(RequestFactory().get("/"))
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        response.close()
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        """command entry point"""
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError):
+            raise CommandError(f"'{options['model']}' is not an available model in this project")
+        view_class = CsvExportView if options["format"] == "csv" else XlsxExportView
+        queryset = model._default_manager.all()
+        row_count = queryset.count()
+
+        self.stdout.write(f"exporting {row_count} {model._meta.verbose_name_plural} to {options['format']}")
+        self.stdout.write(f"{'mode':<16}{'seconds':>10}{'rows/sec':>14}{'speedup':>10}")
+        serial = self.run_export(view_class, queryset)
+        self.stdout.write(f"{'serial':<16}{serial:>10.2f}{row_count / serial:>14.0f}{1:>10.2f}")
+        for workers in options["workers"]:
+            elapsed = self.run_export(
+                view_class,
+                queryset,
+                partitioned=True,
+                partition_workers=workers,
+                partition_size=options["partition_size"],
+            )
+            self.stdout.write(
+                f"{f'{workers} workers':<16}{elapsed:>10.2f}{row_count / elapsed:>14.0f}{serial / elapsed:>10.2f}"
+            )
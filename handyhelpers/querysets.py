@@ -6,16 +6,185 @@ Description:
 
 # import system modules
 import datetime
-import collections
+import decimal
+import functools
+import math
+import operator
+import random
+import statistics
 
 # import Django modules
-from django.db.models import Count
+from django.conf import settings
+from django.db import connections
+from django.db.models import Aggregate, Case, Count, F, FloatField, IntegerField, Max, Min, Q, Value, When
+from django.db.models.functions import ExtractHour, ExtractMonth, ExtractWeek, Trunc
+from django.db.models.lookups import GreaterThanOrEqual, LessThan, LessThanOrEqual
+from django.db.models.sql.datastructures import BaseTable
 from django.utils import timezone
 
+# import project modules
+from handyhelpers.tdigest import TDigest
+
+
+# number of months spanned by each calendar period
+PERIOD_MONTHS = {'month': 1, 'quarter': 3, 'year': 12}
+
+PERIOD_KINDS = ('minute', 'hour', 'day', 'week', 'month', 'quarter', 'year')
+
+# row count estimates below this number are replaced with an exact count
+APPROXIMATE_COUNT_THRESHOLD = getattr(settings, 'HH_APPROXIMATE_COUNT_THRESHOLD', 100000)
+
+# number of primary key ranges sampled on databases without TABLESAMPLE
+SAMPLE_BLOCKS = getattr(settings, 'HH_SAMPLE_BLOCKS', 20)
+
+
+def truncate_timestamp(timestamp, kind):
+    """
+    return the start of the period of a given kind a timestamp falls in
+
+    Args:
+        timestamp: (datetime) timestamp to truncate; aware timestamps are truncated in their own time zone
+        kind: (str) period kind; one of minute, hour, day, week, month, quarter or year
+
+    Returns:
+        datetime
+    """
+    timestamp = timestamp.replace(second=0, microsecond=0)
+    if kind == 'minute':
+        return timestamp
+    timestamp = timestamp.replace(minute=0)
+    if kind == 'hour':
+        return timestamp
+    timestamp = timestamp.replace(hour=0)
+    if kind == 'day':
+        return timestamp
+    if kind == 'week':
+        return timestamp - datetime.timedelta(days=timestamp.weekday())
+    if kind == 'year':
+        return timestamp.replace(month=1, day=1)
+    if kind == 'quarter':
+        return timestamp.replace(month=timestamp.month - (timestamp.month - 1) % 3, day=1)
+    return timestamp.replace(day=1)
+
+
+def shift_period(start, kind, count):
+    """
+    return the start of the period count periods after (or before, if count is negative) a given period start.
+    Minutes and hours are stepped in absolute time, longer periods in wall clock time so they stay aligned to
+    midnight across daylight saving time changes.
+
+    Args:
+        start: (datetime) start of a period
+        kind: (str) period kind; one of minute, hour, day, week, month, quarter or year
+        count: (int) number of periods to step
+
+    Returns:
+        datetime
+    """
+    if kind in ('minute', 'hour'):
+        delta = datetime.timedelta(**{kind + 's': count})
+        if timezone.is_aware(start):
+            return (start.astimezone(datetime.timezone.utc) + delta).astimezone(start.tzinfo)
+        return start + delta
+    if kind in ('day', 'week'):
+        return start + datetime.timedelta(**{kind + 's': count})
+    month_index = start.year * 12 + start.month - 1 + count * PERIOD_MONTHS[kind]
+    return start.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def get_period_index(current, start, kind):
+    """ return the number of periods of a given kind between the start of a period and the current period start """
+    if kind in ('minute', 'hour'):
+        if timezone.is_aware(current):
+            current, start = current.astimezone(datetime.timezone.utc), start.astimezone(datetime.timezone.utc)
+        return int((current - start).total_seconds()) // (60 if kind == 'minute' else 3600)
+    if kind in ('day', 'week'):
+        days = (current.replace(tzinfo=None) - start.replace(tzinfo=None)).days
+        return days // 7 if kind == 'week' else days
+    months = (current.year - start.year) * 12 + current.month - start.month
+    return months // PERIOD_MONTHS[kind]
+
+
+def get_current_period(kind, now=None, tzinfo=None):
+    """
+    return the start of the current period of a kind and the time zone periods are truncated in (None if time zone
+    support is disabled)
+    """
+    if kind not in PERIOD_KINDS:
+        raise ValueError('invalid period kind "{}"; valid kinds are {}'.format(kind, ', '.join(PERIOD_KINDS)))
+    now = now or timezone.now()
+    if settings.USE_TZ:
+        tzinfo = tzinfo or timezone.get_current_timezone()
+        now = timezone.localtime(now, tzinfo) if timezone.is_aware(now) else timezone.make_aware(now, tzinfo)
+    else:
+        tzinfo = None
+    return truncate_timestamp(now, kind), tzinfo
+
+
+def get_wall_clock_period(start, utc_start):
+    """
+    return the start of a wall clock period (such as 01:00 on the day clocks are turned back, which occurs twice) with
+    the fold of the occurrence closest to the UTC period of its entries
+    """
+    return min((start.replace(fold=0), start.replace(fold=1)),
+               key=lambda candidate: abs(candidate.astimezone(datetime.timezone.utc) - utc_start))
+
+
+def count_by_period(queryset, field_name, kind, periods, now=None, tzinfo=None):
+    """
+    count queryset entries per period (minute, hour, day, week, month, quarter or year) for the most recent periods,
+    in a single GROUP BY query. Periods are truncated by the database in the given time zone, so the same code runs
+    on every database backend supported by django.
+
+    Args:
+        queryset: django queryset
+        field_name: datetime field to group data by (string)
+        kind: period kind; one of minute, hour, day, week (starting Monday), month, quarter or year
+        periods: number of periods to count, including the current period
+        now: datetime the current period is determined from; defaults to now
+        tzinfo: time zone periods are truncated in; defaults to the current time zone
+
+    Returns:
+        list of grouped values: count of entries per period, starting with current period, descending chronologically
+    """
+    current, tzinfo = get_current_period(kind, now, tzinfo)
+    lookups = {field_name + '__gte': shift_period(current, kind, 1 - periods),
+               field_name + '__lt': shift_period(current, kind, 1)}
+    groups = dict(period=Trunc(field_name, kind, tzinfo=tzinfo))
+    if tzinfo is not None and kind in ('minute', 'hour'):
+        # the wall clock hour repeated when clocks are turned back is told apart by its UTC period
+        groups['utc_period'] = Trunc(field_name, kind, tzinfo=datetime.timezone.utc)
+    data = queryset.filter(**lookups).order_by().annotate(**groups).values(*groups).annotate(
+        count=Count('pk')).values_list(*groups, 'count')
+
+    return_list = [0] * periods
+    for row in data:
+        start = row[0]
+        if len(row) == 3:
+            start = get_wall_clock_period(start, row[1])
+        elif tzinfo is not None:
+            start = timezone.localtime(start, tzinfo)
+        index = get_period_index(current, start, kind)
+        if 0 <= index < periods:
+            return_list[index] += row[-1]
+    return return_list
+
+
+def count_by_part(queryset, field_name, extract):
+    """ return a dictionary of date part value: number of entries, over the whole queryset, in one GROUP BY query """
+    return dict(queryset.order_by().annotate(part=extract(field_name)).values('part').annotate(
+        count=Count('pk')).values_list('part', 'count'))
+
+
+def get_local_now():
+    """ return the current time, in the current time zone if time zone support is enabled """
+    return timezone.localtime() if settings.USE_TZ else timezone.now()
+
 
 def count_by_hour(queryset, field_name):
     """
-    sort queryset results by hour of day
+    sort queryset results by hour of day; entries of every day are counted together (see count_by_period for the
+    counts of the most recent hours)
 
     Args:
         queryset: django queryset
@@ -24,54 +193,34 @@ def count_by_hour(queryset, field_name):
     Returns:
         list of grouped values: count of entries per hour, starting with current hour, descending chronologically
     """
-    data = queryset.extra({'hour': "hour({})".format(field_name)}).values('hour').annotate(Count('id'))
-    new_dict = collections.OrderedDict()
-    for i in data:
-        values = i.values()
-        new_dict[values[0]] = values[1]
-
-    return_list = []
-    now = timezone.now()
-    for i in [(now - datetime.timedelta(hours=i)).hour for i in range(0, 24)]:
-        if i not in new_dict.keys():
-            return_list.append(0)
-        else:
-            return_list.append(new_dict[i])
-    return return_list
+    counts = count_by_part(queryset, field_name, ExtractHour)
+    hour = get_local_now().hour
+    return [counts.get((hour - offset) % 24, 0) for offset in range(24)]
 
 
 def count_by_week(queryset, field_name):
     """
     Description:
-        sort queryset results by week of year
+        sort queryset results by ISO week of year; entries of every year are counted together (see count_by_period
+        for the counts of the most recent weeks)
 
     Args:
         queryset: django queryset
         field_name: field to group data by (string)
 
     Returns:
-        list of grouped values
         list of grouped values: count of entries per week, starting with current week, descending chronologically
     """
-    data = queryset.extra({'week': "week({})".format(field_name)}).values('week').annotate(Count('id'))
-    new_dict = collections.OrderedDict()
-    for i in data:
-        new_dict[i['week']] = i['id__count']
-
-    return_list = []
-    now = timezone.now()
-    for i in [(now - datetime.timedelta(weeks=i)).isocalendar()[1] for i in range(0, 52)]:
-        if i not in new_dict.keys():
-            return_list.append(0)
-        else:
-            return_list.append(new_dict[i])
-    return return_list
+    counts = count_by_part(queryset, field_name, ExtractWeek)
+    now = get_local_now()
+    return [counts.get((now - datetime.timedelta(weeks=offset)).isocalendar()[1], 0) for offset in range(52)]
 
 
 def count_by_month(queryset, field_name):
     """
     Description:
-        sort queryset results by month of year
+        sort queryset results by month of year; entries of every year are counted together (see count_by_period for
+        the counts of the most recent months)
 
     Args:
         queryset: django queryset
@@ -80,16 +229,342 @@ def count_by_month(queryset, field_name):
     Returns:
         list of grouped values: count of entries per month, starting with current month, descending chronologically
     """
-    data = queryset.extra({'month': "month({})".format(field_name)}).values('month').annotate(Count('id'))
-    new_dict = collections.OrderedDict()
-    for i in data:
-        new_dict[i['month']] = i['id__count']
-
-    return_list = []
-    now = timezone.now()
-    for i in [(now - datetime.timedelta(i * 365 / 12)).month for i in range(0, 12)]:
-        if i not in new_dict.keys():
-            return_list.append(0)
-        else:
-            return_list.append(new_dict[i])
-    return return_list
+    counts = count_by_part(queryset, field_name, ExtractMonth)
+    month = get_local_now().month
+    return [counts.get((month - 1 - offset) % 12 + 1, 0) for offset in range(12)]
+
+
+def pivot_counts(queryset, field_names, dt_field, kind, periods, now=None, tzinfo=None, row_labels=None):
+    """
+    count queryset entries per value of one or more categorical fields and per period, such as status x month or
+    owner x week, in a single GROUP BY query, and return them as a dense matrix with zero fill
+
+    Args:
+        queryset: django queryset
+        field_names: field (string) or list of fields to group rows by
+        dt_field: datetime field to group columns by (string)
+        kind: period kind; one of minute, hour, day, week (starting Monday), month, quarter or year
+        periods: number of periods to count, including the current period
+        now: datetime the current period is determined from; defaults to now
+        tzinfo: time zone periods are truncated in; defaults to the current time zone
+        row_labels: optional list of row labels to return, in order, including rows without entries; defaults to
+                    the values found, sorted
+
+    Returns:
+        tuple containing:
+            list of row labels: values of the field, or tuples of values if field_names is a list
+            list of column labels: period start timestamps, oldest first
+            list of rows, each a list of counts per period
+    """
+    single = isinstance(field_names, str)
+    field_names = [field_names] if single else list(field_names)
+    current, tzinfo = get_current_period(kind, now, tzinfo)
+    lookups = {dt_field + '__gte': shift_period(current, kind, 1 - periods),
+               dt_field + '__lt': shift_period(current, kind, 1)}
+    data = queryset.filter(**lookups).order_by().annotate(
+        period=Trunc(dt_field, kind, tzinfo=tzinfo)).values('period', *field_names).annotate(
+        count=Count('pk')).values_list('period', *field_names, 'count')
+
+    cells = dict()
+    for start, *values, count in data:
+        if tzinfo is not None:
+            start = timezone.localtime(start, tzinfo)
+        index = get_period_index(current, start, kind)
+        if 0 <= index < periods:
+            row = cells.setdefault(values[0] if single else tuple(values), [0] * periods)
+            row[periods - 1 - index] += count
+    if row_labels is None:
+        # nulls sort last
+        row_labels = sorted(cells, key=lambda label: [(value is None, value)
+                                                      for value in ((label, ) if single else label)])
+    column_labels = [shift_period(current, kind, offset) for offset in range(1 - periods, 1)]
+    return list(row_labels), column_labels, [cells.get(label, [0] * periods) for label in row_labels]
+
+
+def count_top_values(queryset, field_name, limit=10):
+    """
+    count the most frequent values of a field in a single GROUP BY ... ORDER BY count DESC LIMIT query
+
+    Args:
+        queryset: django queryset
+        field_name: field to group data by (string)
+        limit: number of values to return
+
+    Returns:
+        list of (value, count) tuples, most frequent first; ties are ordered by value
+    """
+    return list(queryset.order_by().values(field_name).annotate(count=Count('pk')).order_by(
+        '-count', field_name).values_list(field_name, 'count')[:limit])
+
+
+def histogram(queryset, field_name, bins=10, low=None, high=None):
+    """
+    count the values of a numeric field in fixed-width bins in a single GROUP BY query, the bin of each row being
+    selected with a CASE expression. Bounds not provided are read from the minimum and maximum of the field with an
+    additional aggregate query; values outside the bounds and nulls are not counted.
+
+    Args:
+        queryset: django queryset
+        field_name: numeric field to bin (string)
+        bins: number of bins
+        low: lower bound of the first bin; defaults to the minimum of the field
+        high: upper bound of the last bin (included); defaults to the maximum of the field
+
+    Returns:
+        tuple of the list of bins + 1 bin edges and the list of counts per bin; empty lists if there are no values
+    """
+    if low is None or high is None:
+        bounds = queryset.aggregate(low=Min(field_name), high=Max(field_name))
+        low = bounds['low'] if low is None else low
+        high = bounds['high'] if high is None else high
+    if low is None or high is None or high < low:
+        return [], []
+    if high == low:
+        bins = 1
+    if isinstance(low, decimal.Decimal) or isinstance(high, decimal.Decimal):
+        low, high = float(low), float(high)
+    width = (high - low) / bins
+    edges = [low + width * index for index in range(bins)] + [high]
+    # edges are compared as values rather than through the field, which would round them to its precision
+    bucket = Case(*[When(LessThan(F(field_name), Value(edge)), then=Value(index))
+                    for index, edge in enumerate(edges[1:-1])], default=Value(bins - 1), output_field=IntegerField())
+    data = queryset.filter(GreaterThanOrEqual(F(field_name), Value(low)),
+                           LessThanOrEqual(F(field_name), Value(high))).order_by().annotate(
+        bucket=bucket).values('bucket').annotate(count=Count('pk')).values_list('bucket', 'count')
+    counts = [0] * bins
+    for index, count in data:
+        counts[index] = count
+    return edges, counts
+
+
+class PercentileCont(Aggregate):
+    """ PERCENTILE_CONT ordered-set aggregate (postgresql) returning the value at a fraction of a numeric field """
+    function = 'PERCENTILE_CONT'
+    template = '%(function)s(%(fraction)r) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def get_percentiles(queryset, field_name, percentiles=(50, 95, 99), compression=None):
+    """
+    return percentiles of a numeric field, such as the p50, p95 and p99 of a duration. Postgresql computes them exactly
+    with PERCENTILE_CONT in a single aggregate query; on other databases the values are streamed through a t-digest
+    sketch in bounded memory and the percentiles are estimated from it.
+
+    Args:
+        queryset: django queryset
+        field_name: numeric field (string)
+        percentiles: percentiles to return, between 0 and 100
+        compression: (int) compression of the t-digest fallback; defaults to 200
+
+    Returns:
+        list of values in the order of percentiles; None for each percentile if there are no values
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        data = queryset.aggregate(**{'percentile_{}'.format(index): PercentileCont(field_name, percentile / 100)
+                                     for index, percentile in enumerate(percentiles)})
+        return [data['percentile_{}'.format(index)] for index in range(len(percentiles))]
+    digest = TDigest(compression) if compression else TDigest()
+    digest.update(queryset.filter(**{field_name + '__isnull': False}).order_by().values_list(
+        field_name, flat=True).iterator(chunk_size=10000))
+    return [digest.quantile(percentile / 100) for percentile in percentiles]
+
+
+def is_unfiltered(queryset):
+    """ return True if a queryset selects every row of its table """
+    query = queryset.query
+    return not (query.where or query.is_sliced or query.distinct or query.combinator or query.group_by)
+
+
+def get_table_estimate(model, using='default'):
+    """
+    return the number of rows of the table of a model as estimated from the statistics of the database planner
+    (pg_class.reltuples on postgresql, information_schema.tables on mysql), without scanning the table
+
+    Args:
+        model: django model
+        using: (str) database alias
+
+    Returns:
+        estimated number of rows, or None if the database provides no estimate
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)'
+        params = [connection.ops.quote_name(model._meta.db_table)]
+    elif connection.vendor == 'mysql':
+        sql = 'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s'
+        params = [model._meta.db_table]
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    # postgresql reports -1 for tables that were never vacuumed or analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def get_count_estimate(queryset, threshold=None):
+    """
+    return the estimated number of entries of an unfiltered queryset if it is at least threshold
+
+    Args:
+        queryset: django queryset
+        threshold: (int) smallest estimate returned; defaults to the HH_APPROXIMATE_COUNT_THRESHOLD setting (100000)
+
+    Returns:
+        estimated number of entries, or None if the queryset is filtered, the database provides no estimate or the
+        estimate is below threshold
+    """
+    if not is_unfiltered(queryset):
+        return None
+    estimate = get_table_estimate(queryset.model, queryset.db)
+    threshold = APPROXIMATE_COUNT_THRESHOLD if threshold is None else threshold
+    if estimate is None or estimate < threshold:
+        return None
+    return estimate
+
+
+def approximate_count(queryset, threshold=None):
+    """
+    count queryset entries, using the estimate of the database planner for unfiltered querysets of large tables.
+    Filtered querysets, small tables and databases without estimates (such as sqlite) are counted exactly.
+
+    Args:
+        queryset: django queryset
+        threshold: (int) estimates below this number are replaced with an exact count; defaults to the
+                   HH_APPROXIMATE_COUNT_THRESHOLD setting (100000)
+
+    Returns:
+        tuple of (count, True if the count is an estimate)
+    """
+    estimate = get_count_estimate(queryset, threshold)
+    if estimate is None:
+        return queryset.count(), False
+    return estimate, True
+
+
+def get_z_score(confidence):
+    """ return the z-score of a two-sided confidence level, such as 1.96 for 0.95 """
+    return statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def get_interval(estimate, half_width):
+    """ return an (estimate, low, high) tuple of rounded counts; the interval is clipped at zero """
+    return round(estimate), max(round(estimate - half_width), 0), round(estimate + half_width)
+
+
+def count_conditions(queryset, conditions):
+    """ count the entries of a queryset matching each of a dictionary of name: condition in a single query """
+    return queryset.aggregate(**{name: Count('pk', filter=condition or None) for name, condition in conditions.items()})
+
+
+class SampledTable(BaseTable):
+    """ base table of a query, read from a sample of the pages of the table with TABLESAMPLE SYSTEM (postgresql) """
+
+    def __init__(self, table_name, alias, percent):
+        super().__init__(table_name, alias)
+        self.percent = percent
+
+    def as_sql(self, compiler, connection):
+        sql, params = super().as_sql(compiler, connection)
+        return '{} TABLESAMPLE SYSTEM ({:f})'.format(sql, self.percent), params
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(self.table_name, change_map.get(self.table_alias, self.table_alias), self.percent)
+
+    @property
+    def identity(self):
+        return super().identity + (self.percent, )
+
+
+def sample_counts_tablesample(queryset, fraction, conditions, z):
+    """
+    estimate counts from a TABLESAMPLE SYSTEM sample of the pages of the table (postgresql); only the base table of
+    the query is sampled, joined tables and subqueries are read in full. The interval assumes the sampled rows are
+    independent, which understates it for rows clustered on disk
+    """
+    aggregates = {name: Count('pk', filter=condition or None) for name, condition in conditions.items()}
+    query = queryset.order_by().annotate(sample_group=Value(1, output_field=IntegerField())).values(
+        'sample_group').annotate(**aggregates).values(*aggregates).query
+    alias = query.get_initial_alias()
+    query.alias_map[alias] = SampledTable(query.alias_map[alias].table_name, alias, 100 * fraction)
+    sql, params = query.get_compiler(using=queryset.db).as_sql()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    results = dict()
+    for name, count in zip(aggregates, row or [0] * len(aggregates)):
+        # binomial variance of the scaled count; one entry is assumed when none were sampled, so zero counts still
+        # have an upper bound
+        results[name] = get_interval(count / fraction, z * math.sqrt(max(count, 1) * (1 - fraction)) / fraction)
+    return results
+
+
+def sample_counts_pk_range(queryset, fraction, conditions, z, blocks):
+    """
+    estimate counts from a sample of primary key ranges; the key span of the table is split into equal ranges, a
+    random selection of which is counted with a single query grouping the rows by range. The interval is derived
+    from the variance of the counts between ranges, and is at least that of a single sampled entry. Returns None if
+    the primary key is not an integer or fewer than 2 ranges are to be sampled, as the variance needs at least 2.
+    """
+    if blocks < 2 or not isinstance(queryset.model._meta.pk, IntegerField):
+        return None
+    bounds = queryset.model._base_manager.db_manager(queryset.db).aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return None
+    span = bounds['high'] - bounds['low'] + 1
+    width = max(int(span * fraction / blocks), 1)
+    total_blocks = -(-span // width)
+    if total_blocks <= blocks:
+        return None
+    starts = [bounds['low'] + block * width for block in random.sample(range(total_blocks), blocks)]
+    ranges = [Q(pk__gte=start, pk__lt=start + width) for start in starts]
+    sampled = queryset.filter(functools.reduce(operator.or_, ranges)).order_by().annotate(
+        sample_block=Case(*[When(condition, then=Value(block)) for block, condition in enumerate(ranges)],
+                          output_field=IntegerField())).values('sample_block').annotate(
+        **{name: Count('pk', filter=condition or None) for name, condition in conditions.items()})
+    block_counts = {name: [0] * blocks for name in conditions}
+    for row in sampled:
+        for name in conditions:
+            block_counts[name][row['sample_block']] = row[name]
+    results = dict()
+    scale = total_blocks / blocks
+    for name, counts in block_counts.items():
+        variance = scale ** 2 * (1 - blocks / total_blocks) * max(blocks * statistics.variance(counts), 1)
+        results[name] = get_interval(scale * sum(counts), z * math.sqrt(variance))
+    return results
+
+
+def sample_counts(queryset, fraction, conditions, confidence=0.95, blocks=None):
+    """
+    estimate the number of entries of a queryset matching each of a set of conditions from a random sample of about
+    fraction of the rows of its table, scaled up, with confidence intervals. Rows are sampled with TABLESAMPLE on
+    postgresql and by primary key ranges on other databases; all conditions are counted in a single query. Querysets
+    that can not be sampled (sliced or combined querysets, tables too small to sample and primary keys that are not
+    integers on databases without TABLESAMPLE) are counted exactly.
+
+    Args:
+        queryset: django queryset
+        fraction: (float) fraction of the rows of the table to sample, such as 0.01
+        conditions: (dictionary) name: Q object selecting the entries to count, or None to count every entry
+        confidence: (float) confidence level of the intervals
+        blocks: (int) number of primary key ranges sampled without TABLESAMPLE; defaults to the HH_SAMPLE_BLOCKS
+                setting (20); entries are counted exactly with fewer than 2
+
+    Returns:
+        dictionary of name: (estimate, low, high) tuple of counts
+    """
+    query = queryset.query
+    if 0 < fraction < 1 and not (query.is_sliced or query.combinator or query.distinct):
+        z = get_z_score(confidence)
+        if connections[queryset.db].vendor == 'postgresql':
+            return sample_counts_tablesample(queryset, fraction, conditions, z)
+        results = sample_counts_pk_range(queryset, fraction, conditions, z, blocks or SAMPLE_BLOCKS)
+        if results is not None:
+            return results
+    return {name: (count, count, count) for name, count in count_conditions(queryset, conditions).items()}
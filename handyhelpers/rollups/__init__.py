@@ -0,0 +1,7 @@
+"""
+Description:
+    Optional pre-aggregated daily counts for report views. Add 'handyhelpers.rollups' to INSTALLED_APPS, register
+    rollups in the HH_ROLLUPS setting, run the refresh_rollups management command periodically and reference a rollup
+    by name in report datasets.
+
+"""
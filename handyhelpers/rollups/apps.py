@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class RollupsConfig(AppConfig):
+    name = "handyhelpers.rollups"
+    label = "handyhelpers_rollups"
+    verbose_name = "django-handyhelpers rollups"
+    default_auto_field = "django.db.models.BigAutoField"
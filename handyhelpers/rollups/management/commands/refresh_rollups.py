@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+import time
+
+from handyhelpers.rollups.registry import get_rollups
+
+
+class Command(BaseCommand):
+    help = "Refresh the daily counts of rollups registered in HH_ROLLUPS with rows added since their last refresh"
+
+    def add_arguments(self, parser):
+        """define command arguments"""
+        parser.add_argument("names", type=str, nargs="*", help="rollups to refresh; all registered rollups if omitted")
+        parser.add_argument("--full", action="store_true", help="rebuild the rollups from all rows")
+
+    def handle(self, *args, **options):
+        """command entry point"""
+        rollups = get_rollups()
+        unknown = [name for name in options["names"] if name not in rollups]
+        if unknown:
+            raise CommandError(f"rollup(s) not registered in HH_ROLLUPS: {', '.join(unknown)}")
+        for name in options["names"] or rollups:
+            start = time.perf_counter()
+            written = rollups[name].refresh(full=options["full"])
+            self.stdout.write(f"{name}: {written} daily counts written in {time.perf_counter() - start:.2f}s")
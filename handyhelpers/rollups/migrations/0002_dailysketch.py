@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('handyhelpers_rollups', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(blank=True, default='', max_length=255)),
+                ('registers', models.BinaryField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name', 'day'], name='handyhelper_name_32eee1_idx')],
+                'unique_together': {('name', 'day', 'dimension')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+"""
+Description:
+    Models holding pre-aggregated daily counts, daily distinct-count sketches and the refresh watermark of each
+    registered rollup
+"""
+
+# django modules
+from django.db import models
+
+
+class DailyCount(models.Model):
+    """ number of rows of a rollup added on a day, per dimension value ('' if the rollup has no dimension) """
+    name = models.CharField(max_length=255)
+    day = models.DateField()
+    dimension = models.CharField(max_length=255, blank=True, default='')
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = (('name', 'day', 'dimension'), )
+        indexes = [models.Index(fields=['name', 'day'])]
+
+    def __str__(self):
+        return '{} {} {}: {}'.format(self.name, self.day, self.dimension, self.count)
+
+
+class DailySketch(models.Model):
+    """
+    HyperLogLog sketch of the distinct values of the distinct_field of a rollup on a day, per dimension value ('' if
+    the rollup has no dimension)
+    """
+    name = models.CharField(max_length=255)
+    day = models.DateField()
+    dimension = models.CharField(max_length=255, blank=True, default='')
+    registers = models.BinaryField()
+
+    class Meta:
+        unique_together = (('name', 'day', 'dimension'), )
+        indexes = [models.Index(fields=['name', 'day'])]
+
+    def __str__(self):
+        return '{} {} {}'.format(self.name, self.day, self.dimension)
+
+
+class RollupWatermark(models.Model):
+    """ time a rollup was last refreshed; days before the day of refreshed_at are complete """
+    name = models.CharField(max_length=255, unique=True)
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return '{}: {}'.format(self.name, self.refreshed_at)
@@ -0,0 +1,219 @@
+"""
+Description:
+    Rollup registration and maintenance. Rollups are registered in the HH_ROLLUPS setting, a dictionary keyed by
+    rollup name:
+
+        HH_ROLLUPS = {
+            'hosts': dict(model='hostmgr.Host', dt_field='created_at'),
+            'hosts_by_status': dict(model='hostmgr.Host', dt_field='created_at', dimension='status'),
+            'logins': dict(model='accounts.Login', dt_field='created_at', distinct_field='user_id'),
+        }
+
+    Each refresh recounts the rows from the start of the day of the previous refresh (the watermark) onwards and
+    replaces the daily counts of those days, so refreshes are incremental and may be repeated safely. Reads combine the
+    stored counts of the days before the watermark with a live count of the rows since, so results are current even
+    between refreshes. Rows deleted or moved to an earlier day after their day was rolled up are only picked up by a
+    full refresh.
+
+    Rollups with a distinct_field also store a HyperLogLog sketch of the distinct values of the field per day, which
+    are merged to estimate the number of distinct values (such as unique users) over any range of days.
+
+    settings:
+        HH_ROLLUPS - dictionary of rollup name: dict(model, dt_field, dimension (optional), distinct_field (optional),
+                     precision (optional; HyperLogLog precision of distinct_field sketches, default 12))
+"""
+
+# import system modules
+import collections
+import datetime
+
+# import Django modules
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# import models
+from handyhelpers.hyperloglog import DEFAULT_PRECISION, HyperLogLog
+from handyhelpers.rollups.models import DailyCount, DailySketch, RollupWatermark
+
+
+def get_day_start(day):
+    """ return the start of a day in the current time zone """
+    start = datetime.datetime.combine(day, datetime.time())
+    return timezone.make_aware(start) if settings.USE_TZ else start
+
+
+def get_local_date(timestamp):
+    """ return the date of a timestamp in the current time zone """
+    return timezone.localdate(timestamp) if timezone.is_aware(timestamp) else timestamp.date()
+
+
+class Rollup:
+    """ daily counts of the rows of a model, by a datetime field and an optional dimension field """
+
+    def __init__(self, name, model, dt_field, dimension=None, distinct_field=None, precision=DEFAULT_PRECISION):
+        self.name = name
+        self.model = apps.get_model(model) if isinstance(model, str) else model
+        self.dt_field = dt_field
+        self.dimension = dimension
+        self.distinct_field = distinct_field
+        self.precision = precision
+
+    def get_queryset(self):
+        """ return the queryset rolled up """
+        return self.model._default_manager.all()
+
+    def get_watermark_day(self):
+        """ return the day of the last refresh, or None if the rollup was never refreshed """
+        watermark = RollupWatermark.objects.filter(name=self.name).first()
+        return get_local_date(watermark.refreshed_at) if watermark else None
+
+    def count_by_day(self, queryset):
+        """ return a list of (day, dimension value, count) tuples for a queryset, in a single GROUP BY query """
+        fields = ['day'] + ([self.dimension] if self.dimension else [])
+        rows = queryset.filter(**{self.dt_field + '__isnull': False}).order_by().annotate(
+            day=TruncDate(self.dt_field)).values(*fields).annotate(count=Count('pk'))
+        return [(row['day'], '' if row.get(self.dimension) is None else str(row[self.dimension]), row['count'])
+                for row in rows]
+
+    def build_daily_sketches(self, queryset):
+        """
+        return a dictionary of (day, dimension value): HyperLogLog sketch of the distinct values of distinct_field for
+        a queryset; the database removes duplicate values within a day before they are read
+        """
+        fields = ['day'] + ([self.dimension] if self.dimension else []) + [self.distinct_field]
+        rows = queryset.filter(**{self.dt_field + '__isnull': False, self.distinct_field + '__isnull': False})
+        rows = rows.order_by().annotate(day=TruncDate(self.dt_field)).values_list(*fields).distinct()
+        sketches = dict()
+        for row in rows.iterator(chunk_size=10000):
+            key = (row[0], '' if not self.dimension or row[1] is None else str(row[1]))
+            if key not in sketches:
+                sketches[key] = HyperLogLog(self.precision)
+            sketches[key].add(row[-1])
+        return sketches
+
+    def refresh(self, full=False):
+        """
+        recount the rows from the start of the watermark day onwards (all rows if full) and replace the stored daily
+        counts of those days
+
+        Args:
+            full: (bool) if True, rebuild the rollup from all rows
+
+        Returns:
+            number of daily counts written
+        """
+        now = timezone.now()
+        start_day = None if full else self.get_watermark_day()
+        queryset = self.get_queryset()
+        if start_day:
+            queryset = queryset.filter(**{self.dt_field + '__gte': get_day_start(start_day)})
+        daily_counts = [DailyCount(name=self.name, day=day, dimension=dimension, count=count)
+                        for day, dimension, count in self.count_by_day(queryset)]
+        daily_sketches = list()
+        if self.distinct_field:
+            daily_sketches = [DailySketch(name=self.name, day=day, dimension=dimension, registers=sketch.to_bytes())
+                              for (day, dimension), sketch in self.build_daily_sketches(queryset).items()]
+        with transaction.atomic(using=DailyCount.objects.db):
+            for model, rows in ((DailyCount, daily_counts), (DailySketch, daily_sketches)):
+                stale = model.objects.filter(name=self.name)
+                if start_day:
+                    stale = stale.filter(day__gte=start_day)
+                stale.delete()
+                model.objects.bulk_create(rows, batch_size=1000)
+            RollupWatermark.objects.update_or_create(name=self.name, defaults=dict(refreshed_at=now))
+        return len(daily_counts)
+
+    def get_live_queryset(self, start=None, dimension=None):
+        """ return the queryset of the rows from the start day onwards, restricted to a dimension value if provided """
+        queryset = self.get_queryset()
+        if dimension is not None:
+            if not self.dimension:
+                raise ImproperlyConfigured('rollup "{}" has no dimension'.format(self.name))
+            queryset = queryset.filter(**{self.dimension: dimension})
+        if start:
+            queryset = queryset.filter(**{self.dt_field + '__gte': get_day_start(start)})
+        return queryset
+
+    def get_daily_counts(self, start=None, dimension=None):
+        """
+        return the number of rows per day; stored counts for the days before the watermark day and a live count for
+        the days since
+
+        Args:
+            start: (date) optional; first day to include
+            dimension: optional dimension value to restrict counts to
+
+        Returns:
+            dictionary of date: count
+        """
+        counts = collections.Counter()
+        watermark_day = self.get_watermark_day()
+        live = self.get_live_queryset(start, dimension)
+        if watermark_day:
+            stored = DailyCount.objects.filter(name=self.name, day__lt=watermark_day)
+            if start:
+                stored = stored.filter(day__gte=start)
+            if dimension is not None:
+                stored = stored.filter(dimension=str(dimension))
+            for day, count in stored.values('day').annotate(total=Sum('count')).values_list('day', 'total'):
+                counts[day] += count
+            live = live.filter(**{self.dt_field + '__gte': get_day_start(watermark_day)})
+        for day, _, count in self.count_by_day(live):
+            counts[day] += count
+        return dict(counts)
+
+    def get_daily_sketches(self, start=None, dimension=None):
+        """
+        return the HyperLogLog sketch of the distinct values of distinct_field per day; stored sketches for the days
+        before the watermark day and sketches built live for the days since. Sketches of the dimension values of a day
+        are merged unless a dimension value is provided.
+
+        Args:
+            start: (date) optional; first day to include
+            dimension: optional dimension value to restrict sketches to
+
+        Returns:
+            dictionary of date: HyperLogLog
+        """
+        if not self.distinct_field:
+            raise ImproperlyConfigured('rollup "{}" has no distinct_field'.format(self.name))
+        sketches = dict()
+
+        def add(day, sketch):
+            if day in sketches:
+                sketches[day].merge(sketch)
+            else:
+                sketches[day] = sketch
+
+        watermark_day = self.get_watermark_day()
+        live = self.get_live_queryset(start, dimension)
+        if watermark_day:
+            stored = DailySketch.objects.filter(name=self.name, day__lt=watermark_day)
+            if start:
+                stored = stored.filter(day__gte=start)
+            if dimension is not None:
+                stored = stored.filter(dimension=str(dimension))
+            for day, registers in stored.values_list('day', 'registers').iterator():
+                add(day, HyperLogLog(self.precision, bytes(registers)))
+            live = live.filter(**{self.dt_field + '__gte': get_day_start(watermark_day)})
+        for (day, _), sketch in self.build_daily_sketches(live).items():
+            add(day, sketch)
+        return sketches
+
+
+def get_rollups():
+    """ return a dictionary of rollup name: Rollup for the rollups registered in HH_ROLLUPS """
+    return {name: Rollup(name, **options) for name, options in getattr(settings, 'HH_ROLLUPS', dict()).items()}
+
+
+def get_rollup(name):
+    """ return the registered Rollup with a given name; raise ImproperlyConfigured if it is not registered """
+    options = getattr(settings, 'HH_ROLLUPS', dict()).get(name)
+    if options is None:
+        raise ImproperlyConfigured('rollup "{}" is not registered in HH_ROLLUPS'.format(name))
+    return Rollup(name, **options)
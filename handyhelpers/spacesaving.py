@@ -0,0 +1,81 @@
+"""
+Description:
+    Space-Saving sketch for approximate top-k (heavy hitter) counts over a stream of values in bounded memory. At most
+    capacity values are monitored; when a new value arrives and the sketch is full, the value with the lowest count
+    is replaced and the new value inherits its count (as the error bound of its own count). Any value occurring more
+    than total / capacity times is guaranteed to be monitored, and each reported count overestimates the true count
+    by at most its error.
+
+    example usage:
+        sketch = SpaceSaving(capacity=200)
+        sketch.update(Event.objects.values_list('host_id', flat=True).iterator())
+        sketch.top(20)
+"""
+
+# import system modules
+import heapq
+import itertools
+
+
+class SpaceSaving:
+    """ bounded-memory sketch of the most frequent values of a stream """
+
+    def __init__(self, capacity=100):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self.counts = dict()
+        self.errors = dict()
+        self.total = 0
+        # min-heap of (count, order, value); entries are superseded when a count grows and dropped lazily
+        self.heap = list()
+        self.order = itertools.count()
+
+    def push(self, value):
+        """ record the current count of a monitored value in the heap """
+        heapq.heappush(self.heap, (self.counts[value], next(self.order), value))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(count, next(self.order), value) for value, count in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def pop_min(self):
+        """ remove the monitored value with the lowest count; return its count """
+        while True:
+            count, _, value = heapq.heappop(self.heap)
+            if self.counts.get(value) == count:
+                del self.counts[value]
+                del self.errors[value]
+                return count
+
+    def add(self, value, count=1):
+        """ add an occurrence (or count occurrences) of a value """
+        self.total += count
+        if value in self.counts:
+            self.counts[value] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[value] = count
+            self.errors[value] = 0
+        else:
+            minimum = self.pop_min()
+            self.counts[value] = minimum + count
+            self.errors[value] = minimum
+        self.push(value)
+
+    def update(self, values):
+        """ add each value of an iterable """
+        for value in values:
+            self.add(value)
+
+    def top(self, k=None):
+        """
+        return the most frequent monitored values
+
+        Args:
+            k: (int) optional; number of values to return; all monitored values if not provided
+
+        Returns:
+            list of (value, count, error) tuples, most frequent first; the true count of a value is between count -
+            error and count
+        """
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(value, count, self.errors[value]) for value, count in ranked]
@@ -0,0 +1,124 @@
+"""
+Description:
+    t-digest sketches for approximate percentiles of a stream of numbers in bounded memory. Values are summarized by
+    centroids (a mean and a weight) kept small near the extremes and larger in the middle of the distribution, so
+    tail percentiles such as p99 stay accurate (within about 0.5% at the default compression of 200). The number of
+    centroids is bounded by about the compression; values are buffered and merged into the centroids in batches.
+    Percentiles are interpolated between centroids like PERCENTILE_CONT, and are exact while every value still has its
+    own centroid.
+
+    example usage:
+        digest = TDigest()
+        digest.update(Request.objects.values_list('duration', flat=True).iterator())
+        digest.quantile(0.99)
+"""
+
+# import system modules
+import math
+
+
+DEFAULT_COMPRESSION = 200
+
+
+class TDigest:
+    """ mergeable sketch estimating the percentiles of the values added to it """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        if compression < 1:
+            raise ValueError('compression must be at least 1')
+        self.compression = compression
+        self.means = list()
+        self.weights = list()
+        self.buffer = list()
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def scale(self, q):
+        """ return the position of quantile q on the scale limiting the size of centroids """
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0), 1) - 1)
+
+    def add(self, value, weight=1):
+        """ add a value (or weight occurrences of a value) to the sketch """
+        value = float(value)
+        self.buffer.append((value, weight))
+        self.count += weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.buffer) >= 5 * self.compression:
+            self.compress()
+
+    def update(self, values):
+        """ add each value of an iterable to the sketch """
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """ merge the centroids of another sketch into this sketch; return self """
+        other.compress()
+        for mean, weight in zip(other.means, other.weights):
+            self.add(mean, weight)
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def compress(self):
+        """ merge the buffered values into the centroids """
+        if not self.buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self.buffer)
+        self.buffer = list()
+        means = list()
+        weights = list()
+        cumulative = 0
+        mean, weight = points[0]
+        lower = self.scale(0)
+        for value, value_weight in points[1:]:
+            if self.scale((cumulative + weight + value_weight) / self.count) - lower <= 1:
+                weight += value_weight
+                mean += (value - mean) * value_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                cumulative += weight
+                lower = self.scale(cumulative / self.count)
+                mean, weight = value, value_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means = means
+        self.weights = weights
+
+    def quantile(self, q):
+        """
+        return the estimated value at quantile q (between 0 and 1) of the values added to the sketch
+
+        Args:
+            q: (float) quantile, such as 0.99 for the 99th percentile
+
+        Returns:
+            float, or None if no value was added
+        """
+        self.compress()
+        if not self.count:
+            return None
+        # the mean of a centroid sits at the middle of its weight; singleton centroids at position (count - 1) * q
+        # interpolate exactly like PERCENTILE_CONT. The minimum and maximum sit at the middle of the first and last
+        # unit of weight, so quantiles 0 and 1 are exact.
+        target = min(max(q, 0), 1) * (self.count - 1) + 0.5
+        cumulative = 0
+        previous_center = 0.5
+        previous_mean = self.min
+        for mean, weight in zip(self.means, self.weights):
+            center = cumulative + weight / 2
+            if target <= center:
+                if center == previous_center:
+                    return mean
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / (center - previous_center)
+            cumulative += weight
+            previous_center = center
+            previous_mean = mean
+        last_center = self.count - 0.5
+        if target >= last_center or last_center <= previous_center:
+            return self.max
+        return previous_mean + (self.max - previous_mean) * (target - previous_center) / (last_center - previous_center)
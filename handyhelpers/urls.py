@@ -3,6 +3,7 @@ from django.http import HttpResponse
 from django.urls import path
 from django.utils import timezone
 from handyhelpers.views import action
+from handyhelpers.views import export
 from handyhelpers.views import htmx
 
 if "auditlog" in settings.INSTALLED_APPS:
@@ -34,6 +35,17 @@ urlpatterns = [
     ),
     # htmx views
     path("about", htmx.AboutProjectModalView.as_view(), name="about"),
+    # export job views
+    path(
+        "export_job_status/<str:job_id>/",
+        export.ExportJobStatusView.as_view(),
+        name="export_job_status",
+    ),
+    path(
+        "export_job_download/<str:job_id>/",
+        export.ExportJobDownloadView.as_view(),
+        name="export_job_download",
+    ),
 ]
 
 if "auditlog" in settings.INSTALLED_APPS:
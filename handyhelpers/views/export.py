@@ -1,45 +1,947 @@
 import datetime
 import csv
+import io
+import itertools
+import os
+import re
+import json
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 import xlwt
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import connections
+from django.db.models import Count, Max
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 from django.views.generic import View
-from handyhelpers.mixins.view_mixins import FilterByQueryParamsMixin
+from handyhelpers import export_jobs, export_partitions
+from handyhelpers.mixins.view_mixins import FilterByQueryParamsMixin, HtmxViewMixin
+from handyhelpers.xlsx import XlsxWriter
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
-class CsvExportView(FilterByQueryParamsMixin, View):
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# compression format: (file extension suffix, content type)
+COMPRESSION_FORMATS = {
+    'gzip': ('gz', 'application/gzip'),
+    'zstd': ('zst', 'application/zstd'),
+}
+
+
+def get_compressor(compression, level=None):
     """
-    View to dump a queryset to a csv file
+    return an incremental compressor object (with compress and flush methods)
+
+    Args:
+        compression: (str) 'gzip' or 'zstd' (requires zstandard)
+        level: (int) compression level; defaults to 6 for gzip and 3 for zstd
+    """
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+    return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def iter_compressed(chunks, compression, level=None):
+    """
+    compress an iterable of str/bytes chunks incrementally, yielding compressed chunks as they become available
+
+    Args:
+        chunks: iterable of str (utf-8 encoded) or bytes
+        compression: (str) 'gzip' or 'zstd' (requires zstandard)
+        level: (int) compression level; defaults to 6 for gzip and 3 for zstd
+
+    Returns:
+        generator of compressed bytes
+    """
+    compressor = get_compressor(compression, level)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def aiter_compressed(chunks, compression, level=None):
+    """ async counterpart of iter_compressed; compress an async iterable of str/bytes chunks incrementally """
+    compressor = get_compressor(compression, level)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def run_in_worker_thread(func, *args):
+    """
+    run a blocking function in a worker thread, outside of the event loop and Django's thread-sensitive executor, and
+    close the database connections it opened when done
+    """
+    def run():
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+    return await sync_to_async(run, thread_sensitive=False)()
+
+
+def get_accepted_encodings(request):
+    """ return the set of content codings accepted by the client, per the Accept-Encoding header """
+    accepted = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding.strip():
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def get_user_id(request):
+    """ return the id of the user making a request, or None for anonymous users """
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def render_export_job(request, job, status=200):
+    """
+    return a response describing a background export job; a htmx partial which polls until the job finishes for
+    htmx requests, json otherwise
+    """
+    status_url = reverse('handyhelpers:export_job_status', args=[job.id])
+    download_url = reverse('handyhelpers:export_job_download', args=[job.id])
+    if request.headers.get('Hx-Request', None):
+        context = dict(job=job, status_url=status_url, download_url=download_url,
+                       poll_interval=getattr(settings, 'HH_EXPORT_JOB_POLL_INTERVAL', '2s'))
+        return render(request, 'handyhelpers/htmx/bs5/export_job_status.htm', context, status=status)
+    data = job.as_dict()
+    data.update(status_url=status_url, download_url=download_url)
+    return JsonResponse(data, status=status)
+
+
+def iter_file_range(fileobj, length, block_size=64 * 1024):
+    """ yield length bytes from fileobj in blocks, closing it when done """
+    try:
+        while length > 0:
+            block = fileobj.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        fileobj.close()
+
+
+def ranged_file_response(request, path, filename, content_type, etag=None):
+    """
+    return a response serving a file as an attachment, honoring a single byte range in the Range header so
+    interrupted downloads can be resumed
+
+    Args:
+        request: request object
+        path: (str) path to the file
+        filename: (str) filename offered to the client
+        content_type: (str) content type of the file
+        etag: (str) optional entity tag; a Range request with a non-matching If-Range header gets the full file
+
+    Returns:
+        FileResponse (200), StreamingHttpResponse (206) or HttpResponse (416)
+    """
+    size = os.path.getsize(path)
+    match = RANGE_HEADER.match(request.headers.get('Range', '').strip())
+    if_range = request.headers.get('If-Range')
+    if match and any(match.groups()) and (not if_range or if_range == etag):
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start > end or start >= size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+        fileobj = open(path, 'rb')
+        fileobj.seek(start)
+        response = StreamingHttpResponse(iter_file_range(fileobj, end - start + 1), status=206,
+                                         content_type=content_type)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
+    else:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
+
+
+class ExportColumn:
+    """
+    A column of an export
+
+    Args:
+        path: field name or field path spanning relations (ex. owner__name); a path ending in a relation exports the
+              related id
+        label: column title; defaults to path
+        formatter: optional callable applied to each value of the column
+        field: model field the path resolves to
+        from_instance: if True the value is read from a model instance (default export of model fields) rather than
+                       from a values_list projection
+    """
+    def __init__(self, path, label=None, formatter=None, field=None, from_instance=False):
+        self.path = path
+        self.label = label or path
+        self.formatter = formatter
+        self.field = field
+        self.from_instance = from_instance
+
+
+def resolve_field_path(model, path):
+    """
+    return the model field a field path (ex. owner__name) resolves to; raise ImproperlyConfigured if invalid. Paths
+    through reverse foreign keys or many-to-many relations are rejected, as they would export a row per related object.
+    """
+    field = None
+    for name in path.split('__'):
+        if field is not None:
+            if not field.is_relation:
+                raise ImproperlyConfigured('invalid export column "{}"; "{}" is not a relation'.format(
+                    path, field.name))
+            model = field.related_model
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured('invalid export column "{}"; {} has no field "{}"'.format(
+                path, model._meta.label, name))
+        if field.one_to_many or field.many_to_many:
+            raise ImproperlyConfigured('invalid export column "{}"; "{}" is a to-many relation, which would export a '
+                                       'row per related object'.format(path, name))
+    return field
+
+
+def compile_export_columns(model, spec):
+    """
+    compile an export column spec into a list of ExportColumns
+
+    Args:
+        model: model the spec is relative to
+        spec: list of field paths (str) and/or dictionaries containing:
+                  field     - field path
+                  label     - column title (optional)
+                  formatter - callable applied to each value (optional)
+
+              example:
+                  ['name', 'owner__name', dict(field='created_at', label='Created', formatter=lambda v: v.date())]
+
+    Returns:
+        list of ExportColumn
+    """
+    columns = list()
+    for entry in spec:
+        if isinstance(entry, str):
+            entry = dict(field=entry)
+        columns.append(ExportColumn(entry['field'], label=entry.get('label'), formatter=entry.get('formatter'),
+                                    field=resolve_field_path(model, entry['field'])))
+    return columns
+
+
+class Echo:
+    """ file-like object that hands back whatever is written to it; lets csv.writer produce lines for streaming """
+    def write(self, value):
+        return value
+
+
+class BaseExportView(FilterByQueryParamsMixin, View):
+    """
+    Base view for exporting a queryset to a file. Rows are read with a chunked iterator and related fields are
+    joined in the same query, so exports do not instantiate the whole queryset or run a query per row.
 
     class parameters:
-        queryset - queryset to be rendered on the page
-        filename - filename for the output file created; model name used if not provided
+        queryset          - queryset to be rendered on the page
+        filename          - filename for the output file created; model name used if not provided
+        export_columns    - optional list of columns to export instead of all model fields; entries are field paths,
+                            which may span foreign key and one-to-one relations, or dictionaries (field, label,
+                            formatter). The columns are fetched with a single values_list projection, so only the
+                            exported columns are read and related values are joined in the same query. Paths ending
+                            in a relation export the related id.
+
+                            example:
+                                export_columns = ['name', 'owner__name',
+                                                  dict(field='created_at', label='created', formatter=format_date)]
+        chunk_size        - number of rows fetched from the database at a time
+        background        - if True, write the export in a background job and return its status instead of the
+                            file; the job can also be requested per call with a 'background' query parameter. Job
+                            status and download views are provided by the handyhelpers urls.
+        conditional       - if True, send an ETag header built from a fingerprint of the filtered queryset (row count
+                            plus the latest fingerprint_field value) and the exported columns, and answer matching
+                            conditional requests with 304 Not Modified
+        fingerprint_field - datetime field updated on every change to a row; defaults to updated_at (as provided by
+                            HandyHelperBaseModel). Models without this field are fingerprinted by row count only.
+        cache_timeout     - if set, cache the rendered export under its fingerprint for this many seconds
+                            (requires conditional)
+        spool_max_size    - size in bytes an export file is held in memory before rolling over to disk
+        partitioned       - if True, split the queryset into primary key ranges converted in parallel by worker
+                            processes (each with its own database connection) and join them in primary key order;
+                            querysets without an integer primary key are exported serially. The view class must be
+                            defined at module level.
+        partition_workers - number of worker processes for partitioned exports; defaults to the number of cpus
+        partition_size    - width of the primary key range handled by each partition
     """
     queryset = None
     filename = None
+    file_extension = None
+    content_type = None
+    export_columns = None
+    chunk_size = 2000
+    background = False
+    conditional = False
+    fingerprint_field = 'updated_at'
+    cache_timeout = None
+    spool_max_size = getattr(settings, 'HH_EXPORT_SPOOL_MAX_SIZE', 10 * 1024 * 1024)
+    partitioned = False
+    partition_workers = getattr(settings, 'HH_EXPORT_PARTITION_WORKERS', None)
+    partition_size = 100000
 
-    def get(self, request):
+    def get_filename(self):
+        """ return the filename for the output file """
+        return self.filename or "{}.{}".format(self.queryset.model._meta.model_name, self.file_extension)
+
+    def get_export_fields(self, model=None):
+        """ return the list of model fields to include in the export """
+        return (model or self.queryset.model)._meta.fields
+
+    def get_export_queryset(self):
+        """ return the queryset to export, filtered by query parameters """
+        return self.filter_by_query_params()
+
+    def get_export_querysets(self):
+        """ return a list of all querysets written to the export """
+        return [self.get_export_queryset()]
+
+    def get_export_columns(self, model=None, spec=None):
+        """
+        return the list of ExportColumns to export
+
+        Args:
+            model: model to export; defaults to the model of queryset, with the export_columns spec
+            spec: export column spec (see export_columns); all fields from get_export_fields if not provided
+
+        Returns:
+            list of ExportColumn
+        """
+        if model is None:
+            model, spec = self.queryset.model, self.export_columns
+        if spec:
+            return compile_export_columns(model, spec)
+        return [ExportColumn(field.name, field=field, from_instance=True) for field in self.get_export_fields(model)]
+
+    @staticmethod
+    def get_column_converter(field):
+        """ return a callable converting a model instance to the export value of a given field """
+        name = field.name
+        if field.is_relation:
+            def convert(row):
+                value = getattr(row, name)
+                return None if value is None else str(value)
+        else:
+            def convert(row):
+                return getattr(row, name)
+        return convert
+
+    @staticmethod
+    def get_column_formatter(column):
+        """ return a callable applied to each projected value of a column, or None to export values as read """
+        return column.formatter
+
+    def get_row_reader(self, queryset, columns):
+        """
+        return the queryset rows of an export are read from and a callable converting a row to its export values
+
+        Args:
+            queryset: queryset to export
+            columns: list of ExportColumn
+
+        Returns:
+            tuple of (queryset, convert); convert is None when rows are exported as read
+        """
+        if not columns or columns[0].from_instance:
+            related = [column.field.name for column in columns if column.field.is_relation]
+            if related:
+                queryset = queryset.select_related(*related)
+            converters = [self.get_column_converter(column.field) for column in columns]
+            return queryset, lambda row: [convert(row) for convert in converters]
+        formatters = [self.get_column_formatter(column) for column in columns]
+        queryset = queryset.values_list(*[column.path for column in columns])
+        if not any(formatters):
+            return queryset, None
+        formatters = [formatter or (lambda value: value) for formatter in formatters]
+        return queryset, lambda row: [formatter(value) for formatter, value in zip(formatters, row)]
+
+    def iter_rows(self, queryset, columns):
+        """ yield a list of export values per row in the queryset """
+        queryset, convert = self.get_row_reader(queryset, columns)
+        rows = queryset.iterator(chunk_size=self.chunk_size)
+        yield from rows if convert is None else map(convert, rows)
+
+    async def aiter_rows(self, queryset, columns):
+        """
+        async counterpart of iter_rows; the rows of a chunked iterator are fetched chunk_size rows at a time on a
+        thread dedicated to this export, so the event loop only waits on the database once per chunk and concurrent
+        exports do not queue on Django's shared thread-sensitive executor (as QuerySet.aiterator would). The iterator
+        keeps its database connection and cursor on that thread, and the connection is closed when iteration ends.
+        """
+        queryset, convert = self.get_row_reader(queryset, columns)
+        rows = queryset.iterator(chunk_size=self.chunk_size)
+        executor = ThreadPoolExecutor(max_workers=1)
+        fetch = sync_to_async(lambda: list(itertools.islice(rows, self.chunk_size)), thread_sensitive=False,
+                              executor=executor)
         try:
-            model = self.queryset.model
-            if not self.filename:
-                self.filename = "{}.csv".format(model._meta.model_name)
-            response = HttpResponse(content_type='text/csv')
-            cd = 'attachment; filename="{0}"'.format(self.filename)
-            response['Content-Disposition'] = cd
-            headers = [field.name for field in model._meta.fields]
-            writer = csv.DictWriter(response, fieldnames=headers)
-            writer.writeheader()
+            while True:
+                chunk = await fetch()
+                for row in chunk:
+                    yield row if convert is None else convert(row)
+                if len(chunk) < self.chunk_size:
+                    break
+        finally:
+            def close():
+                rows.close()
+                connections.close_all()
+            await sync_to_async(close, thread_sensitive=False, executor=executor)()
+            executor.shutdown(wait=False)
 
-            queryset = self.filter_by_query_params()
-            for row in queryset:
-                writer.writerow({column: str(getattr(row, column)) for column in headers})
+    def get_partition_view_kwargs(self):
+        """ return the view attributes needed to convert a partition in a worker process """
+        return dict(chunk_size=self.chunk_size)
+
+    def export_partition(self, queryset, columns):
+        """ convert the rows of one partition; runs in a worker process for partitioned exports """
+        return list(self.iter_rows(queryset, columns))
+
+    def iter_partitions(self, queryset, spec=None):
+        """
+        return a generator of converted partitions in primary key order, or None if not exporting partitioned
+
+        Args:
+            queryset: queryset to export
+            spec: export column spec the partitions are converted with; must be picklable (no lambdas)
+        """
+        if not self.partitioned:
+            return None
+        return export_partitions.iter_partitions(self, queryset, spec, workers=self.partition_workers,
+                                                 partition_size=self.partition_size)
+
+    def write_export(self, fileobj):
+        """ write the export to a binary file object """
+        raise NotImplementedError
+
+    def use_background(self):
+        """ return True if the export should be run as a background job """
+        return self.background or 'background' in self.request.GET.dict()
+
+    def start_background_export(self):
+        """ submit (or join an identical running) background export job and return its status """
+        key = export_jobs.get_queryset_key(type(self).__module__, type(self).__qualname__, self.file_extension,
+                                           self.get_filename(), self.get_export_variant(), *self.get_export_querysets())
+        job = export_jobs.submit_export_job(key, self.get_filename(), self.content_type, self.write_export,
+                                            user_id=get_user_id(self.request))
+        return render_export_job(self.request, job, status=202)
+
+    def get_export_column_key(self):
+        """ return the paths and labels of the exported columns, so changing the columns changes the fingerprint """
+        return [(column.path, column.label) for column in self.get_export_columns()]
+
+    def get_export_fingerprint(self):
+        """
+        return the ETag of the export; one aggregate query per exported queryset. The latest fingerprint_field value
+        only distinguishes versions of the export and is not sent as Last-Modified, as deleting rows never moves it
+        forward.
+
+        Returns:
+            quoted etag string
+        """
+        parts = list()
+        for queryset in self.get_export_querysets():
+            aggregates = dict(count=Count('pk'))
+            if self.fingerprint_field in [field.name for field in queryset.model._meta.fields]:
+                aggregates['last_modified'] = Max(self.fingerprint_field)
+            result = queryset.aggregate(**aggregates)
+            parts.extend([queryset, result['count'], result.get('last_modified')])
+        key = export_jobs.get_queryset_key(type(self).__module__, type(self).__qualname__, self.file_extension,
+                                           self.get_filename(), self.get_export_variant(),
+                                           self.get_export_column_key(), *parts)
+        return quote_etag(key)
+
+    def get_export_variant(self):
+        """ return a string distinguishing representations of the same export (such as content encoding) """
+        return ''
+
+    def build_response(self):
+        """ return a response containing the export, written to a spooled temporary file """
+        fileobj = tempfile.SpooledTemporaryFile(max_size=self.spool_max_size)
+        self.write_export(fileobj)
+        fileobj.seek(0)
+        return FileResponse(fileobj, as_attachment=True, filename=self.get_filename(),
+                            content_type=self.content_type)
+
+    def build_cached_response(self, etag):
+        """ return a response containing the export, rendering it only if not already cached under etag """
+        cache_key = 'handyhelpers.export.{}'.format(etag.strip('"'))
+        cached = cache.get(cache_key)
+        if cached is None:
+            response = self.build_response()
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            response.close()
+            headers = {header: response[header] for header in ('Content-Type', 'Content-Disposition',
+                                                                'Content-Encoding', 'Vary')
+                       if response.has_header(header)}
+            cached = dict(content=content, headers=headers)
+            cache.set(cache_key, cached, self.cache_timeout)
+        response = HttpResponse(cached['content'])
+        for header, value in cached['headers'].items():
+            response[header] = value
+        return response
+
+    @staticmethod
+    def set_validators(response, etag):
+        """ add the ETag header of a conditional export to a response """
+        response['ETag'] = etag
+        return response
+
+    def get_not_modified_response(self, etag):
+        """ return a 304/412 response if the request's conditions match the fingerprint, otherwise None """
+        response = get_conditional_response(self.request, etag=etag)
+        return None if response is None else self.set_validators(response, etag)
+
+    def get(self, request):
+        try:
+            if self.use_background():
+                return self.start_background_export()
+            if not self.conditional:
+                return self.build_response()
+            etag = self.get_export_fingerprint()
+            response = self.get_not_modified_response(etag)
+            if response is None:
+                response = self.build_cached_response(etag) if self.cache_timeout else self.build_response()
+                self.set_validators(response, etag)
             return response
         except AttributeError:
-            return HttpResponse(content_type='text/csv')
+            return HttpResponse(content_type=self.content_type)
+
+
+class CsvExportView(BaseExportView):
+    """
+    View to dump a queryset to a csv file
+
+    class parameters:
+        queryset              - queryset to be rendered on the page
+        filename              - filename for the output file created; model name used if not provided
+        streaming             - if True, stream rows to the client as they are read instead of building the file in
+                                memory
+        chunk_size            - number of rows fetched from the database (and written to the stream) at a time
+        compression           - compress the csv file as it is written; 'gzip' or 'zstd' (requires zstandard). Can
+                                also be requested per call with a 'compression' query parameter. The filename gets a
+                                .gz/.zst suffix.
+        compression_level     - compression level; defaults to 6 for gzip and 3 for zstd
+        negotiate_compression - if True and no compression is set or requested, compress with a coding accepted in
+                                the Accept-Encoding header (zstd preferred) and send it as the Content-Encoding, so
+                                clients decompress transparently and save a plain csv file
+    """
+    file_extension = 'csv'
+    content_type = 'text/csv'
+    streaming = False
+    compression = None
+    compression_level = None
+    negotiate_compression = False
+
+    def get_compression(self):
+        """
+        return the compression to apply to this response
+
+        Returns:
+            tuple of (compression, is_content_encoding); compression is None if the csv is not compressed
+        """
+        requested = self.request.GET.get('compression') or self.compression
+        if requested:
+            if requested not in COMPRESSION_FORMATS or (requested == 'zstd' and zstandard is None):
+                return None, False
+            return requested, False
+        if self.negotiate_compression:
+            accepted = get_accepted_encodings(self.request)
+            if 'zstd' in accepted and zstandard is not None:
+                return 'zstd', True
+            if 'gzip' in accepted:
+                return 'gzip', True
+        return None, False
+
+    def get_filename(self):
+        """ return the filename for the output file, including the suffix of the compression applied """
+        filename = super().get_filename()
+        compression, is_content_encoding = self.get_compression()
+        if compression and not is_content_encoding:
+            filename = '{}.{}'.format(filename, COMPRESSION_FORMATS[compression][0])
+        return filename
+
+    def get_export_variant(self):
+        """ return the compression applied, so compressed and plain responses get different fingerprints """
+        return '{}:{}'.format(*self.get_compression())
+
+    @staticmethod
+    def get_column_converter(field):
+        """ return a callable converting a model instance to the display string of a given field """
+        name = field.name
+
+        def convert(row):
+            return str(getattr(row, name))
+        return convert
+
+    @staticmethod
+    def get_column_formatter(column):
+        """ return a callable converting a projected value of a column to its display string """
+        formatter = column.formatter
+        if formatter is None:
+            return str
+        return lambda value: str(formatter(value))
+
+    def export_partition(self, queryset, columns):
+        """ return the csv content of one partition; runs in a worker process for partitioned exports """
+        writer = csv.writer(Echo())
+        return ''.join(writer.writerow(row) for row in self.iter_rows(queryset, columns))
+
+    def iter_csv(self, columns):
+        """ yield the csv content in chunks of chunk_size rows (or one chunk per partition) """
+        writer = csv.writer(Echo())
+        queryset = self.get_export_queryset()
+        partitions = self.iter_partitions(queryset, self.export_columns)
+        if partitions is not None:
+            yield writer.writerow([column.label for column in columns])
+            yield from partitions
+            return
+        chunk = [writer.writerow([column.label for column in columns])]
+        for row in self.iter_rows(queryset, columns):
+            chunk.append(writer.writerow(row))
+            if len(chunk) >= self.chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+    def write_export(self, fileobj):
+        """ write the csv content, compressed if compression is set or requested, to a binary file object """
+        compression, is_content_encoding = self.get_compression()
+        if compression and not is_content_encoding:
+            for chunk in iter_compressed(self.iter_csv(self.get_export_columns()), compression,
+                                         self.compression_level):
+                fileobj.write(chunk)
+            return
+        stream = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+        stream.writelines(self.iter_csv(self.get_export_columns()))
+        stream.flush()
+        stream.detach()
+
+    async def aiter_csv(self, columns):
+        """ async counterpart of iter_csv; yield the csv content in chunks of chunk_size rows """
+        writer = csv.writer(Echo())
+        chunk = [writer.writerow([column.label for column in columns])]
+        async for row in self.aiter_rows(self.get_export_queryset(), columns):
+            chunk.append(writer.writerow(row))
+            if len(chunk) >= self.chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+    def finalize_response(self, response, compression, is_content_encoding):
+        """ add the attachment filename and any content encoding headers to a csv response """
+        response['Content-Disposition'] = 'attachment; filename="{0}"'.format(self.get_filename())
+        if is_content_encoding:
+            response['Content-Encoding'] = compression
+        if self.negotiate_compression:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    @staticmethod
+    def get_response_content_type(compression, is_content_encoding):
+        """ return the content type of a csv response with a given compression """
+        if compression and not is_content_encoding:
+            return COMPRESSION_FORMATS[compression][1]
+        return 'text/csv'
+
+    def build_response(self):
+        """ return a response containing the csv content """
+        compression, is_content_encoding = self.get_compression()
+        content = self.iter_csv(self.get_export_columns())
+        content_type = self.get_response_content_type(compression, is_content_encoding)
+        if compression:
+            content = iter_compressed(content, compression, self.compression_level)
+        if self.streaming:
+            response = StreamingHttpResponse(content, content_type=content_type)
+        else:
+            response = HttpResponse(content_type=content_type)
+            for chunk in content:
+                response.write(chunk)
+        return self.finalize_response(response, compression, is_content_encoding)
+
+
+class XlsxExportView(BaseExportView):
+    """
+    View to dump a queryset to a xlsx file. Rows are streamed into a spooled temporary file in constant memory and
+    sheets holding more than 1,048,576 rows are continued on additional sheets. Values keep their native types.
+
+    class parameters:
+        queryset        - queryset to be rendered on the page
+        filename        - filename for the output file created; model name used if not provided
+        sheets          - optional list of dictionaries (title, queryset, columns) to write as separate sheets of one
+                          workbook; columns is an optional export column spec for the sheet (see export_columns).
+                          Query parameter filters only apply to queryset, these are written as provided.
+
+                          example:
+                              sheets = [dict(title='owners', queryset=Owner.objects.all()),
+                                        dict(title='hosts', queryset=Host.objects.all(),
+                                             columns=['name', 'owner__name'])]
+        chunk_size      - number of rows fetched from the database at a time
+        spool_max_size  - size in bytes the workbook is held in memory before rolling over to disk
+    """
+    file_extension = 'xlsx'
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    sheets = None
+
+    def get_sheets(self):
+        """ return a list of (title, queryset, export column spec) tuples to write to the workbook """
+        if self.sheets:
+            return [(sheet.get('title') or sheet['queryset'].model._meta.model_name, sheet['queryset'],
+                     sheet.get('columns')) for sheet in self.sheets]
+        return [(self.queryset.model._meta.model_name, self.get_export_queryset(), self.export_columns)]
+
+    def get_export_querysets(self):
+        """ return a list of all querysets written to the workbook """
+        return [queryset for title, queryset, spec in self.get_sheets()]
+
+    def get_export_column_key(self):
+        """ return the title and the paths and labels of the columns of each sheet """
+        return [(title, [(column.path, column.label) for column in self.get_export_columns(queryset.model, spec)])
+                for title, queryset, spec in self.get_sheets()]
+
+    def write_export(self, fileobj):
+        """ write the workbook for all sheets to a binary file object """
+        writer = XlsxWriter(fileobj)
+        for title, queryset, spec in self.get_sheets():
+            columns = self.get_export_columns(queryset.model, spec)
+            writer.add_sheet(title, header=[column.label for column in columns])
+            partitions = self.iter_partitions(queryset, spec)
+            if partitions is None:
+                writer.write_rows(self.iter_rows(queryset, columns))
+            else:
+                for rows in partitions:
+                    writer.write_rows(rows)
+        writer.close()
+
+
+class ParquetExportView(BaseExportView):
+    """
+    View to dump a queryset to a parquet file; requires pyarrow (without it, routed views fail the handyhelpers.E001
+    system check and requests get a 501 response). Rows are read in values_list batches of chunk_size rows, each
+    written as a typed row group as it is read, so memory use is bounded by the batch size. Columns keep their
+    native types (integers, booleans, decimals, dates, datetimes, ...); foreign keys are written as the raw related
+    id under their column name (ex. owner_id). Columns given a formatter in export_columns are written as strings.
+
+    class parameters:
+        queryset    - queryset to be rendered on the page
+        filename    - filename for the output file created; model name used if not provided
+        chunk_size  - number of rows read from the database and written per row group
+        compression - parquet compression codec; defaults to snappy
+    """
+    file_extension = 'parquet'
+    content_type = 'application/vnd.apache.parquet'
+    chunk_size = 50000
+    compression = 'snappy'
+
+    def dispatch(self, request, *args, **kwargs):
+        """ respond with 501 Not Implemented when pyarrow is missing (also reported by the handyhelpers.E001 check) """
+        if pyarrow is not None:
+            return super().dispatch(request, *args, **kwargs)
+        response = HttpResponse('parquet exports are not available; pyarrow is not installed', status=501,
+                                content_type='text/plain')
+        if self.view_is_async:
+            async def func():
+                return response
+            return func()
+        return response
+
+    @staticmethod
+    def get_arrow_type(field):
+        """ return the pyarrow type and an optional value converter for a model field """
+        if field.is_relation:
+            return ParquetExportView.get_arrow_type(field.target_field)
+        internal_type = field.get_internal_type()
+        if internal_type in ('AutoField', 'IntegerField', 'PositiveIntegerField', 'SmallAutoField',
+                             'SmallIntegerField', 'PositiveSmallIntegerField'):
+            return pyarrow.int32(), None
+        if internal_type in ('BigAutoField', 'BigIntegerField', 'PositiveBigIntegerField'):
+            return pyarrow.int64(), None
+        if internal_type == 'BooleanField':
+            return pyarrow.bool_(), None
+        if internal_type == 'FloatField':
+            return pyarrow.float64(), None
+        if internal_type == 'DecimalField' and field.max_digits <= 38:
+            return pyarrow.decimal128(field.max_digits, field.decimal_places), None
+        if internal_type == 'DateTimeField':
+            return pyarrow.timestamp('us', tz='UTC' if settings.USE_TZ else None), None
+        if internal_type == 'DateField':
+            return pyarrow.date32(), None
+        if internal_type == 'TimeField':
+            return pyarrow.time64('us'), None
+        if internal_type == 'DurationField':
+            return pyarrow.duration('us'), None
+        if internal_type == 'BinaryField':
+            return pyarrow.binary(), lambda value: None if value is None else bytes(value)
+        if internal_type == 'JSONField':
+            return pyarrow.string(), lambda value: None if value is None else json.dumps(value, default=str)
+        return pyarrow.string(), lambda value: None if value is None else str(value)
+
+    def get_export_columns(self, model=None, spec=None):
+        """ return the list of ExportColumns to export; model fields are read by attname, so foreign keys are ids """
+        if model is None:
+            model, spec = self.queryset.model, self.export_columns
+        if spec:
+            return compile_export_columns(model, spec)
+        return [ExportColumn(field.attname, field=field) for field in self.get_export_fields(model)]
+
+    def get_column_schema(self, column):
+        """ return the pyarrow field and an optional value converter for an ExportColumn """
+        if column.formatter:
+            return pyarrow.field(column.label, pyarrow.string()), lambda value: None if value is None else str(value)
+        arrow_type, convert = self.get_arrow_type(column.field)
+        # values read across a relation are null whenever the relation is
+        nullable = column.field.null or '__' in column.path
+        return pyarrow.field(column.label, arrow_type, nullable=nullable), convert
+
+    def iter_batches(self, queryset, columns):
+        """ yield a list of rows (tuples of column values) per chunk_size rows of the queryset """
+        batch = list()
+        for row in self.iter_rows(queryset, columns):
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                yield batch
+                batch = list()
+        if batch:
+            yield batch
+
+    def write_export(self, fileobj):
+        """ write the parquet file to a binary file object, one row group per batch """
+        if pyarrow is None:
+            raise ImproperlyConfigured('ParquetExportView requires pyarrow; pip install pyarrow')
+        columns = self.get_export_columns()
+        arrow_fields, converters = zip(*[self.get_column_schema(column) for column in columns])
+        schema = pyarrow.schema(arrow_fields)
+        with pyarrow.parquet.ParquetWriter(fileobj, schema, compression=self.compression) as writer:
+            for batch in self.iter_batches(self.get_export_queryset(), columns):
+                arrays = [pyarrow.array(values if convert is None else [convert(i) for i in values], type=field.type)
+                          for values, field, convert in zip(zip(*batch), arrow_fields, converters)]
+                writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+
+
+class AsyncExportMixin:
+    """
+    Mixin providing an async get handler for export views served under ASGI. Blocking work (fingerprints, background
+    job submission and writing files) runs in a worker thread rather than in Django's thread-sensitive executor, so
+    one large export does not serialize other sync views; AsyncCsvExportView streams rows with async queryset
+    iteration instead. Streaming from an async generator requires Django 4.2 or later.
+    """
+    async def build_async_response(self):
+        """ return a response containing the export; written by build_response in a worker thread """
+        return await run_in_worker_thread(self.build_response)
+
+    async def get(self, request):
+        try:
+            if self.use_background():
+                return await run_in_worker_thread(self.start_background_export)
+            if not self.conditional:
+                return await self.build_async_response()
+            etag = await run_in_worker_thread(self.get_export_fingerprint)
+            response = self.get_not_modified_response(etag)
+            if response is not None:
+                return response
+            if self.cache_timeout:
+                response = await run_in_worker_thread(self.build_cached_response, etag)
+            else:
+                response = await self.build_async_response()
+            return self.set_validators(response, etag)
+        except AttributeError:
+            return HttpResponse(content_type=self.content_type)
+
+
+class AsyncCsvExportView(AsyncExportMixin, CsvExportView):
+    """
+    Async view to stream a queryset to a csv file under ASGI. Rows are read chunk_size rows at a time on a thread
+    dedicated to the export, and sent through a StreamingHttpResponse with an async generator; the next chunk is
+    only read once the server has taken the previous one, so a slow client applies backpressure instead of rows
+    piling up in memory. Compression is applied incrementally as with CsvExportView. Partitioned and non-streaming
+    exports are written in a worker thread.
+
+    class parameters:
+        see CsvExportView; streaming defaults to True
+    """
+    streaming = True
+
+    async def build_async_response(self):
+        """ return a response streaming the csv content from an async generator """
+        if not self.streaming or self.partitioned:
+            return await super().build_async_response()
+        compression, is_content_encoding = self.get_compression()
+        content = self.aiter_csv(self.get_export_columns())
+        if compression:
+            content = aiter_compressed(content, compression, self.compression_level)
+        response = StreamingHttpResponse(content,
+                                         content_type=self.get_response_content_type(compression, is_content_encoding))
+        return self.finalize_response(response, compression, is_content_encoding)
+
+
+class AsyncXlsxExportView(AsyncExportMixin, XlsxExportView):
+    """
+    Async variant of XlsxExportView for ASGI; the workbook is written in a worker thread, off the event loop and
+    Django's thread-sensitive executor
+
+    class parameters:
+        see XlsxExportView
+    """
+
+
+class AsyncParquetExportView(AsyncExportMixin, ParquetExportView):
+    """
+    Async variant of ParquetExportView for ASGI; the parquet file is written in a worker thread, off the event loop
+    and Django's thread-sensitive executor
+
+    class parameters:
+        see ParquetExportView
+    """
 
 
 class ExcelExportView(FilterByQueryParamsMixin, View):
     """
-    View to dump a queryset to a xls file
+    View to dump a queryset to a xls file. The xls format is limited to 65,536 rows; use XlsxExportView for larger
+    querysets.
 
     class parameters:
         queryset - queryset to be rendered on the page
@@ -87,3 +989,27 @@ class ExcelExportView(FilterByQueryParamsMixin, View):
 
         except AttributeError:
             return HttpResponse(content_type='application/ms-excel')
+
+
+class ExportJobStatusView(HtmxViewMixin, View):
+    """
+    View returning the status of a background export job; a htmx partial (polling until the job finishes) for htmx
+    requests, json otherwise.
+    """
+
+    def get(self, request, job_id):
+        job = export_jobs.get_export_job(job_id, user_id=get_user_id(request))
+        if not job:
+            raise Http404('export job not found')
+        return render_export_job(request, job)
+
+
+class ExportJobDownloadView(View):
+    """ View to download the file of a finished background export job; supports resuming with Range requests. """
+
+    def get(self, request, job_id):
+        job = export_jobs.get_export_job(job_id, user_id=get_user_id(request))
+        if not job or job.status != export_jobs.COMPLETE:
+            raise Http404('export not available')
+        return ranged_file_response(request, job.path, job.filename, job.content_type,
+                                    etag='"{}-{}"'.format(job.id, job.size))
@@ -1,9 +1,35 @@
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.db.models import QuerySet
 from django.shortcuts import render
+from django.utils.functional import cached_property
 from django.views.generic import ListView, View
 
 from handyhelpers.mixins.view_mixins import FilterByQueryParamsMixin
+from handyhelpers.querysets import approximate_count
+
+
+class ApproximateCountPaginator(Paginator):
+    """Paginator counting unfiltered querysets of large tables from the row estimate of the database planner instead
+    of a full table scan. Filtered querysets and small tables are counted exactly. When the count is an estimate,
+    count_estimated is set and the last page may hold fewer objects than expected.
+
+    parameters:
+        count_threshold - estimates below this number are replaced with an exact count; defaults to the
+                          HH_APPROXIMATE_COUNT_THRESHOLD setting (100000)
+    """
+
+    def __init__(self, *args, count_threshold=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_threshold = count_threshold
+        self.count_estimated = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        count, self.count_estimated = approximate_count(self.object_list, self.count_threshold)
+        return count
 
 
 class HandyHelperGenericBaseView(View):
@@ -756,6 +782,10 @@ class HandyHelperPaginatedListView(HandyHelperGenericBaseListView):
         elided_on_each_side - number of pages to show on either side of an ellipsis
         elided_on_ends      - number of pages to show on ends when ellipsis is present
         include_total       - display the total number of objects on the page (below pagination controls)
+        approximate_count   - estimate the total number of objects of an unfiltered queryset of a large table from
+                              database statistics instead of counting them
+        approximate_count_threshold - estimates below this number are replaced with an exact count; defaults to the
+                                      HH_APPROXIMATE_COUNT_THRESHOLD setting (100000)
 
         create_form_obj            - create form object
         create_form_url            - url the create form (action) should post to
@@ -792,6 +822,8 @@ class HandyHelperPaginatedListView(HandyHelperGenericBaseListView):
     elided_on_each_side = 1
     elided_on_ends = 1
     include_total = True
+    approximate_count = False
+    approximate_count_threshold = None
     template_name = "handyhelpers/generic/bs5/generic_list.html"
 
     create_form = dict()
@@ -828,7 +860,14 @@ class HandyHelperPaginatedListView(HandyHelperGenericBaseListView):
             page = int(request.GET.get("page", 1))
         except ValueError:
             page = 1
-        paginator = Paginator(self.filter_by_query_params(), per_page=self.paginate_by)
+        if self.approximate_count:
+            paginator = ApproximateCountPaginator(
+                self.filter_by_query_params(),
+                per_page=self.paginate_by,
+                count_threshold=self.approximate_count_threshold,
+            )
+        else:
+            paginator = Paginator(self.filter_by_query_params(), per_page=self.paginate_by)
         if page > paginator.num_pages:
             page = paginator.num_pages
         page_object = paginator.get_page(page)
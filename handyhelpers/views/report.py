@@ -1,11 +1,43 @@
+from asgiref.sync import sync_to_async
+from django.apps import apps
 from django.views.generic import View
 from django.utils import timezone
+from django.core.exceptions import EmptyResultSet, ImproperlyConfigured
+from django.db import connections
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.core.cache import cache
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
 from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import urlencode
+import asyncio
 import datetime
 import calendar
+import functools
+import decimal
+import hashlib
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dateutil.rrule import rrule, MONTHLY
 from handyhelpers.mixins.view_mixins import HtmxViewMixin
+from handyhelpers.downsampling import downsample_series
+from handyhelpers.querysets import (count_by_period, count_top_values, get_count_estimate, is_unfiltered, sample_counts,
+                                    shift_period, truncate_timestamp)
+from handyhelpers.spacesaving import SpaceSaving
+
+
+# default number of points plotted per chart; longer series are downsampled
+CHART_MAX_POINTS = getattr(settings, 'HH_CHART_MAX_POINTS', 500)
+
+# windows top values can be counted over; None counts all entries
+TOP_VALUES_WINDOWS = ('day', 'week', 'month', 'year', None)
+
+# label formats of the points of period trend charts
+PERIOD_LABEL_FORMATS = {'minute': '%Y-%m-%d %H:%M', 'hour': '%Y-%m-%d %H:%M', 'day': '%Y-%m-%d', 'week': '%Y-%m-%d',
+                        'month': '%b %Y', 'quarter': '%b %Y', 'year': '%Y'}
 
 
 def get_color_list():
@@ -94,36 +126,487 @@ def get_dated_data(queryset, ts_lookup):
     return data_day, data_week, data_month, data_year
 
 
-def build_annual_progress_chart(dataset_list):
+def get_query_sql(queryset):
+    """ return the database alias and SQL of a queryset, or None if the queryset can not match any rows """
+    try:
+        return queryset.db, str(queryset.query)
+    except EmptyResultSet:
+        return None
+
+
+def get_rollup_daily_counts(dataset, start=None):
     """
-    process a list of datasets and return data required to plot an annual progress chart
+    return the number of entries per day of a dataset read from the rollup named by its 'rollup' key, restricted to
+    the dimension value of its optional 'rollup_dimension' key; requires handyhelpers.rollups
 
     Args:
-        dataset_list - (list of dictionaries) set of data to display; list of dictionaries containing the following:
-                       title     - title to display for dataset
-                       queryset  - queryset to use in counts
-                       dt_field  - datetime field in model
+        dataset: (dictionary) dataset containing a rollup
+        start: (date) optional; first day to include
 
-                       example:
-                           [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at'}, ...]
+    Returns:
+        dictionary of date: count
+    """
+    if not apps.is_installed('handyhelpers.rollups'):
+        raise ImproperlyConfigured('datasets using a rollup require handyhelpers.rollups in INSTALLED_APPS')
+    from handyhelpers.rollups.registry import get_rollup
+    return get_rollup(dataset.get('rollup')).get_daily_counts(start=start, dimension=dataset.get('rollup_dimension'))
+
+
+def get_rollup_daily_sketches(dataset, start=None):
+    """
+    return the HyperLogLog sketch of the distinct values per day of a dataset read from the rollup named by its
+    'rollup' key, restricted to the dimension value of its optional 'rollup_dimension' key; requires
+    handyhelpers.rollups and a rollup with a distinct_field
+
+    Args:
+        dataset: (dictionary) dataset containing a rollup
+        start: (date) optional; first day to include
 
     Returns:
-        tuple containing:
-            list of month labels
-            list of month timestamps
-            list of dictionaries containing data needed to plot chart
+        dictionary of date: HyperLogLog
+    """
+    if not apps.is_installed('handyhelpers.rollups'):
+        raise ImproperlyConfigured('datasets using a rollup require handyhelpers.rollups in INSTALLED_APPS')
+    from handyhelpers.rollups.registry import get_rollup
+    return get_rollup(dataset.get('rollup')).get_daily_sketches(start=start,
+                                                                dimension=dataset.get('rollup_dimension'))
+
+
+def get_local_date(timestamp):
+    """ return the date of a timestamp in the current time zone """
+    return timezone.localdate(timestamp) if timezone.is_aware(timestamp) else timestamp.date()
+
+
+def run_tasks(tasks, max_workers=None):
+    """
+    call a list of functions and return their results in order; concurrently in a pool of up to max_workers threads
+    if max_workers is more than 1. Database connections opened by the threads are closed when they finish.
+
+    Args:
+        tasks: list of callables taking no arguments
+        max_workers: (int) maximum number of functions run at a time; None to run them one after another
+
+    Returns:
+        list of results
+    """
+    if not max_workers or max_workers < 2 or len(tasks) < 2:
+        return [task() for task in tasks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)), thread_name_prefix='handyhelpers-report') as pool:
+        return list(pool.map(call_closing_connections, tasks))
+
+
+async def arun_tasks(tasks, max_concurrency=None):
+    """
+    async counterpart of run_tasks; call a list of functions in worker threads with asyncio.gather, at most
+    max_concurrency at a time. Django's async queryset methods all run in one thread-sensitive executor, so queries
+    issued through them would still run one after another.
+
+    Args:
+        tasks: list of callables taking no arguments
+        max_concurrency: (int) maximum number of functions run at a time; no limit if not provided
+
+    Returns:
+        list of results
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or len(tasks) or 1)
+
+    async def run(task):
+        async with semaphore:
+            return await sync_to_async(call_closing_connections, thread_sensitive=False)(task)
+    return list(await asyncio.gather(*[run(task) for task in tasks]))
+
+
+def call_closing_connections(task):
+    """ call a function in a worker thread and close the database connections of the thread afterwards """
+    try:
+        return task()
+    finally:
+        connections.close_all()
+
+
+def get_dataset_aggregations(dataset):
+    """ return the dictionary of name: aggregate of the value aggregations declared by a dataset """
+    aggregations = dataset.get('aggregations') or dict()
+    if aggregations and dataset.get('rollup'):
+        raise ImproperlyConfigured('value aggregations are not available for datasets using a rollup')
+    return aggregations
+
+
+def get_filtered_aggregate(aggregate, condition):
+    """ return a copy of an aggregate (such as Sum('amount')) restricted to the rows matching a condition """
+    aggregate = aggregate.copy()
+    if condition:
+        aggregate.filter = condition & aggregate.filter if aggregate.filter else condition
+    return aggregate
+
+
+def get_chart_value(value):
+    """ return a value as plotted by chartjs; decimals are converted to floats and durations to seconds """
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return value
+
+
+def get_window_bounds(window):
+    """ return the (start, end) timestamps of a window given as a start timestamp or a (start, end) tuple """
+    return window if isinstance(window, tuple) else (window, None)
+
+
+def get_window_lookups(dt_field, window):
+    """ return the filter lookups selecting the entries of a window """
+    start, end = get_window_bounds(window)
+    lookups = dict()
+    if start is not None:
+        lookups[dt_field + '__gte'] = start
+    if end is not None:
+        lookups[dt_field + '__lt'] = end
+    return lookups
+
+
+def get_first_full_day(timestamp):
+    """ return the first day (in the current time zone) starting at or after a timestamp """
+    local = timezone.localtime(timestamp) if timezone.is_aware(timestamp) else timestamp
+    return local.date() if local.time() == datetime.time() else local.date() + datetime.timedelta(days=1)
+
+
+def get_window_days(window):
+    """ return the first day and the day after the last day of the days starting within a window; None if open """
+    start, end = get_window_bounds(window)
+    return (get_first_full_day(start) if start is not None else None,
+            get_first_full_day(end) if end is not None else None)
+
+
+def count_distinct_windows(sketches, windows):
+    """
+    return the estimated number of distinct values in total and per window, from a dictionary of daily HyperLogLog
+    sketches. Windows reaching the present are estimated in a single pass merging the days newest first, so the cost
+    is about one merge per day plus one per day of the windows ending in the past.
+
+    Args:
+        sketches: (dictionary) date: HyperLogLog
+        windows: (dictionary) window name: timestamp the window starts at, or (start, end) tuple of timestamps
+
+    Returns:
+        dictionary of window name: estimated number of distinct values, including 'total'
+    """
+    distinct = dict.fromkeys(['total'] + list(windows), 0)
+    if not sketches:
+        return distinct
+    days = sorted(sketches, reverse=True)
+    window_days = {window: get_window_days(bounds) for window, bounds in windows.items()}
+    pending = sorted(((first_day, window) for window, (first_day, end_day) in window_days.items()
+                      if end_day is None and first_day is not None), reverse=True)
+    merged = sketches[days[0]].copy()
+    for position, day in enumerate(days):
+        while pending and pending[0][0] > day:
+            distinct[pending.pop(0)[1]] = merged.count() if position else 0
+        if position:
+            merged.merge(sketches[day])
+    for _, window in pending:
+        distinct[window] = merged.count()
+    for window, (first_day, end_day) in window_days.items():
+        if end_day is None and first_day is not None:
+            continue
+        selected = [day for day in days if (first_day is None or day >= first_day) and day < end_day] \
+            if end_day is not None else days
+        if selected:
+            window_sketch = sketches[selected[0]].copy()
+            for day in selected[1:]:
+                window_sketch.merge(sketches[day])
+            distinct[window] = window_sketch.count()
+    distinct['total'] = merged.count()
+    return distinct
+
+
+def get_rollup_dated_counts(dataset_list, index, windows):
+    """
+    return the total and window counts of a dataset read from its rollup, as a dictionary of index: counts; with the
+    estimated number of distinct values per window under 'distinct' if the dataset sets distinct
+    """
+    # rollups count whole days; a window covers the days starting within the window
+    daily = get_rollup_daily_counts(dataset_list[index])
+    counts = dict(total=sum(daily.values()))
+    for window, bounds in windows.items():
+        first_day, end_day = get_window_days(bounds)
+        counts[window] = sum(count for day, count in daily.items()
+                             if (first_day is None or day >= first_day) and (end_day is None or day < end_day))
+    if dataset_list[index].get('distinct'):
+        counts['distinct'] = count_distinct_windows(get_rollup_daily_sketches(dataset_list[index]), windows)
+    return {index: counts}
+
+
+def get_grouped_dated_counts(dataset_list, indexes, windows):
+    """
+    return the total and window counts of datasets sharing the same queryset, with a single aggregate query
+
+    Args:
+        dataset_list: (list of dictionaries) datasets containing a queryset and dt_field
+        indexes: (list of int) indexes of the datasets in dataset_list to count; their querysets compile to the same
+                 SQL
+        windows: (dictionary) window name: timestamp the window starts at, or (start, end) tuple of timestamps
+                 where either may be None
+
+    Returns:
+        dictionary of dataset index: dictionary of counts, with a 'values' dictionary of aggregation name: dictionary
+        of window values for datasets declaring value aggregations
+    """
+    base = dataset_list[indexes[0]].get('queryset')
+    aggregates = dict()
+    for index in indexes:
+        aggregates['total_{}'.format(index)] = Count('pk')
+        for window, bounds in windows.items():
+            aggregates['{}_{}'.format(window, index)] = Count(
+                'pk', filter=Q(**get_window_lookups(dataset_list[index].get('dt_field'), bounds)))
+        for name, aggregate in get_dataset_aggregations(dataset_list[index]).items():
+            aggregates['value_{}_{}_total'.format(index, name)] = get_filtered_aggregate(aggregate, Q())
+            for window, bounds in windows.items():
+                aggregates['value_{}_{}_{}'.format(index, name, window)] = get_filtered_aggregate(
+                    aggregate, Q(**get_window_lookups(dataset_list[index].get('dt_field'), bounds)))
+    counts = base.aggregate(**aggregates)
+    results = dict()
+    for index in indexes:
+        results[index] = {window: counts['{}_{}'.format(window, index)] for window in ['total'] + list(windows)}
+        aggregations = get_dataset_aggregations(dataset_list[index])
+        if aggregations:
+            results[index]['values'] = {
+                name: {window: counts['value_{}_{}_{}'.format(index, name, window)]
+                       for window in ['total'] + list(windows)} for name in aggregations}
+    return results
+
+
+def get_approximate_dated_counts(dataset_list, index, windows):
+    """
+    return the total and window counts of a dataset opting into approximate counts, as a dictionary of index: counts.
+    The total of a large table is estimated from the statistics of the database planner and the window counts only
+    read the rows added since the start of the longest window; small tables are counted exactly. Windows without a
+    start are estimated as the total less the entries from the end of the window onwards.
+    """
+    dataset = dataset_list[index]
+    estimate = get_count_estimate(dataset.get('queryset'))
+    if estimate is None:
+        return get_grouped_dated_counts(dataset_list, [index], windows)
+    dt_field = dataset.get('dt_field')
+    aggregates = dict()
+    for window, bounds in windows.items():
+        start, end = get_window_bounds(bounds)
+        if start is not None:
+            aggregates[window] = Count('pk', filter=Q(**get_window_lookups(dt_field, bounds)))
+        elif end is not None:
+            aggregates[window] = Count('pk', filter=Q(**{dt_field + '__gte': end}))
+    first = min(bound for bounds in windows.values() for bound in get_window_bounds(bounds) if bound is not None)
+    counts = dataset.get('queryset').filter(**{dt_field + '__gte': first}).aggregate(**aggregates)
+    total = max([estimate] + list(counts.values()))
+    for window, bounds in windows.items():
+        start, end = get_window_bounds(bounds)
+        if start is None:
+            counts[window] = total if end is None else max(total - counts[window], 0)
+    counts.update(total=total, total_estimated=True)
+    return {index: counts}
+
+
+def get_sampled_dated_counts(dataset_list, index, windows):
+    """
+    return the total and window counts of a dataset setting a sample fraction, estimated from a random sample of the
+    rows of its table and scaled up, as a dictionary of index: counts. The confidence interval of each count is
+    under 'intervals' as a dictionary of window: (low, high), unless the table was too small to sample.
+    """
+    dataset = dataset_list[index]
+    conditions = dict(total=None)
+    for window, bounds in windows.items():
+        conditions[window] = Q(**get_window_lookups(dataset.get('dt_field'), bounds))
+    estimates = sample_counts(dataset.get('queryset'), dataset.get('sample'), conditions,
+                              dataset.get('sample_confidence', 0.95))
+    counts = {window: estimate for window, (estimate, low, high) in estimates.items()}
+    if any(low != high for estimate, low, high in estimates.values()):
+        counts['intervals'] = {window: (low, high) for window, (estimate, low, high) in estimates.items()}
+        counts['total_estimated'] = True
+    return {index: counts}
+
+
+def get_dated_count_tasks(dataset_list, now=None, windows=None):
+    """
+    return the list of functions counting the datasets of a report (see get_dated_counts); one per rollup dataset
+    and one per distinct queryset. Each function returns a dictionary of dataset index: dictionary of counts.
+    """
+    if windows is None:
+        windows = dict(zip(('day', 'week', 'month', 'year'), get_timestamps(now)))
+    tasks = list()
+    groups = dict()
+    for index, dataset in enumerate(dataset_list):
+        if dataset.get('rollup'):
+            tasks.append(functools.partial(get_rollup_dated_counts, dataset_list, index, windows))
+            continue
+        if dataset.get('distinct'):
+            raise ImproperlyConfigured('distinct counts require a dataset using a rollup with a distinct_field')
+        queryset = dataset.get('queryset')
+        if queryset.query.is_empty() or get_query_sql(queryset) is None:
+            continue
+        if dataset.get('sample') and not get_dataset_aggregations(dataset):
+            tasks.append(functools.partial(get_sampled_dated_counts, dataset_list, index, windows))
+            continue
+        if dataset.get('approximate_count') and is_unfiltered(queryset) and not get_dataset_aggregations(dataset):
+            tasks.append(functools.partial(get_approximate_dated_counts, dataset_list, index, windows))
+            continue
+        if queryset.query.is_sliced or queryset.query.combinator:
+            # sliced and combined querysets can not be filtered further; count these on their own
+            key = index
+        else:
+            # querysets filtered differently are counted on their own, so each query can use its own indexes
+            key = get_query_sql(queryset)
+        groups.setdefault(key, list()).append(index)
+    tasks.extend(functools.partial(get_grouped_dated_counts, dataset_list, indexes, windows)
+                 for indexes in groups.values())
+    return tasks
+
+
+def merge_dated_counts(dataset_list, results, windows=('day', 'week', 'month', 'year')):
+    """ return the list of counts per dataset from the results of the tasks of get_dated_count_tasks """
+    counts = list()
+    for dataset in dataset_list:
+        counts.append(dict.fromkeys(['total'] + list(windows), 0))
+        aggregations = get_dataset_aggregations(dataset)
+        if aggregations:
+            counts[-1]['values'] = {name: dict.fromkeys(['total'] + list(windows)) for name in aggregations}
+    for result in results:
+        for index, dataset_counts in result.items():
+            counts[index] = dataset_counts
+    return counts
+
+
+def get_dated_counts(dataset_list, now=None, max_workers=None):
+    """
+    return the total number of entries per dataset, and the number added in the past day, week, month, and year.
+    All counts of a dataset are computed in a single aggregate query using filtered counts, and datasets sharing the
+    same queryset are folded into the same query, so a report costs one query per distinct queryset. The value
+    aggregations declared by a dataset are computed for the same windows in the same query. The total of unfiltered
+    datasets with approximate_count set (and no value aggregations) is estimated for large tables, and flagged with
+    total_estimated. The counts of datasets setting a sample fraction (and no value aggregations) are estimated from a
+    random sample of the rows of their table, with confidence intervals under 'intervals'.
+
+    Args:
+        dataset_list: (list of dictionaries) datasets containing a queryset and dt_field
+        now: (datetime or timezone) initial timestamp used to determine day, week, month, year date diffs
+        max_workers: (int) optional; number of queries run concurrently, in threads
+
+    Returns:
+        list of dictionaries (total, day, week, month, year) in the order of dataset_list
+    """
+    return merge_dated_counts(dataset_list, run_tasks(get_dated_count_tasks(dataset_list, now), max_workers))
+
+
+async def aget_dated_counts(dataset_list, now=None, max_concurrency=None):
+    """ async counterpart of get_dated_counts; queries run concurrently, at most max_concurrency at a time """
+    return merge_dated_counts(dataset_list,
+                              await arun_tasks(get_dated_count_tasks(dataset_list, now), max_concurrency))
+
+
+def get_month_start(timestamp):
+    """ return the start of the month (in the current time zone) a timestamp falls in """
+    if timezone.is_aware(timestamp):
+        timestamp = timezone.localtime(timestamp)
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_next_month_start(timestamp):
+    """ return the start of the month following the month a timestamp falls in """
+    return get_month_start(get_month_start(timestamp) + datetime.timedelta(days=32))
+
+
+def get_monthly_values(queryset, dt_field, timestamps, start=None, aggregations=None):
+    """
+    return the number of entries and the value aggregations per month, for the months of a list of timestamps, with a
+    single GROUP BY query
+
+    Args:
+        queryset: (django queryset) queryset to count
+        dt_field: (str) datetime field in model
+        timestamps: (list of datetimes) one timestamp in each month to count
+        start: (datetime) optional; only count entries at or after this time
+        aggregations: (dictionary) optional; name: aggregate (such as Sum('amount')) computed per month
+
+    Returns:
+        tuple of list of counts and dictionary of aggregation name: list of values, in the order of timestamps
+    """
+    aggregations = aggregations or dict()
+    if not timestamps:
+        return list(), {name: list() for name in aggregations}
+    months = [(month.year, month.month) for month in (get_month_start(ts) for ts in timestamps)]
+    first_month = min(get_month_start(ts) for ts in timestamps)
+    lookups = {dt_field + '__gte': max(first_month, start) if start else first_month,
+               dt_field + '__lt': get_next_month_start(max(get_month_start(ts) for ts in timestamps))}
+    annotations = {'value_' + name: aggregate for name, aggregate in aggregations.items()}
+    rows = queryset.filter(**lookups).order_by().annotate(month=TruncMonth(dt_field)).values('month').annotate(
+        count=Count('pk'), **annotations)
+    rows = {(row['month'].year, row['month'].month): row for row in rows}
+    counts = [rows[month]['count'] if month in rows else 0 for month in months]
+    values = {name: [rows[month]['value_' + name] if month in rows else None for month in months]
+              for name in aggregations}
+    return counts, values
+
+
+def get_monthly_counts(queryset, dt_field, timestamps, start=None):
+    """
+    return the number of entries per month, for the months of a list of timestamps, with a single GROUP BY query
+
+    Args:
+        queryset: (django queryset) queryset to count
+        dt_field: (str) datetime field in model
+        timestamps: (list of datetimes) one timestamp in each month to count
+        start: (datetime) optional; only count entries at or after this time
+
+    Returns:
+        list of counts in the order of timestamps
+    """
+    return get_monthly_values(queryset, dt_field, timestamps, start)[0]
+
+
+def get_rollup_monthly_counts(daily_counts, timestamps):
+    """
+    return the number of entries per month, for the months of a list of timestamps, from a dictionary of daily counts
+
+    Args:
+        daily_counts: (dictionary) date: count
+        timestamps: (list of datetimes) one timestamp in each month to count
+
+    Returns:
+        list of counts in the order of timestamps
     """
+    counts = dict()
+    for day, count in daily_counts.items():
+        counts[(day.year, day.month)] = counts.get((day.year, day.month), 0) + count
+    months = [get_month_start(ts) for ts in timestamps]
+    return [counts.get((month.year, month.month), 0) for month in months]
+
+
+def get_annual_progress_counts(dataset, timestamps):
+    """ return the cumulative number of entries of a dataset at the end of each month of a list of timestamps """
+    # entries before the first month, plus a running total of entries added per month
+    first_month = get_month_start(timestamps[0])
+    if dataset.get('rollup'):
+        daily = get_rollup_daily_counts(dataset)
+        total = sum(count for day, count in daily.items() if day < first_month.date())
+        monthly_counts = get_rollup_monthly_counts(daily, timestamps)
+    else:
+        queryset = dataset.get('queryset')
+        total = queryset.filter(**{dataset.get('dt_field') + '__lt': first_month}).count()
+        monthly_counts = get_monthly_counts(queryset, dataset.get('dt_field'), timestamps)
+    annual_monthly_counts = list()
+    for count in monthly_counts:
+        total += count
+        annual_monthly_counts.append(total)
+    return annual_monthly_counts
+
+
+def format_annual_progress_chart(dataset_list, annual_timestamp_list, counts):
+    """ return the data required to plot an annual progress chart from the counts of each dataset """
     return_dataset_list = list()
     color_list = get_color_list()
-    annual_timestamp_list = get_annual_timestamps()
     month_labels = [ts.strftime('%B') for ts in annual_timestamp_list]
 
     color = 0
-    for dataset in dataset_list:
-        queryset_field_lte = dataset.get('dt_field') + '__lte'
-        annual_monthly_counts = [dataset.get('queryset').filter(**{queryset_field_lte: ts}).count()
-                                 for ts in annual_timestamp_list]
-
+    for dataset, annual_monthly_counts in zip(dataset_list, counts):
         return_dataset_list.append(
             dict(title=dataset.get('title'),
                  url=dataset.get('list_view'),
@@ -141,18 +624,20 @@ def build_annual_progress_chart(dataset_list):
     return month_labels, annual_timestamp_list, return_dataset_list
 
 
-def build_annual_trend_chart(dataset_list):
+def build_annual_progress_chart(dataset_list, max_workers=None):
     """
-    process a list of datasets and return data required to plot an annual trend chart
+    process a list of datasets and return data required to plot an annual progress chart
 
     Args:
         dataset_list - (list of dictionaries) set of data to display; list of dictionaries containing the following:
                        title     - title to display for dataset
                        queryset  - queryset to use in counts
                        dt_field  - datetime field in model
+                       rollup    - optional; name of a registered rollup to read counts from instead of queryset
 
                        example:
                            [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at'}, ...]
+        max_workers  - (int) optional; number of datasets counted concurrently, in threads
 
     Returns:
         tuple containing:
@@ -160,27 +645,77 @@ def build_annual_trend_chart(dataset_list):
             list of month timestamps
             list of dictionaries containing data needed to plot chart
     """
+    annual_timestamp_list = get_annual_timestamps()
+    tasks = [functools.partial(get_annual_progress_counts, dataset, annual_timestamp_list) for dataset in dataset_list]
+    return format_annual_progress_chart(dataset_list, annual_timestamp_list, run_tasks(tasks, max_workers))
+
+
+async def abuild_annual_progress_chart(dataset_list, max_concurrency=None):
+    """ async counterpart of build_annual_progress_chart; datasets are counted concurrently """
+    annual_timestamp_list = get_annual_timestamps()
+    tasks = [functools.partial(get_annual_progress_counts, dataset, annual_timestamp_list) for dataset in dataset_list]
+    return format_annual_progress_chart(dataset_list, annual_timestamp_list, await arun_tasks(tasks, max_concurrency))
+
+
+def get_annual_trend_counts(dataset, timestamps, start):
+    """
+    return the number of entries of a dataset added in each month of a list of timestamps, from start onwards, and
+    the values of its value aggregations in each month
+    """
+    aggregations = get_dataset_aggregations(dataset)
+    if dataset.get('rollup'):
+        daily = get_rollup_daily_counts(dataset, start=get_local_date(start) + datetime.timedelta(days=1))
+        return get_rollup_monthly_counts(daily, timestamps), dict()
+    return get_monthly_values(dataset.get('queryset'), dataset.get('dt_field'), timestamps, start=start,
+                              aggregations=aggregations)
+
+
+def get_annual_trend_tasks(dataset_list, annual_timestamp_list):
+    """ return the list of functions counting the datasets of an annual trend chart """
+    last_year = timezone.now() - datetime.timedelta(days=365.2425)
+    return [functools.partial(get_annual_trend_counts, dataset, annual_timestamp_list, last_year)
+            for dataset in dataset_list]
+
+
+def get_trend_results(results):
+    """ return the list of monthly counts and the list of monthly values from the results of the annual trend tasks """
+    return [counts for counts, values in results], [values for counts, values in results]
+
+
+def format_aggregation_charts(chart_dataset_list, chart_id):
+    """
+    return the data required to plot a line chart per value aggregation from the datasets of a chart; each chart
+    holds the values of the datasets declaring the aggregation, as json
+    """
+    charts = dict()
+    for data in chart_dataset_list:
+        for name, values in data.get('aggregations', dict()).items():
+            if name not in charts:
+                charts[name] = dict(name=name, id='{}_{}'.format(chart_id, len(charts)), datasets=list())
+            charts[name]['datasets'].append(dict(title=data.get('title'), color=data.get('color'),
+                                                 data=json.dumps([get_chart_value(value) for value in values])))
+    return list(charts.values())
+
+
+def format_annual_trend_chart(dataset_list, annual_timestamp_list, counts, values=None):
+    """
+    return the data required to plot an annual trend chart from the counts of each dataset, and optionally the
+    monthly values of its value aggregations
+    """
     return_dataset_list = list()
     color_list = get_color_list()
-    annual_timestamp_list = get_annual_timestamps(reverse=True)
     month_labels = [ts.strftime('%B') for ts in annual_timestamp_list]
+    values = values or [dict() for _ in dataset_list]
 
     color = 0
-    for dataset in dataset_list:
-        data_year = dataset.get('queryset').filter(**{dataset.get('dt_field') + '__gte':
-                                                          timezone.now() - datetime.timedelta(days=365.2425)})
-        annual_monthly_counts = [
-            len([i for i in data_year if getattr(i, dataset.get('dt_field')).month == ts.month and
-                 getattr(i, dataset.get('dt_field')).year == ts.year])
-            for ts in annual_timestamp_list
-        ]
-
+    for dataset, annual_monthly_counts, annual_monthly_values in zip(dataset_list, counts, values):
         return_dataset_list.append(
             dict(title=dataset.get('title'),
                  list_view=dataset.get('list_view'),
                  dt_field=dataset.get('dt_field'),
                  color=color_list[color],
                  annual=annual_monthly_counts,
+                 aggregations=annual_monthly_values,
                  )
         )
 
@@ -190,43 +725,57 @@ def build_annual_trend_chart(dataset_list):
     return month_labels, annual_timestamp_list, return_dataset_list
 
 
-def build_day_week_month_year_charts(dataset_list):
+def build_annual_trend_chart(dataset_list, max_workers=None):
     """
-    process a list of datasets and return data required to plot charts for counts per past day, week, month, and year
+    process a list of datasets and return data required to plot an annual trend chart
 
     Args:
         dataset_list - (list of dictionaries) set of data to display; list of dictionaries containing the following:
                        title     - title to display for dataset
                        queryset  - queryset to use in counts
                        dt_field  - datetime field in model
-                       list_view - list view of data (used in links)
+                       rollup    - optional; name of a registered rollup to read counts from instead of queryset
 
                        example:
-                           [{title='Owners', queryset=Owner.objects.all(),
-                             dt_field='created_at', list_view='/hostmgr/list_owners}, ...]
+                           [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at'}, ...]
+        max_workers  - (int) optional; number of datasets counted concurrently, in threads
 
     Returns:
-        list of dictionaries containing data needed to plot chart(s)
+        tuple containing:
+            list of month labels
+            list of month timestamps
+            list of dictionaries containing data needed to plot chart
     """
+    annual_timestamp_list = get_annual_timestamps(reverse=True)
+    results = run_tasks(get_annual_trend_tasks(dataset_list, annual_timestamp_list), max_workers)
+    return format_annual_trend_chart(dataset_list, annual_timestamp_list, *get_trend_results(results))
+
+
+async def abuild_annual_trend_chart(dataset_list, max_concurrency=None):
+    """ async counterpart of build_annual_trend_chart; datasets are counted concurrently """
+    annual_timestamp_list = get_annual_timestamps(reverse=True)
+    results = await arun_tasks(get_annual_trend_tasks(dataset_list, annual_timestamp_list), max_concurrency)
+    return format_annual_trend_chart(dataset_list, annual_timestamp_list, *get_trend_results(results))
+
+
+def format_day_week_month_year_charts(dataset_list, counts):
+    """ return the data required to plot day, week, month and year charts from the dated counts of each dataset """
     return_dataset_list = list()
     color_list = get_color_list()
 
     color = 0
-    for dataset in dataset_list:
-        data_day, data_week, data_month, data_year = get_dated_data(
-            dataset.get('queryset'),
-            dataset.get('dt_field') + '__gte',
-        )
-
+    for dataset, dataset_counts in zip(dataset_list, counts):
         return_dataset_list.append(
             dict(title=dataset.get('title'),
                  list_view=dataset.get('list_view'),
                  dt_field=dataset.get('dt_field'),
                  color=color_list[color],
-                 day=data_day.count(),
-                 week=data_week.count(),
-                 month=data_month.count(),
-                 year=data_year.count(),
+                 day=dataset_counts['day'],
+                 week=dataset_counts['week'],
+                 month=dataset_counts['month'],
+                 year=dataset_counts['year'],
+                 aggregations={name: {window: window_values[window] for window in ('day', 'week', 'month', 'year')}
+                               for name, window_values in dataset_counts.get('values', dict()).items()},
                  ),
         )
         color += 1
@@ -235,34 +784,487 @@ def build_day_week_month_year_charts(dataset_list):
     return return_dataset_list
 
 
-class AnnualStatView(HtmxViewMixin, View):
+def build_day_week_month_year_charts(dataset_list, max_workers=None):
+    """
+    process a list of datasets and return data required to plot charts for counts per past day, week, month, and year
+
+    Args:
+        dataset_list - (list of dictionaries) set of data to display; list of dictionaries containing the following:
+                       title     - title to display for dataset
+                       queryset  - queryset to use in counts
+                       dt_field  - datetime field in model
+                       rollup    - optional; name of a registered rollup to read counts from instead of queryset
+                       list_view - list view of data (used in links)
+
+                       example:
+                           [{title='Owners', queryset=Owner.objects.all(),
+                             dt_field='created_at', list_view='/hostmgr/list_owners}, ...]
+        max_workers  - (int) optional; number of queries run concurrently, in threads
+
+    Returns:
+        list of dictionaries containing data needed to plot chart(s)
+    """
+    return format_day_week_month_year_charts(dataset_list, get_dated_counts(dataset_list, max_workers=max_workers))
+
+
+async def abuild_day_week_month_year_charts(dataset_list, max_concurrency=None):
+    """ async counterpart of build_day_week_month_year_charts; queries run concurrently """
+    return format_day_week_month_year_charts(
+        dataset_list, await aget_dated_counts(dataset_list, max_concurrency=max_concurrency))
+
+
+def get_period_timestamps(kind, periods, now=None):
+    """ return the start of each of the most recent periods of a kind, oldest first, in the current time zone """
+    now = now or timezone.now()
+    if timezone.is_aware(now):
+        now = timezone.localtime(now)
+    current = truncate_timestamp(now, kind)
+    return [shift_period(current, kind, -offset) for offset in reversed(range(periods))]
+
+
+def get_period_trend_counts(dataset, kind, periods, now):
+    """ return the number of entries of a dataset added in each of the most recent periods of a kind, oldest first """
+    return count_by_period(dataset.get('queryset'), dataset.get('dt_field'), kind, periods, now=now)[::-1]
+
+
+def format_period_trend_chart(dataset_list, kind, timestamps, counts, max_points=None):
+    """
+    return the data required to plot a period trend chart from the counts of each dataset; series longer than the
+    point budget are downsampled with LTTB
+    """
+    timestamps, counts = downsample_series(timestamps, counts, CHART_MAX_POINTS if max_points is None else max_points)
+    labels = [ts.strftime(PERIOD_LABEL_FORMATS[kind]) for ts in timestamps]
+    return_dataset_list = list()
+    for dataset, color, period_counts in zip(dataset_list, get_colors(len(dataset_list)), counts):
+        return_dataset_list.append(
+            dict(title=dataset.get('title'),
+                 list_view=dataset.get('list_view'),
+                 dt_field=dataset.get('dt_field'),
+                 color=color,
+                 data=period_counts,
+                 )
+        )
+    return labels, timestamps, return_dataset_list
+
+
+def build_period_trend_chart(dataset_list, kind='day', periods=365, max_points=None, max_workers=None):
+    """
+    process a list of datasets and return data required to plot the number of entries added per minute, hour, day,
+    week, month, quarter or year over a long span. Each dataset is counted with a single GROUP BY query, and the
+    series are downsampled to the point budget of the chart so page size and rendering time stay bounded.
+
+    Args:
+        dataset_list - (list of dictionaries) set of data to display; list of dictionaries containing the following:
+                       title     - title to display for dataset
+                       queryset  - queryset to use in counts
+                       dt_field  - datetime field in model
+                       list_view - list view of data (used in links)
+        kind         - (str) period kind; one of minute, hour, day, week, month, quarter or year
+        periods      - (int) number of periods to plot, including the current period
+        max_points   - (int) optional; number of points plotted; defaults to the HH_CHART_MAX_POINTS setting (500),
+                       0 to plot every period
+        max_workers  - (int) optional; number of datasets counted concurrently, in threads
+
+    Returns:
+        tuple containing:
+            list of period labels
+            list of period timestamps
+            list of dictionaries containing data needed to plot chart
+    """
+    now = timezone.now()
+    tasks = [functools.partial(get_period_trend_counts, dataset, kind, periods, now) for dataset in dataset_list]
+    return format_period_trend_chart(dataset_list, kind, get_period_timestamps(kind, periods, now),
+                                     run_tasks(tasks, max_workers), max_points)
+
+
+async def abuild_period_trend_chart(dataset_list, kind='day', periods=365, max_points=None, max_concurrency=None):
+    """ async counterpart of build_period_trend_chart; datasets are counted concurrently """
+    now = timezone.now()
+    tasks = [functools.partial(get_period_trend_counts, dataset, kind, periods, now) for dataset in dataset_list]
+    return format_period_trend_chart(dataset_list, kind, get_period_timestamps(kind, periods, now),
+                                     await arun_tasks(tasks, max_concurrency), max_points)
+
+
+def get_top_values_start(window, now=None):
+    """ return the start of a window of top values ('day', 'week', 'month' or 'year'), or None for all entries """
+    if window not in TOP_VALUES_WINDOWS:
+        raise ValueError('invalid window "{}"; valid windows are day, week, month, year or None'.format(window))
+    if window is None:
+        return None
+    return dict(zip(('day', 'week', 'month', 'year'), get_timestamps(now)))[window]
+
+
+def get_top_values(dataset, k, start=None):
+    """
+    return the k most frequent values of the field of a dataset among the entries added since start. Values are
+    counted exactly with a single GROUP BY ... ORDER BY count DESC LIMIT k query, unless the dataset sets sketch;
+    the values are then streamed through a Space-Saving sketch in bounded memory, which spares the database grouping
+    a huge number of distinct values, and counts may be overestimated by up to their error.
+
+    Returns:
+        list of (value, count, error) tuples, most frequent first
+    """
+    queryset = dataset.get('queryset')
+    if start is not None:
+        queryset = queryset.filter(**{dataset.get('dt_field') + '__gte': start})
+    if not dataset.get('sketch'):
+        return [(value, count, 0) for value, count in count_top_values(queryset, dataset.get('field'), k)]
+    sketch = SpaceSaving(dataset.get('sketch_capacity') or max(10 * k, 100))
+    sketch.update(queryset.order_by().values_list(dataset.get('field'), flat=True).iterator(chunk_size=10000))
+    return sketch.top(k)
+
+
+def get_top_values_cache_key(dataset, window, k):
+    """ return the cache key of the top values of a dataset over a window """
+    parts = [get_dataset_key(dataset), dataset.get('field'), dataset.get('sketch'), dataset.get('sketch_capacity'),
+             window, k]
+    return 'handyhelpers.report.top.{}'.format(hashlib.sha1(repr(parts).encode('utf-8')).hexdigest())
+
+
+def count_top_values_window(dataset, window, start, k, cache_timeout=None):
+    """ return the start of a window and the top values of a dataset over it; cached per window if cache_timeout """
+    if not cache_timeout:
+        return start, get_top_values(dataset, k, start)
+    return cache.get_or_set(get_top_values_cache_key(dataset, window, k),
+                            lambda: (start, get_top_values(dataset, k, start)), cache_timeout)
+
+
+def format_top_values_report(dataset_list, results):
+    """ return the data required to display the top values of each dataset """
+    return_dataset_list = list()
+    for dataset, (start, top) in zip(dataset_list, results):
+        list_view = dataset.get('list_view')
+        highest = top[0][1] if top else 0
+        rows = list()
+        for rank, (value, count, error) in enumerate(top, 1):
+            url = None
+            if list_view and value is not None:
+                lookups = {dataset.get('field'): value}
+                if start is not None:
+                    local = timezone.localtime(start) if timezone.is_aware(start) else start
+                    lookups[dataset.get('dt_field') + '__gte'] = local.strftime('%Y-%m-%d %H:%M:%S')
+                url = '{}?{}'.format(list_view, urlencode(lookups))
+            rows.append(dict(rank=rank, value=value, count=count, error=error, url=url,
+                             percent=round(100 * count / highest) if highest else 0))
+        return_dataset_list.append(
+            dict(title=dataset.get('title'),
+                 icon=dataset.get('icon'),
+                 field_label=dataset.get('field_label') or dataset.get('field'),
+                 start=start,
+                 estimated=bool(dataset.get('sketch')),
+                 rows=rows,
+                 )
+        )
+    return return_dataset_list
+
+
+def build_top_values_report(dataset_list, window='week', k=20, max_workers=None, cache_timeout=None):
+    """
+    process a list of datasets and return the k most frequent values of a field of each (such as the top 20 hosts by
+    events this week) over the past day, week, month or year, or over all entries
+
+    Args:
+        dataset_list  - (list of dictionaries) set of data to display; list of dictionaries containing the following:
+                        title           - title to display for dataset
+                        queryset        - queryset to use in counts
+                        dt_field        - datetime field in model
+                        field           - field to count the values of
+                        field_label     - optional; heading of the value column; defaults to field
+                        list_view       - optional; list view of data (used in links)
+                        icon            - optional; icon to display with title
+                        sketch          - optional; if True, count with a streaming Space-Saving sketch instead of a
+                                          GROUP BY query; counts may be overestimated
+                        sketch_capacity - optional; number of values monitored by the sketch; defaults to 10 * k
+        window        - (str) one of day, week, month or year; None to count all entries
+        k             - (int) number of values to return per dataset
+        max_workers   - (int) optional; number of datasets counted concurrently, in threads
+        cache_timeout - (int) optional; number of seconds to cache the top values of each dataset and window for
+
+    Returns:
+        list of dictionaries containing data needed to display the top values
+    """
+    start = get_top_values_start(window)
+    tasks = [functools.partial(count_top_values_window, dataset, window, start, k, cache_timeout)
+             for dataset in dataset_list]
+    return format_top_values_report(dataset_list, run_tasks(tasks, max_workers))
+
+
+async def abuild_top_values_report(dataset_list, window='week', k=20, max_concurrency=None, cache_timeout=None):
+    """ async counterpart of build_top_values_report; datasets are counted concurrently """
+    start = get_top_values_start(window)
+    tasks = [functools.partial(count_top_values_window, dataset, window, start, k, cache_timeout)
+             for dataset in dataset_list]
+    return format_top_values_report(dataset_list, await arun_tasks(tasks, max_concurrency))
+
+
+def get_annual_report_windows(now):
+    """
+    return the windows counted for the annual dashboard: the past day, week, month and year, each month of the annual
+    charts ('month_<i>', oldest first), the part of a month before the start of the past year excluded ('trend_<i>')
+    and the entries before the first month ('before')
+    """
+    windows = dict(zip(('day', 'week', 'month', 'year'), get_timestamps(now)))
+    months = [get_month_start(ts) for ts in get_annual_timestamps(end=now)]
+    windows['before'] = (None, months[0])
+    for index, month in enumerate(months):
+        next_month = get_next_month_start(month)
+        windows['month_{}'.format(index)] = (month, next_month)
+        if month < windows['year']:
+            windows['trend_{}'.format(index)] = (min(windows['year'], next_month), next_month)
+    return windows
+
+
+def get_dataset_key(dataset):
+    """ return a hashable description of a dataset, used in cache keys """
+    queryset = dataset.get('queryset')
+    return (dataset.get('title'), dataset.get('dt_field'), dataset.get('rollup'), dataset.get('rollup_dimension'),
+            dataset.get('approximate_count'), dataset.get('sample'), dataset.get('sample_confidence'),
+            sorted((dataset.get('aggregations') or dict()).items()),
+            get_query_sql(queryset) if queryset is not None else None)
+
+
+def get_annual_report_cache_key(dataset_list):
+    """ return the cache key of the annual dashboard counts of a list of datasets """
+    parts = [get_dataset_key(dataset) for dataset in dataset_list]
+    return 'handyhelpers.report.annual.{}'.format(hashlib.sha1(repr(parts).encode('utf-8')).hexdigest())
+
+
+def count_annual_report(dataset_list, max_workers=None):
+    """ return the current time and the list of counts per dataset of the windows of get_annual_report_windows """
+    now = timezone.now()
+    windows = get_annual_report_windows(now)
+    results = run_tasks(get_dated_count_tasks(dataset_list, windows=windows), max_workers)
+    return now, merge_dated_counts(dataset_list, results, windows)
+
+
+def get_annual_report_counts(dataset_list, max_workers=None, cache_timeout=None):
+    """
+    count everything the annual stats, trend and progress reports display in a single aggregation pass; one aggregate
+    query per distinct queryset (or rollup dataset) counts the total, the past day, week, month and year and every
+    month of the past year. The result can be cached and shared by every rendering.
+
+    Args:
+        dataset_list: (list of dictionaries) datasets containing a queryset and dt_field, or a rollup
+        max_workers: (int) optional; number of queries run concurrently, in threads
+        cache_timeout: (int) optional; number of seconds to cache the counts for
+
+    Returns:
+        tuple of the time counted at and list of dictionaries of counts per window in the order of dataset_list
+    """
+    if not cache_timeout:
+        return count_annual_report(dataset_list, max_workers)
+    return cache.get_or_set(get_annual_report_cache_key(dataset_list),
+                            lambda: count_annual_report(dataset_list, max_workers), cache_timeout)
+
+
+async def aget_annual_report_counts(dataset_list, max_concurrency=None, cache_timeout=None):
+    """ async counterpart of get_annual_report_counts; queries run concurrently, at most max_concurrency at a time """
+    key = get_annual_report_cache_key(dataset_list)
+    if cache_timeout:
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+    now = timezone.now()
+    windows = get_annual_report_windows(now)
+    results = await arun_tasks(get_dated_count_tasks(dataset_list, windows=windows), max_concurrency)
+    counted = now, merge_dated_counts(dataset_list, results, windows)
+    if cache_timeout:
+        await cache.aset(key, counted, cache_timeout)
+    return counted
+
+
+def format_annual_dashboard(dataset_list, now, counts):
+    """
+    derive the data of the annual stats, trend and progress reports from the counts of get_annual_report_counts
+
+    Returns:
+        dictionary of template context
+    """
+    progress_timestamps = get_annual_timestamps(end=now)
+    trend_timestamps = get_annual_timestamps(end=now, reverse=True)
+    months = range(len(progress_timestamps))
+    trend_counts = list()
+    trend_values = list()
+    progress_counts = list()
+    for dataset_counts in counts:
+        monthly_counts = [dataset_counts['month_{}'.format(index)] for index in months]
+        trend_windows = ['trend_{}'.format(index) if 'trend_{}'.format(index) in dataset_counts
+                         else 'month_{}'.format(index) for index in reversed(months)]
+        trend_counts.append([dataset_counts[window] for window in trend_windows])
+        trend_values.append({name: [window_values[window] for window in trend_windows]
+                             for name, window_values in dataset_counts.get('values', dict()).items()})
+        progress_counts.append(list(itertools.accumulate(monthly_counts, initial=dataset_counts['before']))[1:])
+
+    context = dict()
+    context['stat_dataset_list'] = [AnnualStatView.get_dataset_row(dataset, dataset_counts, now)
+                                    for dataset, dataset_counts in zip(dataset_list, counts)]
+    context['dataset_list'] = format_day_week_month_year_charts(dataset_list, counts)
+    context['trend_month_labels'], context['trend_month_timestamps'], context['annual_trend_dataset_list'] = \
+        format_annual_trend_chart(dataset_list, trend_timestamps, trend_counts, trend_values)
+    context['annual_trend_aggregation_charts'] = format_aggregation_charts(context['annual_trend_dataset_list'],
+                                                                           'annual_trend_value')
+    context['progress_month_labels'], context['progress_month_timestamps'], \
+        context['annual_progress_dataset_list'] = format_annual_progress_chart(dataset_list, progress_timestamps,
+                                                                               progress_counts)
+    return context
+
+
+class ConcurrentReportMixin:
+    """
+    Mixin adding concurrent dataset evaluation to report views. With concurrent set, the queries of a report run in a
+    pool of threads (each with its own database connection), so page latency approaches that of the slowest dataset
+    instead of the sum of all datasets. The async variants of the report views always count datasets concurrently.
+
+    class parameters:
+        concurrent      - if True, count datasets concurrently in threads
+        max_concurrency - maximum number of queries run at a time, to protect the database
+    """
+    concurrent = False
+    max_concurrency = getattr(settings, 'HH_REPORT_MAX_CONCURRENCY', 4)
+
+    def get_max_workers(self):
+        """ return the number of threads datasets are counted with, or None to count them one after another """
+        return self.max_concurrency if self.concurrent else None
+
+
+class LazyReportMixin:
+    """
+    Mixin adding lazily loaded report data to report views. The data of a single dataset is returned for a
+    'dataset' query parameter (the index of the dataset in dataset_list), as json or as a htmx partial, and can be
+    cached on its own. With lazy set, the view responds right away with a placeholder per dataset, and each dataset
+    is loaded with htmx once its placeholder scrolls into view (hx-trigger="revealed"), so the first byte does not
+    wait on the slowest dataset and off-screen data is not computed until needed. Lazy loading requires htmx to be
+    loaded by the base template.
+
+    class parameters:
+        lazy          - if True, render a placeholder per dataset and load its data with htmx when it is revealed
+        cache_timeout - if set, cache dataset payloads for this many seconds and send lazily loaded responses with a
+                        Cache-Control max-age of the same
+    """
+    lazy = False
+    cache_timeout = None
+    dataset_template_name = None
+
+    def get_dataset_data(self, dataset):
+        """ return a json serializable dictionary of the report data of a single dataset """
+        raise NotImplementedError
+
+    def get_dataset_context(self, index, dataset, data):
+        """ return the context used to render the htmx partial of a single dataset """
+        return dict(data=data, index=index)
+
+    def get_dataset_cache_key(self, index, dataset):
+        """ return the cache key of the payload of a dataset """
+        parts = [type(self).__module__, type(self).__qualname__, index, get_dataset_key(dataset)]
+        return 'handyhelpers.report.{}'.format(hashlib.sha1(repr(parts).encode('utf-8')).hexdigest())
+
+    def get_lazy_dataset_list(self):
+        """ return the title, icon and url to load the data of each dataset, used to render their placeholders """
+        return [dict(title=dataset.get('title'), icon=dataset.get('icon'),
+                     lazy_url='{}?dataset={}'.format(self.request.path, index))
+                for index, dataset in enumerate(self.dataset_list)]
+
+    def patch_lazy_response(self, response):
+        """ add the cache headers of a lazily loaded response """
+        patch_vary_headers(response, ('HX-Request', ))
+        if self.cache_timeout:
+            patch_cache_control(response, private=True, max_age=self.cache_timeout)
+        return response
+
+    def get_dataset_response(self):
+        """ return the report data of the dataset given by the 'dataset' query parameter """
+        try:
+            index = int(self.request.GET.get('dataset'))
+        except (TypeError, ValueError):
+            raise Http404('invalid dataset')
+        if not 0 <= index < len(self.dataset_list):
+            raise Http404('invalid dataset')
+        dataset = self.dataset_list[index]
+        if self.cache_timeout:
+            data = cache.get_or_set(self.get_dataset_cache_key(index, dataset),
+                                    lambda: self.get_dataset_data(dataset), self.cache_timeout)
+        else:
+            data = self.get_dataset_data(dataset)
+        if self.dataset_template_name and self.is_htmx():
+            response = render(self.request, self.dataset_template_name, self.get_dataset_context(index, dataset, data))
+        else:
+            response = JsonResponse(data)
+        return self.patch_lazy_response(response)
+
+
+class AnnualStatView(LazyReportMixin, ConcurrentReportMixin, HtmxViewMixin, View):
     """
     Description:
         Tallies the number of entries added over the past year. Included are counts of entries sectioned by
         past day, week, month and year.
 
     Parameters:
-        title         - title displayed on web page
-        subtitle      - subtitle displayed on web page
-        template_name - template to use in rendering
-        dataset_list  - set of data to display; list of dictionaries containing the following:
-                            title     - title to display for dataset
-                            queryset  - queryset to use in counts
-                            dt_field  - datetime field in model
-                            icon      - fontawesome icon to display for dataset
-                            list_view - list view of data (used in links)
-
-                        example:
-                            [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at',
-                              icon='fas fa-users', list_view='/hostmgr/list_owners'), }, ...]
+        title           - title displayed on web page
+        subtitle        - subtitle displayed on web page
+        template_name   - template to use in rendering
+        dataset_list    - set of data to display; list of dictionaries containing the following:
+                              title     - title to display for dataset
+                              queryset  - queryset to use in counts
+                              dt_field  - datetime field in model
+                              rollup    - optional; name of a registered rollup to read counts from instead of
+                                          queryset
+                              approximate_count - optional; if True, estimate the total of an unfiltered queryset
+                                          of a large table from database statistics instead of counting it
+                              sample    - optional; fraction of the rows of the table (such as 0.01) to estimate
+                                          the counts from, shown with confidence intervals
+                              sample_confidence - optional; confidence level of the intervals; defaults to 0.95
+                              distinct  - optional; if True, also show the approximate number of distinct values of
+                                          the distinct_field of the rollup
+                              distinct_label - optional; label of the distinct counts; defaults to 'unique'
+                              icon      - fontawesome icon to display for dataset
+                              list_view - list view of data (used in links)
+
+                          example:
+                              [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at',
+                                icon='fas fa-users', list_view='/hostmgr/list_owners'), }, ...]
+        concurrent      - if True, count datasets concurrently in threads
+        max_concurrency - maximum number of queries run at a time
+        lazy            - if True, render the page with a placeholder per dataset, each loading its counts with htmx
+                          when it scrolls into view
+        cache_timeout   - if set, cache the counts of each lazily loaded dataset for this many seconds
     """
     base_template = getattr(settings, 'BASE_TEMPLATE', 'handyhelpers/handyhelpers_base.htm')
     title = 'Annual Statistics Report'
     sub_title = None
     template_name = 'handyhelpers/report/annual_stats.html'
+    dataset_template_name = 'handyhelpers/report/annual_stats_dataset.htm'
     dataset_list = list()
 
-    def get(self, request):
+    @staticmethod
+    def get_dataset_row(dataset, counts, now):
+        """ return the data displayed for a dataset from its dated counts """
+        last_day, last_week, last_month, last_year = get_timestamps(now)
+        return dict(title=dataset.get('title'),
+                    icon=dataset.get('icon'),
+                    url=dataset.get('list_view'),
+                    total=counts['total'],
+                    total_estimated=counts.get('total_estimated', False),
+                    intervals=counts.get('intervals'),
+                    confidence=round(100 * dataset.get('sample_confidence', 0.95)),
+                    distinct=counts.get('distinct'),
+                    distinct_label=dataset.get('distinct_label', 'unique'),
+                    day_count=counts['day'],
+                    day_date=last_day,
+                    week_count=counts['week'],
+                    week_date=last_week,
+                    month_count=counts['month'],
+                    month_date=last_month,
+                    year_count=counts['year'],
+                    year_date=last_year,
+                    )
+
+    def get_dataset_data(self, dataset):
+        """ return the counts of a single dataset """
+        now = timezone.now()
+        return self.get_dataset_row(dataset, get_dated_counts([dataset], now)[0], now)
+
+    def render_report(self, request, now, dated_counts=None):
+        """ render the report from the dated counts of each dataset, or with lazily loaded datasets if not provided """
         if self.is_htmx():
             self.template_name = 'handyhelpers/report/annual_stats_content.htm'
         context = dict()
@@ -270,59 +1272,87 @@ class AnnualStatView(HtmxViewMixin, View):
         context['title'] = self.title
         context['sub_title'] = self.sub_title
         context['dataset_list'] = []
-        last_day, last_week, last_month, last_year = get_timestamps()
-
-        for dataset in self.dataset_list:
-            data_day, data_week, data_month, data_year = get_dated_data(
-                dataset.get('queryset'),
-                dataset.get('dt_field') + '__gte',
-            )
-
-            context['dataset_list'].append(
-                dict(title=dataset.get('title'),
-                     icon=dataset.get('icon'),
-                     url=dataset.get('list_view'),
-                     total=dataset.get('queryset').count(),
-                     day_count=data_day.count(),
-                     day_date=last_day,
-                     week_count=data_week.count(),
-                     week_date=last_week,
-                     month_count=data_month.count(),
-                     month_date=last_month,
-                     year_count=data_year.count(),
-                     year_date=last_year,
-                     ),
-            )
+
+        if dated_counts is None:
+            context['dataset_list'] = self.get_lazy_dataset_list()
+        else:
+            for dataset, counts in zip(self.dataset_list, dated_counts):
+                context['dataset_list'].append(self.get_dataset_row(dataset, counts, now))
         return render(request, self.template_name, context)
 
+    def get(self, request):
+        if 'dataset' in request.GET:
+            return self.get_dataset_response()
+        now = timezone.now()
+        if self.lazy:
+            return self.patch_lazy_response(self.render_report(request, now))
+        return self.render_report(request, now,
+                                  get_dated_counts(self.dataset_list, now, max_workers=self.get_max_workers()))
+
 
-class AnnualTrendView(HtmxViewMixin, View):
+class AsyncAnnualStatView(AnnualStatView):
+    """
+    Description:
+        Async variant of AnnualStatView for ASGI deployments; datasets are counted concurrently in worker threads, at
+        most max_concurrency at a time, without blocking the event loop.
+
+    Parameters:
+        see AnnualStatView
+    """
+    async def get(self, request):
+        if 'dataset' in request.GET:
+            return await sync_to_async(call_closing_connections, thread_sensitive=False)(self.get_dataset_response)
+        now = timezone.now()
+        if self.lazy:
+            return self.patch_lazy_response(await sync_to_async(self.render_report)(request, now))
+        dated_counts = await aget_dated_counts(self.dataset_list, now, self.max_concurrency)
+        return await sync_to_async(self.render_report)(request, now, dated_counts)
+
+
+class AnnualTrendView(LazyReportMixin, ConcurrentReportMixin, HtmxViewMixin, View):
     """
     Description:
         Tallies the number of elements processed over the past year. Included are counts of elements processed in the
         past day, week, month and year. Also includes counts of elements processed by month for the past year.
 
     Parameters:
-        title         - title displayed on web page
-        subtitle      - subtitle displayed on web page
-        template_name - template to use in rendering
-        dataset_list  - set of data to display; list of dictionaries containing the following:
-                            title     - title to display for dataset
-                            queryset  - queryset to use in counts
-                            dt_field  - datetime field in model
+        title           - title displayed on web page
+        subtitle        - subtitle displayed on web page
+        template_name   - template to use in rendering
+        dataset_list    - set of data to display; list of dictionaries containing the following:
+                              title     - title to display for dataset
+                              queryset  - queryset to use in counts
+                              dt_field  - datetime field in model
+                              rollup    - optional; name of a registered rollup to read counts from instead of
+                                          queryset
+                              aggregations - optional; dictionary of name: aggregate (Sum, Avg, Min or Max over a
+                                          field) plotted per month next to the counts; not available with rollup
 
-                        example:
-                            [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at'}, ...]
+                          example:
+                              [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at'}, ...]
+                              [{title='Orders', queryset=Order.objects.all(), dt_field='created_at',
+                                aggregations={'revenue': Sum('total')}}, ...]
+        concurrent      - if True, count datasets concurrently in threads
+        max_concurrency - maximum number of queries run at a time
+        lazy            - if True, render a placeholder per dataset, each loading the charts of its dataset with htmx
+                          when it scrolls into view
+        cache_timeout   - if set, cache the data of each dataset requested with a 'dataset' query parameter for this
+                          many seconds, and allow clients to cache lazily loaded responses as long
     """
     base_template = getattr(settings, 'BASE_TEMPLATE', 'handyhelpers/handyhelpers_base.htm')
     title = 'Annual Trend Report'
     sub_title = 'data added over the past year'
     template_name = 'handyhelpers/report/chartjs/annual_trends.html'
+    dataset_template_name = 'handyhelpers/report/chartjs/annual_trends_dataset.htm'
     chart_display_title = True
     chart_display_legend = False
     dataset_list = list()
 
-    def get(self, request):
+    def render_report(self, request, annual_trend_chart=None, day_week_month_year_charts=None):
+        """
+        render the report from the built annual trend and day/week/month/year charts, or with lazily loaded datasets
+        if not provided
+        """
         if self.is_htmx():
             self.template_name = 'handyhelpers/report/chartjs/annual_trends_content.htm'
         context = dict()
@@ -330,46 +1360,349 @@ class AnnualTrendView(HtmxViewMixin, View):
         context['title'] = self.title
         context['sub_title'] = self.sub_title
         context['dataset_list'] = list()
+        if annual_trend_chart is None:
+            context['lazy_dataset_list'] = self.get_lazy_dataset_list()
+            return render(request, self.template_name, context)
         context['last_day'], context['last_week'], context['last_month'], context['last_year'] = get_timestamps()
-        context['month_labels'], context['month_timestamps'], context['annual_trend_dataset_list'] =  \
-            build_annual_trend_chart(self.dataset_list)
-        context['dataset_list'] = build_day_week_month_year_charts(self.dataset_list)
+        context['month_labels'], context['month_timestamps'], context['annual_trend_dataset_list'] = \
+            annual_trend_chart
+        context['annual_trend_aggregation_charts'] = format_aggregation_charts(context['annual_trend_dataset_list'],
+                                                                               'annual_trend_value')
+        context['dataset_list'] = day_week_month_year_charts
         context['chart_display_title'] = self.chart_display_title
         context['chart_display_legend'] = self.chart_display_legend
         return render(request, self.template_name, context)
 
+    def get_dataset_data(self, dataset):
+        """ return the monthly and day, week, month and year counts of a single dataset """
+        month_labels, month_timestamps, [annual_trend] = build_annual_trend_chart([dataset])
+        [counts] = build_day_week_month_year_charts([dataset])
+        return dict(title=dataset.get('title'), month_labels=month_labels,
+                    months=[ts.date().isoformat() for ts in month_timestamps], annual=annual_trend['annual'],
+                    day=counts['day'], week=counts['week'], month=counts['month'], year=counts['year'],
+                    aggregations=dict(annual=annual_trend['aggregations'], windows=counts['aggregations']))
+
+    def get_dataset_context(self, index, dataset, data):
+        """ add the color, links and value aggregation charts of a dataset to the context of its htmx partial """
+        context = super().get_dataset_context(index, dataset, data)
+        context['color'] = get_colors(index + 1)[index]
+        context['list_view'] = dataset.get('list_view')
+        context['dt_field'] = dataset.get('dt_field')
+        context['last_day'], context['last_week'], context['last_month'], context['last_year'] = get_timestamps()
+        context['aggregation_charts'] = format_aggregation_charts(
+            [dict(title=data['title'], color=context['color'], aggregations=data['aggregations']['annual'])],
+            'annual_trend_value_{}'.format(index))
+        return context
+
+    def get(self, request):
+        if 'dataset' in request.GET:
+            return self.get_dataset_response()
+        if self.lazy:
+            return self.patch_lazy_response(self.render_report(request))
+        return self.render_report(request,
+                                  build_annual_trend_chart(self.dataset_list, self.get_max_workers()),
+                                  build_day_week_month_year_charts(self.dataset_list, self.get_max_workers()))
+
+
+class AsyncAnnualTrendView(AnnualTrendView):
+    """
+    Description:
+        Async variant of AnnualTrendView for ASGI deployments; datasets are counted concurrently in worker threads, at
+        most max_concurrency at a time, without blocking the event loop.
+
+    Parameters:
+        see AnnualTrendView
+    """
+    async def get(self, request):
+        if 'dataset' in request.GET:
+            return await sync_to_async(call_closing_connections, thread_sensitive=False)(self.get_dataset_response)
+        if self.lazy:
+            return self.patch_lazy_response(await sync_to_async(self.render_report)(request))
+        annual_trend_chart = await abuild_annual_trend_chart(self.dataset_list, self.max_concurrency)
+        day_week_month_year_charts = await abuild_day_week_month_year_charts(self.dataset_list, self.max_concurrency)
+        return await sync_to_async(self.render_report)(request, annual_trend_chart, day_week_month_year_charts)
+
 
-class AnnualProgressView(HtmxViewMixin, View):
+class AnnualProgressView(LazyReportMixin, ConcurrentReportMixin, HtmxViewMixin, View):
     """
     Description:
         Show the current number of elements per dataset and chart showing counts of data added per month over the
         past year per dataset.
 
     Parameters:
-        title         - title displayed on web page
-        subtitle      - subtitle displayed on web page
-        template_name - template to use in rendering
-        dataset_list  - set of data to display; list of dictionaries containing the following:
-                            title     - title to display for dataset
-                            queryset  - queryset to use in counts
-                            dt_field  - datetime field in model
+        title           - title displayed on web page
+        subtitle        - subtitle displayed on web page
+        template_name   - template to use in rendering
+        dataset_list    - set of data to display; list of dictionaries containing the following:
+                              title     - title to display for dataset
+                              queryset  - queryset to use in counts
+                              dt_field  - datetime field in model
+                              rollup    - optional; name of a registered rollup to read counts from instead of
+                                          queryset
 
-                        example:
-                            [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at'}, ...]
+                          example:
+                              [{title='Owners', queryset=Owner.objects.all(), dt_field='created_at'}, ...]
+        concurrent      - if True, count datasets concurrently in threads
+        max_concurrency - maximum number of queries run at a time
+        lazy            - if True, render a placeholder per dataset, each loading the count and chart of its dataset
+                          with htmx when it scrolls into view
+        cache_timeout   - if set, cache the data of each dataset requested with a 'dataset' query parameter for this
+                          many seconds, and allow clients to cache lazily loaded responses as long
     """
     base_template = getattr(settings, 'BASE_TEMPLATE', 'handyhelpers/handyhelpers_base.htm')
     title = 'Annual Progress Report'
     sub_title = 'cumulative data added over the past year'
     template_name = 'handyhelpers/report/chartjs/annual_progress.html'
+    dataset_template_name = 'handyhelpers/report/chartjs/annual_progress_dataset.htm'
     dataset_list = list()
 
-    def get(self, request):
+    def render_report(self, request, annual_progress_chart=None):
+        """ render the report from the built annual progress chart, or with lazily loaded datasets if not provided """
         if self.is_htmx():
             self.template_name = 'handyhelpers/report/chartjs/annual_progress_content.htm'
         context = dict()
         context['base_template'] = self.base_template
         context['title'] = self.title
         context['sub_title'] = self.sub_title
+        if annual_progress_chart is None:
+            context['lazy_dataset_list'] = self.get_lazy_dataset_list()
+            return render(request, self.template_name, context=context)
         context['month_labels'], context['month_timestamps'], context['annual_progress_dataset_list'] = \
-            build_annual_progress_chart(self.dataset_list)
+            annual_progress_chart
         return render(request, self.template_name, context=context)
+
+    def get_dataset_data(self, dataset):
+        """ return the cumulative monthly counts of a single dataset """
+        month_labels, month_timestamps, [annual_progress] = build_annual_progress_chart([dataset])
+        return dict(title=dataset.get('title'), month_labels=month_labels,
+                    months=[ts.date().isoformat() for ts in month_timestamps], data=annual_progress['data'],
+                    total=annual_progress['data'][-1] if annual_progress['data'] else 0)
+
+    def get_dataset_context(self, index, dataset, data):
+        """ add the color and links of a dataset to the context of its htmx partial """
+        context = super().get_dataset_context(index, dataset, data)
+        context['color'] = get_colors(index + 1)[index]
+        context['list_view'] = dataset.get('list_view')
+        context['dt_field'] = dataset.get('dt_field')
+        return context
+
+    def get(self, request):
+        if 'dataset' in request.GET:
+            return self.get_dataset_response()
+        if self.lazy:
+            return self.patch_lazy_response(self.render_report(request))
+        return self.render_report(request, build_annual_progress_chart(self.dataset_list, self.get_max_workers()))
+
+
+class AsyncAnnualProgressView(AnnualProgressView):
+    """
+    Description:
+        Async variant of AnnualProgressView for ASGI deployments; datasets are counted concurrently in worker threads,
+        at most max_concurrency at a time, without blocking the event loop.
+
+    Parameters:
+        see AnnualProgressView
+    """
+    async def get(self, request):
+        if 'dataset' in request.GET:
+            return await sync_to_async(call_closing_connections, thread_sensitive=False)(self.get_dataset_response)
+        if self.lazy:
+            return self.patch_lazy_response(await sync_to_async(self.render_report)(request))
+        annual_progress_chart = await abuild_annual_progress_chart(self.dataset_list, self.max_concurrency)
+        return await sync_to_async(self.render_report)(request, annual_progress_chart)
+
+
+class AnnualDashboardView(ConcurrentReportMixin, HtmxViewMixin, View):
+    """
+    Description:
+        Shows the annual statistics, trend and progress reports of a set of datasets on one page. Everything displayed
+        is derived from a single aggregation pass per dataset (see get_annual_report_counts) instead of each report
+        counting on its own, and the counts can be cached for all renderings.
+
+    Parameters:
+        title           - title displayed on web page
+        subtitle        - subtitle displayed on web page
+        template_name   - template to use in rendering
+        dataset_list    - set of data to display; see AnnualStatView
+        concurrent      - if True, count datasets concurrently in threads
+        max_concurrency - maximum number of queries run at a time
+        cache_timeout   - if set, cache the counts for this many seconds; views sharing a dataset_list share the
+                          cached counts
+    """
+    base_template = getattr(settings, 'BASE_TEMPLATE', 'handyhelpers/handyhelpers_base.htm')
+    title = 'Annual Dashboard'
+    sub_title = None
+    template_name = 'handyhelpers/report/chartjs/annual_dashboard.html'
+    dataset_list = list()
+    chart_display_title = True
+    chart_display_legend = False
+    cache_timeout = None
+
+    def render_report(self, request, now, counts):
+        """ render the dashboard from the counts of get_annual_report_counts """
+        if self.is_htmx():
+            self.template_name = 'handyhelpers/report/chartjs/annual_dashboard_content.htm'
+        context = format_annual_dashboard(self.dataset_list, now, counts)
+        context['base_template'] = self.base_template
+        context['title'] = self.title
+        context['sub_title'] = self.sub_title
+        context['chart_display_title'] = self.chart_display_title
+        context['chart_display_legend'] = self.chart_display_legend
+        return render(request, self.template_name, context)
+
+    def get(self, request):
+        now, counts = get_annual_report_counts(self.dataset_list, self.get_max_workers(), self.cache_timeout)
+        return self.render_report(request, now, counts)
+
+
+class AsyncAnnualDashboardView(AnnualDashboardView):
+    """
+    Description:
+        Async variant of AnnualDashboardView for ASGI deployments; datasets are counted concurrently in worker threads,
+        at most max_concurrency at a time, without blocking the event loop.
+
+    Parameters:
+        see AnnualDashboardView
+    """
+    async def get(self, request):
+        now, counts = await aget_annual_report_counts(self.dataset_list, self.max_concurrency, self.cache_timeout)
+        return await sync_to_async(self.render_report)(request, now, counts)
+
+
+class PeriodTrendView(ConcurrentReportMixin, HtmxViewMixin, View):
+    """
+    Description:
+        Plots the number of entries added per period (such as per day or per hour) over a long span. Long series are
+        downsampled on the server to a point budget, keeping their shape while bounding the page size.
+
+    Parameters:
+        title           - title displayed on web page
+        subtitle        - subtitle displayed on web page
+        template_name   - template to use in rendering
+        dataset_list    - set of data to display; list of dictionaries containing the following:
+                              title     - title to display for dataset
+                              queryset  - queryset to use in counts
+                              dt_field  - datetime field in model
+                              list_view - list view of data (used in links)
+        kind            - period kind; one of minute, hour, day, week, month, quarter or year
+        periods         - number of periods plotted, including the current period
+        max_points      - number of points plotted; defaults to the HH_CHART_MAX_POINTS setting (500), 0 to plot
+                          every period
+        concurrent      - if True, count datasets concurrently in threads
+        max_concurrency - maximum number of queries run at a time
+    """
+    base_template = getattr(settings, 'BASE_TEMPLATE', 'handyhelpers/handyhelpers_base.htm')
+    title = 'Trend Report'
+    sub_title = None
+    template_name = 'handyhelpers/report/chartjs/period_trend.html'
+    dataset_list = list()
+    kind = 'day'
+    periods = 365
+    max_points = None
+    chart_display_legend = True
+
+    def render_report(self, request, period_trend_chart):
+        """ render the report from the data of build_period_trend_chart """
+        if self.is_htmx():
+            self.template_name = 'handyhelpers/report/chartjs/period_trend_content.htm'
+        context = dict()
+        context['base_template'] = self.base_template
+        context['title'] = self.title
+        context['sub_title'] = self.sub_title
+        context['kind'] = self.kind
+        context['chart_display_legend'] = self.chart_display_legend
+        context['period_labels'], context['period_timestamps'], context['period_trend_dataset_list'] = \
+            period_trend_chart
+        return render(request, self.template_name, context)
+
+    def get(self, request):
+        return self.render_report(request, build_period_trend_chart(self.dataset_list, self.kind, self.periods,
+                                                                    self.max_points, self.get_max_workers()))
+
+
+class AsyncPeriodTrendView(PeriodTrendView):
+    """
+    Description:
+        Async variant of PeriodTrendView for ASGI deployments; datasets are counted concurrently in worker threads,
+        at most max_concurrency at a time, without blocking the event loop.
+
+    Parameters:
+        see PeriodTrendView
+    """
+    async def get(self, request):
+        period_trend_chart = await abuild_period_trend_chart(self.dataset_list, self.kind, self.periods,
+                                                             self.max_points, self.max_concurrency)
+        return await sync_to_async(self.render_report)(request, period_trend_chart)
+
+
+class TopValuesView(ConcurrentReportMixin, HtmxViewMixin, View):
+    """
+    Description:
+        Lists the most frequent values of a field of each dataset (such as the top 20 hosts by events this week) over
+        the past day, week, month or year, or over all entries. Each dataset is counted with a single GROUP BY query,
+        or with a streaming Space-Saving sketch for huge tables, and the results can be cached per window. The window
+        can be selected with a 'window' query parameter (day, week, month, year or all).
+
+    Parameters:
+        title           - title displayed on web page
+        subtitle        - subtitle displayed on web page
+        template_name   - template to use in rendering
+        dataset_list    - set of data to display; see build_top_values_report
+        window          - default window; one of day, week, month, year or None to count all entries
+        k               - number of values listed per dataset
+        concurrent      - if True, count datasets concurrently in threads
+        max_concurrency - maximum number of queries run at a time
+        cache_timeout   - if set, cache the top values of each dataset and window for this many seconds
+    """
+    base_template = getattr(settings, 'BASE_TEMPLATE', 'handyhelpers/handyhelpers_base.htm')
+    title = 'Top Values'
+    sub_title = None
+    template_name = 'handyhelpers/report/top_values.html'
+    dataset_list = list()
+    window = 'week'
+    k = 20
+    cache_timeout = None
+
+    def get_window(self):
+        """ return the window selected by the 'window' query parameter, or the default window """
+        window = self.request.GET.get('window')
+        if window is None:
+            return self.window
+        window = None if window == 'all' else window
+        if window not in TOP_VALUES_WINDOWS:
+            raise Http404('invalid window')
+        return window
+
+    def render_report(self, request, window, top_values_dataset_list):
+        """ render the report from the data of build_top_values_report """
+        if self.is_htmx():
+            self.template_name = 'handyhelpers/report/top_values_content.htm'
+        context = dict()
+        context['base_template'] = self.base_template
+        context['title'] = self.title
+        context['sub_title'] = self.sub_title
+        context['window'] = window or 'all'
+        context['window_list'] = [window or 'all' for window in TOP_VALUES_WINDOWS]
+        context['dataset_list'] = top_values_dataset_list
+        return render(request, self.template_name, context)
+
+    def get(self, request):
+        window = self.get_window()
+        return self.render_report(request, window, build_top_values_report(
+            self.dataset_list, window, self.k, self.get_max_workers(), self.cache_timeout))
+
+
+class AsyncTopValuesView(TopValuesView):
+    """
+    Description:
+        Async variant of TopValuesView for ASGI deployments; datasets are counted concurrently in worker threads,
+        at most max_concurrency at a time, without blocking the event loop.
+
+    Parameters:
+        see TopValuesView
+    """
+    async def get(self, request):
+        window = self.get_window()
+        top_values_dataset_list = await abuild_top_values_report(self.dataset_list, window, self.k,
+                                                                 self.max_concurrency, self.cache_timeout)
+        return await sync_to_async(self.render_report)(request, window, top_values_dataset_list)
@@ -0,0 +1,309 @@
+"""
+Description:
+    Minimal streaming writer for Office Open XML (xlsx) workbooks. Worksheets are written straight into the zip
+    archive as rows are added, so memory use does not grow with the number of rows written. Sheets that exceed the
+    xlsx row limit are continued on additional sheets.
+
+    example usage:
+        with open('export.xlsx', 'wb') as fileobj:
+            writer = XlsxWriter(fileobj)
+            writer.add_sheet('owners', header=['id', 'name'])
+            writer.write_rows(Owner.objects.values_list('id', 'name'))
+            writer.close()
+"""
+
+# import system modules
+import datetime
+import decimal
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# import Django modules
+from django.utils import timezone
+
+
+MAX_ROWS = 1048576
+MAX_CELL_LENGTH = 32767
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+# style ids; these index the cellXfs entries in STYLES_XML
+STYLE_DEFAULT = 0
+STYLE_HEADER = 1
+STYLE_DATETIME = 2
+STYLE_DATE = 3
+STYLE_TIME = 4
+
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+ILLEGAL_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}'
+    '</Types>'
+)
+
+SHEET_CONTENT_TYPE_XML = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets>'
+    '</workbook>'
+)
+
+WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}'
+    '<Relationship Id="rIdStyles" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="3">'
+    '<numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="166" formatCode="hh:mm:ss"/>'
+    '</numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="5">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="166" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+SHEET_HEADER_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+SHEET_FOOTER_XML = '</sheetData></worksheet>'
+
+
+def column_letter(index):
+    """ return the spreadsheet column letter(s) for a zero-based column index (0 -> A, 26 -> AA) """
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def string_cell(value, ref, style=STYLE_DEFAULT):
+    """ return the xml for an inline string cell """
+    value = ILLEGAL_XML_CHARS.sub('', value[:MAX_CELL_LENGTH])
+    return '<c r="{}" s="{}" t="inlineStr"><is><t xml:space="preserve">{}</t></is></c>'.format(
+        ref, style, escape(value))
+
+
+def text_cell(value, ref):
+    """ return the xml for a value of any other type, written as a string """
+    return string_cell(str(value), ref)
+
+
+def number_cell(value, ref, style=STYLE_DEFAULT):
+    """ return the xml for a numeric cell """
+    return '<c r="{}" s="{}"><v>{}</v></c>'.format(ref, style, value)
+
+
+def bool_cell(value, ref):
+    """ return the xml for a boolean cell """
+    return '<c r="{}" t="b"><v>{}</v></c>'.format(ref, int(value))
+
+
+def datetime_cell(value, ref):
+    """ return the xml for a datetime cell; aware datetimes are written in the current timezone """
+    if timezone.is_aware(value):
+        value = timezone.make_naive(value)
+    delta = value - EXCEL_EPOCH
+    return number_cell(delta.days + delta.seconds / 86400 + delta.microseconds / 86400000000, ref, STYLE_DATETIME)
+
+
+def date_cell(value, ref):
+    """ return the xml for a date cell """
+    return number_cell((value - EXCEL_EPOCH.date()).days, ref, STYLE_DATE)
+
+
+def time_cell(value, ref):
+    """ return the xml for a time cell """
+    seconds = value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1000000
+    return number_cell(seconds / 86400, ref, STYLE_TIME)
+
+
+def float_cell(value, ref):
+    """ return the xml for a float cell; nan/inf are not valid xlsx numbers and are written as text """
+    if value != value or value in (float('inf'), float('-inf')):
+        return string_cell(str(value), ref)
+    return number_cell(repr(value), ref)
+
+
+def decimal_cell(value, ref):
+    """ return the xml for a decimal cell """
+    if not value.is_finite():
+        return string_cell(str(value), ref)
+    return number_cell(value, ref)
+
+
+class XlsxWriter:
+    """
+    Stream rows into an xlsx workbook.
+
+    Cell writers are looked up by python type and cached, so each cell costs one dictionary lookup rather than a
+    chain of type checks. Styles are fixed (header, datetime, date, time) and shared by every cell using them.
+
+    Args:
+        fileobj: writable, seekable binary file object the workbook is written to
+        max_rows: maximum number of rows per sheet (including the header) before continuing on a new sheet
+    """
+    cell_writers = {
+        str: string_cell,
+        bool: bool_cell,
+        int: number_cell,
+        float: float_cell,
+        decimal.Decimal: decimal_cell,
+        datetime.datetime: datetime_cell,
+        datetime.date: date_cell,
+        datetime.time: time_cell,
+    }
+
+    def __init__(self, fileobj, max_rows=MAX_ROWS):
+        self.zip = zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.max_rows = max_rows
+        self.sheet_titles = list()
+        self.title = None
+        self.header = None
+        self.stream = None
+        self.row_count = 0
+        self.column_refs = list()
+        self.cell_writers = dict(self.cell_writers)
+
+    def get_cell_writer(self, value_type):
+        """ return (and cache) the cell writer for a python type; unknown types are written as strings """
+        writer = next((self.cell_writers[base] for base in value_type.__mro__ if base in self.cell_writers), text_cell)
+        self.cell_writers[value_type] = writer
+        return writer
+
+    def get_sheet_title(self, title):
+        """ return a valid, unique sheet title (max 31 characters, no []:*?/\\) """
+        title = ILLEGAL_SHEET_CHARS.sub('', str(title))[:31] or 'Sheet'
+        candidate = title
+        count = 1
+        while candidate.lower() in [i.lower() for i in self.sheet_titles]:
+            count += 1
+            suffix = ' ({})'.format(count)
+            candidate = title[:31 - len(suffix)] + suffix
+        return candidate
+
+    def add_sheet(self, title, header=None):
+        """
+        start a new sheet; rows written after this call are added to it
+
+        Args:
+            title: sheet title
+            header: optional list of column titles written in bold as the first row (repeated on continued sheets)
+        """
+        self.close_sheet()
+        self.title = title
+        self.header = header
+        self.sheet_titles.append(self.get_sheet_title(title))
+        name = 'xl/worksheets/sheet{}.xml'.format(len(self.sheet_titles))
+        self.stream = self.zip.open(name, 'w', force_zip64=True)
+        self.stream.write(SHEET_HEADER_XML.encode('utf-8'))
+        self.row_count = 0
+        if header:
+            self.write_row(header, style=STYLE_HEADER)
+
+    def close_sheet(self):
+        """ finish the sheet currently being written """
+        if self.stream:
+            self.stream.write(SHEET_FOOTER_XML.encode('utf-8'))
+            self.stream.close()
+            self.stream = None
+
+    def write_row(self, values, style=None):
+        """
+        append a row to the current sheet
+
+        Args:
+            values: iterable of cell values; None values are left empty
+            style: optional style id applied to every (string) cell in the row, such as STYLE_HEADER
+        """
+        if not self.stream:
+            self.add_sheet('Sheet1')
+        elif self.row_count >= self.max_rows:
+            self.add_sheet(self.title, self.header)
+        self.row_count += 1
+        row_num = str(self.row_count)
+        column_refs = self.column_refs
+        cells = list()
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+            if index >= len(column_refs):
+                column_refs.append(column_letter(index))
+            ref = column_refs[index] + row_num
+            if style is not None:
+                cells.append(string_cell(str(value), ref, style))
+                continue
+            writer = self.cell_writers.get(type(value)) or self.get_cell_writer(type(value))
+            cells.append(writer(value, ref))
+        self.stream.write('<row r="{}">{}</row>'.format(row_num, ''.join(cells)).encode('utf-8'))
+
+    def write_rows(self, rows):
+        """ append each row in an iterable of rows to the current sheet """
+        for row in rows:
+            self.write_row(row)
+
+    def close(self):
+        """ finish the workbook; the underlying file object is left open """
+        if not self.sheet_titles:
+            self.add_sheet('Sheet1')
+        self.close_sheet()
+        indexes = range(1, len(self.sheet_titles) + 1)
+        self.zip.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(
+            sheets=''.join(SHEET_CONTENT_TYPE_XML.format(index=i) for i in indexes)))
+        self.zip.writestr('_rels/.rels', ROOT_RELS_XML)
+        self.zip.writestr('xl/workbook.xml', WORKBOOK_XML.format(sheets=''.join(
+            '<sheet name="{}" sheetId="{}" r:id="rId{}"/>'.format(escape(title, {'"': '&quot;'}), i, i)
+            for i, title in zip(indexes, self.sheet_titles))))
+        self.zip.writestr('xl/_rels/workbook.xml.rels', WORKBOOK_RELS_XML.format(sheets=''.join(
+            '<Relationship Id="rId{0}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            'Target="worksheets/sheet{0}.xml"/>'.format(i) for i in indexes)))
+        self.zip.writestr('xl/styles.xml', STYLES_XML)
+        self.zip.close()
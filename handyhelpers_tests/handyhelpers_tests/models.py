@@ -0,0 +1,22 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Owner(models.Model):
+    """ owner of items, used by the handyhelpers tests """
+    name = models.CharField(max_length=32)
+
+    def __str__(self):
+        return self.name
+
+
+class Item(models.Model):
+    """ dated entry counted and exported by the handyhelpers tests """
+    owner = models.ForeignKey(Owner, on_delete=models.CASCADE, null=True, blank=True)
+    name = models.CharField(max_length=32)
+    status = models.CharField(max_length=16, default='open')
+    amount = models.FloatField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.name
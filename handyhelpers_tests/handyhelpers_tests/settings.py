@@ -37,6 +37,9 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'handyhelpers',
+    'handyhelpers.rollups',
+    'handyhelpers_tests',
 ]
 
 MIDDLEWARE = [
@@ -118,3 +121,14 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
+
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+
+# handyhelpers
+
+HH_ROLLUPS = {
+    'items': dict(model='handyhelpers_tests.Item', dt_field='created_at'),
+    'items_by_status': dict(model='handyhelpers_tests.Item', dt_field='created_at', dimension='status',
+                            distinct_field='owner_id'),
+}
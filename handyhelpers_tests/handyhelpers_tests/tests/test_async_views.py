@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from handyhelpers.views.report import (AsyncAnnualDashboardView, AsyncAnnualProgressView, AsyncAnnualStatView,
+                                       AsyncAnnualTrendView, AsyncPeriodTrendView, AsyncTopValuesView)
+from handyhelpers_tests.models import Item
+
+BASE_TEMPLATE = 'handyhelpers_tests/base.htm'
+
+DATASET_LIST = [dict(title='Items', queryset=Item.objects.all(), dt_field='created_at', field='status')]
+
+VIEWS = {
+    'stats/': AsyncAnnualStatView,
+    'trends/': AsyncAnnualTrendView,
+    'progress/': AsyncAnnualProgressView,
+    'dashboard/': AsyncAnnualDashboardView,
+    'period/': AsyncPeriodTrendView,
+    'top/': AsyncTopValuesView,
+}
+
+urlpatterns = [
+    path(route, view.as_view(dataset_list=DATASET_LIST, base_template=BASE_TEMPLATE)) for route, view in VIEWS.items()
+] + [
+    path('lazy/' + route, view.as_view(dataset_list=DATASET_LIST, base_template=BASE_TEMPLATE, lazy=True))
+    for route, view in VIEWS.items() if hasattr(view, 'lazy')
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncReportViewTests(TestCase):
+    """ tests that async report views render through the ASGI handler with database sessions and authentication """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reporter')
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+
+    async def test_render_with_authenticated_user(self):
+        for route in VIEWS:
+            with self.subTest(route=route):
+                response = await self.async_client.get('/' + route)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '<p class="user">reporter</p>')
+
+    async def test_lazy_render_with_authenticated_user(self):
+        routes = [route for route, view in VIEWS.items() if hasattr(view, 'lazy')]
+        self.assertEqual(len(routes), 3)
+        for route in routes:
+            with self.subTest(route=route):
+                response = await self.async_client.get('/lazy/' + route)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '<p class="user">reporter</p>')
+                self.assertIn('HX-Request', response['Vary'])
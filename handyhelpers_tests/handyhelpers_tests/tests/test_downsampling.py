@@ -0,0 +1,90 @@
+import random
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from handyhelpers import downsampling
+from handyhelpers.downsampling import downsample_series, get_bucket_bounds, lttb_indices
+
+
+def random_series(length, seed):
+    """ return a seeded random walk """
+    generator = random.Random(seed)
+    values = [0]
+    for _ in range(length - 1):
+        values.append(values[-1] + generator.gauss(0, 1))
+    return values
+
+
+class LttbTests(SimpleTestCase):
+    """ tests of the endpoint and length guarantees of LTTB downsampling """
+
+    def assertIndices(self, indices, length, threshold):
+        self.assertEqual(len(indices), threshold)
+        self.assertEqual((indices[0], indices[-1]), (0, length - 1))
+        self.assertEqual(indices, sorted(set(indices)))
+        # one point is kept from each bucket
+        for index, (start, end) in zip(indices[1:-1], get_bucket_bounds(length, threshold)):
+            self.assertTrue(start <= index < end)
+
+    def test_indices(self):
+        for length, threshold in ((10, 3), (100, 7), (1000, 500), (1001, 999), (5000, 100)):
+            with self.subTest(length=length, threshold=threshold):
+                series = random_series(length, seed=length)
+                self.assertIndices(lttb_indices(series, threshold), length, threshold)
+                with mock.patch('handyhelpers.downsampling.numpy', None):
+                    self.assertIndices(lttb_indices(series, threshold), length, threshold)
+
+    @unittest.skipIf(downsampling.numpy is None, 'numpy is not installed')
+    def test_numpy_and_python_agree(self):
+        for seed in range(5):
+            series = random_series(2000, seed)
+            x = sorted(random.Random(seed).sample(range(10000), 2000))
+            self.assertEqual(downsampling.lttb_indices_numpy(range(2000), series, 100),
+                             downsampling.lttb_indices_python(list(range(2000)), series, 100))
+            self.assertEqual(downsampling.lttb_indices_numpy(x, series, 100),
+                             downsampling.lttb_indices_python(x, series, 100))
+
+    def test_short_series_and_small_thresholds_are_kept_whole(self):
+        series = random_series(50, seed=1)
+        for threshold in (50, 60, 2, 0):
+            self.assertEqual(lttb_indices(series, threshold), list(range(50)))
+        self.assertEqual(lttb_indices([], 10), [])
+
+    def test_peaks_are_kept(self):
+        series = [0] * 1000
+        series[123], series[777] = 100, -100
+        for implementation in (None, downsampling.numpy):
+            with mock.patch('handyhelpers.downsampling.numpy', implementation):
+                indices = lttb_indices(series, 20)
+            self.assertIn(123, indices)
+            self.assertIn(777, indices)
+
+
+class DownsampleSeriesTests(SimpleTestCase):
+    """ tests of the point budget of downsample_series """
+
+    def test_budget_is_shared_by_series(self):
+        labels = list(range(10000))
+        series_list = [random_series(10000, seed) for seed in range(4)]
+        for max_points in (12, 100, 999):
+            with self.subTest(max_points=max_points):
+                new_labels, new_series_list = downsample_series(labels, series_list, max_points)
+                self.assertLessEqual(len(new_labels), max_points)
+                self.assertEqual((new_labels[0], new_labels[-1]), (0, 9999))
+                self.assertEqual(new_labels, sorted(new_labels))
+                for series, new_series in zip(series_list, new_series_list):
+                    self.assertEqual(new_series, [series[label] for label in new_labels])
+
+    def test_short_series_are_unchanged(self):
+        labels, series_list = list(range(10)), [random_series(10, seed=2)]
+        self.assertEqual(downsample_series(labels, series_list, 10), (labels, series_list))
+        self.assertEqual(downsample_series(labels, series_list, None), (labels, series_list))
+        self.assertEqual(downsample_series(labels, series_list, 0), (labels, series_list))
+
+    def test_labels_without_series(self):
+        labels, series_list = downsample_series(list(range(1000)), [], 50)
+        self.assertEqual(len(labels), 50)
+        self.assertEqual((labels[0], labels[-1]), (0, 999))
+        self.assertEqual(series_list, [])
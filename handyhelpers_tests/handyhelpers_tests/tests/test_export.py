@@ -0,0 +1,31 @@
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from handyhelpers.views.export import resolve_field_path
+
+
+class ResolveFieldPathTests(SimpleTestCase):
+    """ tests for resolving export column paths """
+
+    def test_local_field(self):
+        self.assertEqual(resolve_field_path(User, 'username'), User._meta.get_field('username'))
+
+    def test_forward_relation(self):
+        self.assertEqual(resolve_field_path(Permission, 'content_type__app_label'),
+                         ContentType._meta.get_field('app_label'))
+
+    def test_unknown_field(self):
+        with self.assertRaises(ImproperlyConfigured):
+            resolve_field_path(User, 'missing')
+
+    def test_reverse_foreign_key(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'to-many relation'):
+            resolve_field_path(ContentType, 'permission__name')
+
+    def test_many_to_many(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'to-many relation'):
+            resolve_field_path(User, 'groups__name')
+        with self.assertRaisesMessage(ImproperlyConfigured, 'to-many relation'):
+            resolve_field_path(User, 'user_permissions')
@@ -0,0 +1,143 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from handyhelpers import export_jobs
+
+CONTENT = bytes(range(100))
+
+
+def wait_for(job, timeout=5):
+    """ wait for a background export job to finish """
+    deadline = time.monotonic() + timeout
+    while job.is_active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class ExportJobTests(TestCase):
+    """ tests for background export jobs and their status and download views """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner')
+        cls.other_user = User.objects.create_user('other')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def submit(self, key='key', user=None, write_func=None):
+        user = user or self.user
+        return export_jobs.submit_export_job(key, 'data.csv', 'text/csv', write_func or (lambda f: f.write(CONTENT)),
+                                             user_id=user.pk)
+
+    def get_file_job(self):
+        job = wait_for(self.submit(key='file'))
+        self.assertEqual(job.status, export_jobs.COMPLETE)
+        self.addCleanup(job.remove_file)
+        return job
+
+    def download(self, job, **headers):
+        return self.client.get(reverse('handyhelpers:export_job_download', args=[job.id]), headers=headers)
+
+    def test_active_jobs_are_shared_per_user_and_key(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def write(fileobj):
+            release.wait(5)
+            fileobj.write(CONTENT)
+
+        job = self.submit(write_func=write)
+        self.assertIs(self.submit(write_func=write), job)
+        self.assertIsNot(self.submit(key='other', write_func=write), job)
+        other_job = self.submit(user=self.other_user, write_func=write)
+        self.assertIsNot(other_job, job)
+        release.set()
+        for active in (job, other_job):
+            wait_for(active).remove_file()
+        # a finished job is not joined; the export is written again
+        self.assertIsNot(self.submit(write_func=write), job)
+
+    def test_status(self):
+        job = self.get_file_job()
+        data = self.client.get(reverse('handyhelpers:export_job_status', args=[job.id])).json()
+        self.assertEqual((data['status'], data['size'], data['error']), ('complete', len(CONTENT), None))
+        self.assertEqual(data['download_url'], reverse('handyhelpers:export_job_download', args=[job.id]))
+
+    def test_other_users_job_is_not_found(self):
+        job = self.get_file_job()
+        self.client.force_login(self.other_user)
+        self.assertEqual(self.client.get(reverse('handyhelpers:export_job_status', args=[job.id])).status_code, 404)
+        self.assertEqual(self.download(job).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.download(job).status_code, 404)
+        self.assertEqual(self.client.get(reverse('handyhelpers:export_job_status', args=['missing'])).status_code,
+                         404)
+
+    def test_failed_job_reports_generic_error(self):
+        def write(fileobj):
+            raise RuntimeError('SELECT secret FROM /var/data')
+
+        with self.assertLogs('handyhelpers.export_jobs', 'ERROR') as logs:
+            job = wait_for(self.submit(key='failed', write_func=write))
+        self.assertIn('SELECT secret', logs.output[0])
+        data = self.client.get(reverse('handyhelpers:export_job_status', args=[job.id])).json()
+        self.assertEqual(data['status'], 'failed')
+        self.assertEqual(data['error'], export_jobs.FAILED_MESSAGE)
+        self.assertEqual(self.download(job).status_code, 404)
+
+    def test_full_download(self):
+        response = self.download(self.get_file_job())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment; filename="data.csv"', response['Content-Disposition'])
+
+    def test_byte_range(self):
+        response = self.download(self.get_file_job(), Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_open_ended_range(self):
+        response = self.download(self.get_file_job(), Range='bytes=90-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[90:])
+        # the end of a range past the end of the file is truncated
+        response = self.download(self.get_file_job(), Range='bytes=95-500')
+        self.assertEqual(response['Content-Range'], 'bytes 95-99/100')
+
+    def test_suffix_range(self):
+        job = self.get_file_job()
+        response = self.download(job, Range='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[-5:])
+        self.assertEqual(response['Content-Range'], 'bytes 95-99/100')
+        # a suffix longer than the file returns the whole file
+        response = self.download(job, Range='bytes=-500')
+        self.assertEqual(response['Content-Range'], 'bytes 0-99/100')
+
+    def test_unsatisfiable_range(self):
+        job = self.get_file_job()
+        for header in ('bytes=100-', 'bytes=50-10', 'bytes=-0'):
+            response = self.download(job, Range=header)
+            self.assertEqual(response.status_code, 416, header)
+            self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_multiple_and_invalid_ranges_get_the_full_file(self):
+        job = self.get_file_job()
+        for header in ('bytes=0-1,5-6', 'bytes=-', 'bytes=a-b', 'items=0-5', 'bytes 0-5'):
+            response = self.download(job, Range=header)
+            self.assertEqual(response.status_code, 200, header)
+            self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    def test_if_range(self):
+        job = self.get_file_job()
+        etag = self.download(job)['ETag']
+        self.assertEqual(self.download(job, Range='bytes=0-9', If_Range=etag).status_code, 206)
+        self.assertEqual(self.download(job, Range='bytes=0-9', If_Range='"stale"').status_code, 200)
@@ -0,0 +1,54 @@
+import random
+
+from django.test import SimpleTestCase
+
+from handyhelpers.hyperloglog import HyperLogLog
+
+
+def random_values(count, seed):
+    """ return a list of count distinct random values """
+    generator = random.Random(seed)
+    return ['user-{}'.format(value) for value in generator.sample(range(10 ** 9), count)]
+
+
+class HyperLogLogTests(SimpleTestCase):
+    """ tests of the relative error of HyperLogLog distinct counts """
+
+    def test_relative_error(self):
+        # three standard errors at the default precision
+        tolerance = 3 * 1.04 / 64
+        for count in (100, 1000, 10000, 100000):
+            for seed in range(3):
+                with self.subTest(count=count, seed=seed):
+                    sketch = HyperLogLog()
+                    sketch.update(random_values(count, seed))
+                    self.assertLess(abs(sketch.count() - count) / count, tolerance)
+
+    def test_duplicates_are_counted_once(self):
+        values = random_values(5000, seed=1)
+        sketch = HyperLogLog()
+        sketch.update(values * 3)
+        single = HyperLogLog()
+        single.update(values)
+        self.assertEqual(sketch.count(), single.count())
+
+    def test_merge_counts_the_union(self):
+        values = random_values(30000, seed=2)
+        first, second, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        first.update(values[:20000])
+        second.update(values[10000:])
+        union.update(values)
+        self.assertEqual(first.copy().merge(second).registers, union.registers)
+        self.assertLess(abs(first.merge(second).count() - 30000) / 30000, 3 * 1.04 / 64)
+        with self.assertRaises(ValueError):
+            first.merge(HyperLogLog(precision=10))
+
+    def test_precision(self):
+        for precision in (3, 17):
+            with self.assertRaises(ValueError):
+                HyperLogLog(precision)
+        sketch = HyperLogLog(precision=14)
+        sketch.update(random_values(20000, seed=3))
+        self.assertLess(abs(sketch.count() - 20000) / 20000, 3 * 1.04 / 128)
+        self.assertEqual(HyperLogLog.from_bytes(sketch.to_bytes()).registers, sketch.registers)
+        self.assertEqual(HyperLogLog().count(), 0)
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase
+
+from handyhelpers.querysets import is_unfiltered
+from handyhelpers.views.gui import ApproximateCountPaginator
+from handyhelpers_tests.models import Item
+
+ESTIMATE = 250000
+
+
+@mock.patch('handyhelpers.querysets.get_table_estimate', return_value=ESTIMATE)
+class ApproximateCountPaginatorTests(TestCase):
+    """ tests that ApproximateCountPaginator estimates only unfiltered querysets and the totals shown for it """
+
+    @classmethod
+    def setUpTestData(cls):
+        for status in ('open', 'open', 'closed'):
+            Item.objects.create(name='item', status=status)
+
+    def render_total(self, paginator):
+        page_obj = paginator.get_page(1)
+        page_obj.adjusted_elided_pages = paginator.get_elided_page_range(1)
+        return render_to_string('handyhelpers/generic/bs5/partials/pagination_controls.htm',
+                                dict(page_obj=page_obj, include_total=True), request=RequestFactory().get('/'))
+
+    def test_is_unfiltered(self, get_table_estimate):
+        for queryset in (Item.objects.all(), Item.objects.order_by('-pk')):
+            self.assertTrue(is_unfiltered(queryset))
+        for queryset in (Item.objects.filter(status='open'), Item.objects.all()[:2], Item.objects.distinct(),
+                         Item.objects.values('status').annotate(count=Count('pk')),
+                         Item.objects.all().union(Item.objects.all())):
+            self.assertFalse(is_unfiltered(queryset), queryset.query)
+
+    def test_unfiltered_queryset_is_estimated(self, get_table_estimate):
+        paginator = ApproximateCountPaginator(Item.objects.order_by('pk'), per_page=1)
+        self.assertEqual(paginator.count, ESTIMATE)
+        self.assertTrue(paginator.count_estimated)
+        self.assertEqual(paginator.num_pages, ESTIMATE)
+
+    def test_filtered_queryset_is_counted_exactly(self, get_table_estimate):
+        paginator = ApproximateCountPaginator(Item.objects.filter(status='open').order_by('pk'), per_page=1)
+        self.assertEqual(paginator.count, 2)
+        self.assertFalse(paginator.count_estimated)
+        get_table_estimate.assert_not_called()
+
+    def test_estimate_below_threshold_is_counted_exactly(self, get_table_estimate):
+        paginator = ApproximateCountPaginator(Item.objects.order_by('pk'), per_page=1, count_threshold=ESTIMATE + 1)
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_estimated)
+
+    def test_list_is_counted_exactly(self, get_table_estimate):
+        paginator = ApproximateCountPaginator(list(range(5)), per_page=2)
+        self.assertEqual((paginator.count, paginator.count_estimated), (5, False))
+
+    def test_estimated_total_is_marked(self, get_table_estimate):
+        html = self.render_total(ApproximateCountPaginator(Item.objects.order_by('pk'), per_page=1))
+        self.assertIn('~{} total (estimated)'.format(ESTIMATE), html)
+
+    def test_exact_total_is_not_marked(self, get_table_estimate):
+        for paginator in (ApproximateCountPaginator(Item.objects.filter(name='item').order_by('pk'), per_page=1),
+                          Paginator(Item.objects.order_by('pk'), per_page=1)):
+            html = self.render_total(paginator)
+            self.assertIn('>3 total</div>', html)
+            self.assertNotIn('~', html)
+            self.assertNotIn('(estimated)', html)
@@ -0,0 +1,54 @@
+import io
+from unittest import mock
+
+import pyarrow.parquet
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import path
+
+from handyhelpers.checks import parquet_export_requirements
+from handyhelpers.views.export import AsyncParquetExportView, ParquetExportView
+from handyhelpers_tests.models import Item
+
+
+class ItemParquetExportView(ParquetExportView):
+    queryset = Item.objects.order_by('pk')
+
+
+urlpatterns = [
+    path('parquet/', ItemParquetExportView.as_view()),
+]
+
+
+class ParquetExportViewTests(TestCase):
+    """ tests for ParquetExportView, with and without pyarrow """
+
+    def test_export(self):
+        Item.objects.create(name='first', amount=1.5)
+        Item.objects.create(name='second', status='closed')
+        response = ItemParquetExportView.as_view()(RequestFactory().get('/'))
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        table = pyarrow.parquet.read_table(io.BytesIO(content))
+        self.assertEqual(table.column('name').to_pylist(), ['first', 'second'])
+        self.assertEqual(table.column('amount').to_pylist(), [1.5, 0])
+        self.assertEqual(str(table.schema.field('created_at').type), 'timestamp[us, tz=UTC]')
+
+    @mock.patch('handyhelpers.views.export.pyarrow', None)
+    def test_missing_pyarrow_responds_501(self):
+        response = ItemParquetExportView.as_view()(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 501)
+        self.assertIn(b'pyarrow is not installed', response.content)
+
+    @mock.patch('handyhelpers.views.export.pyarrow', None)
+    def test_missing_pyarrow_responds_501_async(self):
+        view = AsyncParquetExportView.as_view(queryset=Item.objects.all())
+        response = async_to_sync(view)(AsyncRequestFactory().get('/'))
+        self.assertEqual(response.status_code, 501)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_system_check(self):
+        self.assertEqual(parquet_export_requirements(None), [])
+        with mock.patch('handyhelpers.views.export.pyarrow', None):
+            errors = parquet_export_requirements(None)
+        self.assertEqual([error.id for error in errors], ['handyhelpers.E001'])
+        self.assertIs(errors[0].obj, ItemParquetExportView)
@@ -0,0 +1,86 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from handyhelpers.querysets import count_by_hour, count_by_month, count_by_period, count_by_week
+from handyhelpers_tests.models import Item
+
+NEW_YORK = 'America/New_York'
+
+
+def utc(*args):
+    """ return an aware UTC datetime """
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+class CountByPeriodTests(TestCase):
+    """ tests for count_by_period across daylight saving time changes in New York """
+
+    def count(self, timestamps, kind, periods, now):
+        for created_at in timestamps:
+            Item.objects.create(name='item', created_at=created_at)
+        with timezone.override(NEW_YORK):
+            return count_by_period(Item.objects.all(), 'created_at', kind, periods, now=now)
+
+    def test_hour_when_clocks_are_turned_back(self):
+        # 01:00 occurs twice on 2024-11-03: 05:00Z (EDT) and 06:00Z (EST)
+        counts = self.count([utc(2024, 11, 3, 5, 15), utc(2024, 11, 3, 6, 15), utc(2024, 11, 3, 7, 15)], 'hour', 5,
+                            now=utc(2024, 11, 3, 8, 30))
+        self.assertEqual(counts, [0, 1, 1, 1, 0])
+
+    def test_hour_when_clocks_are_turned_forward(self):
+        # 02:00 is skipped on 2024-03-10; 01:15 EST is followed by 03:15 EDT an hour later
+        counts = self.count([utc(2024, 3, 10, 6, 15), utc(2024, 3, 10, 7, 15)], 'hour', 4, now=utc(2024, 3, 10, 8, 30))
+        self.assertEqual(counts, [0, 1, 1, 0])
+
+    def test_day_with_25_hours(self):
+        timestamps = [utc(2024, 11, 3, 4, 30), utc(2024, 11, 4, 4, 30), utc(2024, 11, 4, 5, 30)]
+        self.assertEqual(self.count(timestamps, 'day', 3, now=utc(2024, 11, 4, 12)), [1, 2, 0])
+
+    def test_week_across_clocks_turned_back(self):
+        # local times: Sun Oct 27 23:30 EDT, Mon Oct 28 00:30 EDT, Sun Nov 3 23:30 EST, Mon Nov 4 00:30 EST
+        timestamps = [utc(2024, 10, 28, 3, 30), utc(2024, 10, 28, 4, 30), utc(2024, 11, 4, 4, 30),
+                      utc(2024, 11, 4, 5, 30)]
+        self.assertEqual(self.count(timestamps, 'week', 3, now=utc(2024, 11, 5, 12)), [1, 2, 1])
+
+    def test_month_across_clocks_turned_forward(self):
+        # local times: Feb 29 23:30 EST, Mar 1 00:30 EST, Mar 31 23:30 EDT, Apr 1 00:30 EDT
+        timestamps = [utc(2024, 3, 1, 4, 30), utc(2024, 3, 1, 5, 30), utc(2024, 4, 1, 3, 30), utc(2024, 4, 1, 4, 30)]
+        self.assertEqual(self.count(timestamps, 'month', 3, now=utc(2024, 4, 15)), [1, 2, 1])
+
+    def test_invalid_kind(self):
+        with self.assertRaises(ValueError):
+            count_by_period(Item.objects.all(), 'created_at', 'fortnight', 3)
+
+
+class CountByPartTests(TestCase):
+    """ tests that count_by_hour, count_by_week and count_by_month count every day or year together """
+
+    def count(self, func, timestamps, now):
+        for created_at in timestamps:
+            Item.objects.create(name='item', created_at=created_at)
+        with timezone.override(NEW_YORK), mock.patch('handyhelpers.querysets.get_local_now',
+                                                     return_value=timezone.localtime(now)):
+            return func(Item.objects.all(), 'created_at')
+
+    def test_count_by_hour(self):
+        # 10:15 EDT on two days and 09:15 EDT
+        counts = self.count(count_by_hour, [utc(2024, 7, 1, 14, 15), utc(2024, 7, 2, 14, 15), utc(2024, 7, 2, 13, 15)],
+                            now=utc(2024, 7, 3, 14, 30))
+        self.assertEqual(len(counts), 24)
+        self.assertEqual(counts[:3], [2, 1, 0])
+        self.assertEqual(sum(counts), 3)
+
+    def test_count_by_week(self):
+        # ISO week 27 of 2023 and 2024, and week 26 of 2024
+        counts = self.count(count_by_week, [utc(2023, 7, 5, 12), utc(2024, 7, 3, 12), utc(2024, 6, 26, 12)],
+                            now=utc(2024, 7, 4, 12))
+        self.assertEqual(len(counts), 52)
+        self.assertEqual(counts[:3], [2, 1, 0])
+
+    def test_count_by_month(self):
+        counts = self.count(count_by_month, [utc(2023, 1, 10, 12), utc(2024, 1, 10, 12), utc(2023, 12, 10, 12)],
+                            now=utc(2024, 1, 20, 12))
+        self.assertEqual(counts, [2, 1] + [0] * 10)
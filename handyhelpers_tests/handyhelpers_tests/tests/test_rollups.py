@@ -0,0 +1,107 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from handyhelpers.rollups.models import DailyCount, DailySketch, RollupWatermark
+from handyhelpers.rollups.registry import get_rollup, get_rollups
+from handyhelpers_tests.models import Item, Owner
+
+
+def days_ago(days, hour=12):
+    """ return a timestamp at a given hour of a day in the past, in the current time zone """
+    day = timezone.localdate() - datetime.timedelta(days=days)
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+
+
+class RollupTests(TestCase):
+    """ tests for refreshing rollups and reading their daily counts """
+
+    @classmethod
+    def setUpTestData(cls):
+        owners = [Owner.objects.create(name='owner{}'.format(number)) for number in range(3)]
+        for days, status, count in ((5, 'open', 3), (5, 'closed', 1), (3, 'open', 2), (1, 'closed', 4)):
+            for number in range(count):
+                Item.objects.create(name='item', status=status, owner=owners[number % 3], created_at=days_ago(days))
+
+    def get_exact_counts(self, **filters):
+        counts = dict()
+        for created_at in Item.objects.filter(**filters).values_list('created_at', flat=True):
+            day = timezone.localdate(created_at)
+            counts[day] = counts.get(day, 0) + 1
+        return counts
+
+    def get_stored_rows(self, name):
+        return list(DailyCount.objects.filter(name=name).order_by('day', 'dimension').values_list(
+            'day', 'dimension', 'count'))
+
+    def test_get_rollups(self):
+        self.assertEqual(set(get_rollups()), {'items', 'items_by_status'})
+        self.assertEqual(get_rollup('items').model, Item)
+
+    def test_counts_before_first_refresh_are_live(self):
+        self.assertEqual(get_rollup('items').get_daily_counts(), self.get_exact_counts())
+
+    def test_refresh(self):
+        rollup = get_rollup('items')
+        self.assertEqual(rollup.refresh(), 3)
+        self.assertEqual(sum(count for _, _, count in self.get_stored_rows('items')), Item.objects.count())
+        self.assertEqual(rollup.get_watermark_day(), timezone.localdate())
+        self.assertEqual(rollup.get_daily_counts(), self.get_exact_counts())
+
+    def test_refresh_is_idempotent(self):
+        rollup = get_rollup('items_by_status')
+        rollup.refresh()
+        rows = self.get_stored_rows('items_by_status')
+        sketches = DailySketch.objects.filter(name='items_by_status').count()
+        rollup.refresh()
+        rollup.refresh(full=True)
+        self.assertEqual(self.get_stored_rows('items_by_status'), rows)
+        self.assertEqual(DailySketch.objects.filter(name='items_by_status').count(), sketches)
+        self.assertEqual(RollupWatermark.objects.filter(name='items_by_status').count(), 1)
+
+    def test_rows_added_after_refresh_are_counted_live(self):
+        rollup = get_rollup('items')
+        rollup.refresh()
+        Item.objects.create(name='new', created_at=timezone.now())
+        self.assertEqual(rollup.get_daily_counts(), self.get_exact_counts())
+        rollup.refresh()
+        self.assertEqual(rollup.get_daily_counts(), self.get_exact_counts())
+
+    def test_incremental_refresh_keeps_days_before_watermark(self):
+        rollup = get_rollup('items')
+        RollupWatermark.objects.create(name='items', refreshed_at=days_ago(3, hour=0))
+        DailyCount.objects.create(name='items', day=days_ago(5).date(), count=99)
+        rollup.refresh()
+        counts = rollup.get_daily_counts()
+        self.assertEqual(counts[days_ago(5).date()], 99)
+        self.assertEqual(counts[days_ago(3).date()], 2)
+        # a full refresh recounts every day
+        rollup.refresh(full=True)
+        self.assertEqual(rollup.get_daily_counts(), self.get_exact_counts())
+
+    def test_start_and_dimension(self):
+        rollup = get_rollup('items_by_status')
+        rollup.refresh()
+        Item.objects.create(name='new', status='open', created_at=timezone.now())
+        start = days_ago(3).date()
+        self.assertEqual(rollup.get_daily_counts(start=start, dimension='open'),
+                         self.get_exact_counts(status='open', created_at__gte=days_ago(3, hour=0)))
+        self.assertEqual(rollup.get_daily_counts(dimension='closed'), self.get_exact_counts(status='closed'))
+
+    def test_daily_sketches(self):
+        rollup = get_rollup('items_by_status')
+        rollup.refresh()
+        Item.objects.create(name='new', status='open', owner=Owner.objects.first(), created_at=timezone.now())
+        sketches = rollup.get_daily_sketches()
+        self.assertEqual(round(sketches[days_ago(5).date()].count()), 3)
+        self.assertEqual(round(sketches[timezone.localdate()].count()), 1)
+        self.assertEqual(round(rollup.get_daily_sketches(dimension='closed')[days_ago(5).date()].count()), 1)
+
+    def test_refresh_rollups_command(self):
+        out = io.StringIO()
+        call_command('refresh_rollups', 'items', stdout=out)
+        self.assertIn('items: 3 daily counts written', out.getvalue())
+        self.assertFalse(DailyCount.objects.filter(name='items_by_status').exists())
@@ -0,0 +1,57 @@
+import random
+
+from django.db.models import Q
+from django.test import TestCase
+
+from handyhelpers.querysets import sample_counts
+from handyhelpers_tests.models import Item
+
+CONDITIONS = {'total': None, 'open': Q(status='open'), 'large': Q(amount__gte=90)}
+
+
+class SampleCountsTests(TestCase):
+    """ tests that the confidence intervals of sampled counts contain the true counts """
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = random.Random(0)
+        Item.objects.bulk_create([Item(name='item', status=generator.choice(('open', 'open', 'closed')),
+                                       amount=generator.uniform(0, 100)) for _ in range(20000)])
+        # a gap in the primary keys, as left by deleted rows
+        Item.objects.filter(pk__gt=5000, pk__lte=7000).delete()
+
+    def get_true_counts(self, queryset):
+        return {name: queryset.filter(condition or Q()).count() for name, condition in CONDITIONS.items()}
+
+    def assertCoverage(self, queryset, fraction, confidence=0.95, runs=100):
+        """ assert the intervals of seeded samples contain the true counts about as often as their confidence """
+        true_counts = self.get_true_counts(queryset)
+        covered = {name: 0 for name in CONDITIONS}
+        for seed in range(runs):
+            random.seed(seed)
+            for name, (estimate, low, high) in sample_counts(queryset, fraction, CONDITIONS, confidence).items():
+                self.assertLessEqual(low, estimate)
+                self.assertLessEqual(estimate, high)
+                covered[name] += low <= true_counts[name] <= high
+        for name, count in covered.items():
+            self.assertGreaterEqual(count / runs, confidence - 0.1, name)
+
+    def test_intervals_contain_true_counts(self):
+        self.assertCoverage(Item.objects.all(), 0.05)
+
+    def test_intervals_of_filtered_queryset(self):
+        self.assertCoverage(Item.objects.filter(status='open'), 0.1, confidence=0.9)
+
+    def test_same_seed_same_sample(self):
+        random.seed(1)
+        first = sample_counts(Item.objects.all(), 0.05, CONDITIONS)
+        random.seed(1)
+        self.assertEqual(sample_counts(Item.objects.all(), 0.05, CONDITIONS), first)
+
+    def test_exact_counts(self):
+        true_counts = self.get_true_counts(Item.objects.all())
+        exact = {name: (count, count, count) for name, count in true_counts.items()}
+        self.assertEqual(sample_counts(Item.objects.all(), 1, CONDITIONS), exact)
+        self.assertEqual(sample_counts(Item.objects.all(), 0.05, CONDITIONS, blocks=1), exact)
+        # tables too small for the number of ranges are counted exactly
+        self.assertEqual(sample_counts(Item.objects.all(), 0.0001, CONDITIONS, blocks=100000), exact)
@@ -0,0 +1,84 @@
+import bisect
+import random
+
+from django.test import SimpleTestCase, TestCase
+
+from handyhelpers.querysets import get_percentiles
+from handyhelpers.tdigest import TDigest
+from handyhelpers_tests.models import Item
+
+QUANTILES = (0.01, 0.1, 0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def percentile_cont(values, q):
+    """ return the exact percentile of values interpolated like PERCENTILE_CONT """
+    values = sorted(values)
+    position = q * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def random_values(count, seed):
+    """ return count seeded values of a long-tailed distribution, like request durations """
+    generator = random.Random(seed)
+    return [generator.lognormvariate(0, 1) for _ in range(count)]
+
+
+class TDigestTests(SimpleTestCase):
+    """ tests of t-digest percentiles against the exact PERCENTILE_CONT percentiles """
+
+    def assertRankError(self, values, digest, tolerance=0.005):
+        """ assert each estimated quantile lies within tolerance of its quantile in the sorted values """
+        values = sorted(values)
+        for q in QUANTILES:
+            estimate = digest.quantile(q)
+            low = percentile_cont(values, max(q - tolerance, 0))
+            high = percentile_cont(values, min(q + tolerance, 1))
+            self.assertTrue(low <= estimate <= high, (q, estimate, low, high))
+            rank = bisect.bisect_left(values, estimate) / len(values)
+            self.assertLess(abs(rank - q), tolerance)
+
+    def test_quantiles(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                values = random_values(50000, seed)
+                digest = TDigest()
+                digest.update(values)
+                self.assertRankError(values, digest)
+                self.assertLessEqual(len(digest.means), 2 * digest.compression)
+                self.assertEqual(digest.quantile(0), min(values))
+                self.assertEqual(digest.quantile(1), max(values))
+
+    def test_small_sets_are_exact(self):
+        values = random_values(50, seed=4)
+        digest = TDigest()
+        digest.update(values)
+        for q in QUANTILES + (0.25, 0.75):
+            self.assertAlmostEqual(digest.quantile(q), percentile_cont(values, q))
+        self.assertIsNone(TDigest().quantile(0.5))
+
+    def test_merge(self):
+        values = random_values(40000, seed=5)
+        digests = [TDigest() for _ in range(4)]
+        for index, value in enumerate(values):
+            digests[index % 4].add(value)
+        merged = TDigest()
+        for digest in digests:
+            merged.merge(digest)
+        self.assertEqual(merged.count, len(values))
+        self.assertRankError(values, merged)
+
+
+class GetPercentilesTests(TestCase):
+    """ tests of get_percentiles on databases without PERCENTILE_CONT """
+
+    def test_percentiles(self):
+        values = random_values(3000, seed=6)
+        Item.objects.bulk_create([Item(name='item', amount=value) for value in values])
+        p50, p95, p99 = get_percentiles(Item.objects.all(), 'amount', (50, 95, 99))
+        self.assertAlmostEqual(p50, percentile_cont(values, 0.5), delta=0.01 * p50)
+        for estimate, q in ((p95, 0.95), (p99, 0.99)):
+            self.assertLessEqual(percentile_cont(values, q - 0.005), estimate)
+            self.assertLessEqual(estimate, percentile_cont(values, q + 0.005))
+        self.assertEqual(get_percentiles(Item.objects.none(), 'amount', (50, 99)), [None, None])
@@ -0,0 +1,100 @@
+import datetime
+import decimal
+import io
+import zipfile
+
+import openpyxl
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from handyhelpers.views.export import XlsxExportView
+from handyhelpers.xlsx import XlsxWriter, column_letter
+from handyhelpers_tests.models import Item
+
+
+def write_workbook(rows, header=None, title='data', **kwargs):
+    """ write rows to an in-memory workbook and return it loaded with openpyxl """
+    fileobj = io.BytesIO()
+    writer = XlsxWriter(fileobj, **kwargs)
+    writer.add_sheet(title, header=header)
+    writer.write_rows(rows)
+    writer.close()
+    fileobj.seek(0)
+    with zipfile.ZipFile(fileobj) as archive:
+        assert archive.testzip() is None
+    fileobj.seek(0)
+    return openpyxl.load_workbook(fileobj)
+
+
+class XlsxWriterTests(SimpleTestCase):
+    """ tests that workbooks written by XlsxWriter open with openpyxl and round-trip their values """
+
+    def test_column_letter(self):
+        self.assertEqual([column_letter(index) for index in (0, 25, 26, 701, 702)], ['A', 'Z', 'AA', 'ZZ', 'AAA'])
+
+    def test_values_round_trip(self):
+        rows = [
+            ['alpha', 1, 2.5, decimal.Decimal('3.25'), True, datetime.date(2024, 3, 10),
+             datetime.datetime(2024, 3, 10, 14, 30, 15), datetime.time(8, 15)],
+            ['alpha', None, None, None, False, None, None, None],
+        ]
+        workbook = write_workbook(rows, header=['name', 'int', 'float', 'decimal', 'bool', 'date', 'datetime', 'time'])
+        sheet = workbook['data']
+        values = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(values[0], ('name', 'int', 'float', 'decimal', 'bool', 'date', 'datetime', 'time'))
+        self.assertEqual(values[1][:5], ('alpha', 1, 2.5, 3.25, True))
+        self.assertEqual(values[1][5], datetime.datetime(2024, 3, 10))
+        self.assertEqual(values[1][6], datetime.datetime(2024, 3, 10, 14, 30, 15))
+        self.assertEqual(values[1][7], datetime.time(8, 15))
+        self.assertEqual(values[2], ('alpha', None, None, None, False, None, None, None))
+        self.assertTrue(sheet['A1'].font.b)
+        self.assertEqual(sheet['F2'].number_format, 'yyyy-mm-dd')
+
+    def test_repeated_and_special_strings(self):
+        rows = [['same', 'a < b & "c"', 'ünïcødé'],
+                ['same', 'bad\x00\x0bchars', '  padded  '],
+                ['same', 'x' * 40000]]
+        values = list(write_workbook(rows)['data'].iter_rows(values_only=True))
+        self.assertEqual([row[0] for row in values], ['same'] * 3)
+        self.assertEqual(values[0][1:], ('a < b & "c"', 'ünïcødé'))
+        self.assertEqual(values[1][1:], ('badchars', '  padded  '))
+        self.assertEqual(len(values[2][1]), 32767)
+
+    def test_aware_datetime_in_current_timezone(self):
+        value = timezone.make_aware(datetime.datetime(2024, 7, 1, 12, 0), datetime.timezone.utc)
+        with timezone.override('America/New_York'):
+            values = list(write_workbook([[value]])['data'].iter_rows(values_only=True))
+        self.assertEqual(values[0][0], datetime.datetime(2024, 7, 1, 8, 0))
+
+    def test_other_types_and_non_finite_numbers_as_text(self):
+        rows = [[float('nan'), decimal.Decimal('Infinity'), datetime.timedelta(hours=1), {'a': 1}]]
+        values = list(write_workbook(rows)['data'].iter_rows(values_only=True))
+        self.assertEqual(values[0], ('nan', 'Infinity', '1:00:00', "{'a': 1}"))
+
+    def test_rows_continue_on_new_sheets(self):
+        workbook = write_workbook([[number] for number in range(5)], header=['n'], title='n/a [x]', max_rows=3)
+        self.assertEqual(workbook.sheetnames, ['na x', 'na x (2)', 'na x (3)'])
+        self.assertEqual([[row[0] for row in workbook[name].iter_rows(values_only=True)]
+                          for name in workbook.sheetnames], [['n', 0, 1], ['n', 2, 3], ['n', 4]])
+
+    def test_empty_workbook(self):
+        fileobj = io.BytesIO()
+        XlsxWriter(fileobj).close()
+        fileobj.seek(0)
+        self.assertEqual(openpyxl.load_workbook(fileobj).sheetnames, ['Sheet1'])
+
+
+class XlsxExportViewTests(TestCase):
+    """ tests that XlsxExportView responses open as workbooks """
+
+    def test_export(self):
+        Item.objects.create(name='first', amount=1.5, created_at=timezone.now())
+        Item.objects.create(name='second', status='closed')
+        response = XlsxExportView.as_view(queryset=Item.objects.order_by('pk'))(RequestFactory().get('/'))
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        sheet = openpyxl.load_workbook(io.BytesIO(content)).active
+        values = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(len(values), 3)
+        self.assertIn('name', values[0])
+        self.assertEqual([row[values[0].index('name')] for row in values[1:]], ['first', 'second'])
+        self.assertEqual([row[values[0].index('status')] for row in values[1:]], ['open', 'closed'])
@@ -5,6 +5,8 @@ import sys
 
 
 def main():
+    # make the handyhelpers package at the root of the repository importable without installing it
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'handyhelpers_tests.settings')
     try:
         from django.core.management import execute_from_command_line
@@ -25,6 +25,11 @@ setup(
                  ''.format(handyhelpers.__version__),
     keywords=['django', 'helpers', 'handyhelpers'],
     install_requires=required,
+    extras_require={
+        'parquet': ['pyarrow'],
+        'zstd': ['zstandard'],
+        'numpy': ['numpy'],
+    },
     classifiers=[
         'Environment :: Web Environment',
         'Framework :: Django :: 3.2',